@@ -0,0 +1,113 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .config import Config
+
+
+class ResponseCache:
+    """
+    Cache LRU em memória para respostas de leitura, invalidado por versão de dados.
+
+    Cada entrada guarda a versão vigente quando o cálculo começou; qualquer escrita
+    confirmada no banco incrementa a versão e as entradas antigas deixam de ser servidas.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.versao = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+
+    @staticmethod
+    def key(endpoint: str, **params) -> Hashable:
+        """Chave normalizada: endpoint + parâmetros ordenados por nome."""
+        return (endpoint, tuple(sorted(params.items())))
+
+    def invalidate(self) -> None:
+        """Marca todas as entradas como obsoletas."""
+        self.versao += 1
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != self.versao:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, versao: int) -> None:
+        if versao != self.versao:
+            # Houve escrita durante o cálculo: o valor já nasce obsoleto
+            return
+        self._entries[key] = (versao, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.get(key)
+        if value is None:
+            versao = self.versao
+            value = await compute()
+            self.set(key, value, versao)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "version": self.versao,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+dashboard_cache = ResponseCache(maxsize=Config.DASHBOARD_CACHE_SIZE)
+
+# Mapa nome -> id de categorias/subcategorias (uma única entrada com a tabela inteira)
+categorias_cache = ResponseCache(maxsize=1)
+TABELAS_CATEGORIAS = {"categorias", "subcategorias"}
+
+
+# Toda escrita confirmada (flush do ORM ou INSERT/UPDATE/DELETE direto) invalida o cache;
+# escritas em categorias/subcategorias também invalidam o mapa de nomes, inclusive no
+# rollback, já que a própria sessão pode tê-lo carregado com linhas não confirmadas
+@event.listens_for(Session, "after_flush")
+def _marcar_escrita_flush(session, flush_context):
+    session.info["escrita_pendente"] = True
+    alterados = session.new | session.dirty | session.deleted
+    if any(getattr(obj, "__tablename__", None) in TABELAS_CATEGORIAS for obj in alterados):
+        session.info["categorias_alteradas"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _marcar_escrita_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["escrita_pendente"] = True
+        if orm_execute_state.statement.table.name in TABELAS_CATEGORIAS:
+            orm_execute_state.session.info["categorias_alteradas"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_apos_commit(session):
+    if session.info.pop("escrita_pendente", False):
+        dashboard_cache.invalidate()
+    if session.info.pop("categorias_alteradas", False):
+        categorias_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_escrita(session):
+    session.info.pop("escrita_pendente", None)
+    if session.info.pop("categorias_alteradas", False):
+        categorias_cache.invalidate()
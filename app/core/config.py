@@ -9,4 +9,18 @@ class Config:
     logging.info(f"DEBUG: MongoDB URL → {MONGODB_URL}")
     DATABASE_NAME = os.getenv('DATABASE_NAME')
     logging.info(f"DEBUG: MongoDB URL → {DATABASE_NAME}")
-    DATABASE_URL = os.getenv('DATABASE_URL')
\ No newline at end of file
+    DATABASE_URL = os.getenv('DATABASE_URL')
+    DB_PERFIL = os.getenv('DB_PERFIL', 'dev')
+    # Escritor único: todas as escritas dos repositórios passam por uma fila com group commit
+    DB_ESCRITOR_UNICO = os.getenv('DB_ESCRITOR_UNICO', '0').lower() in ('1', 'true')
+    DB_ESCRITOR_LOTE_MAX = int(os.getenv('DB_ESCRITOR_LOTE_MAX', 64))
+    DB_ESCRITOR_ESPERA_MS = float(os.getenv('DB_ESCRITOR_ESPERA_MS', 2))
+    DASHBOARD_CACHE_SIZE = int(os.getenv('DASHBOARD_CACHE_SIZE', 256))
+    TRANSACOES_PAGE_SIZE = int(os.getenv('TRANSACOES_PAGE_SIZE', 50))
+    TRANSACOES_MAX_PAGE_SIZE = int(os.getenv('TRANSACOES_MAX_PAGE_SIZE', 500))
+    TRANSACOES_BATCH_MAX_ITEMS = int(os.getenv('TRANSACOES_BATCH_MAX_ITEMS', 5000))
+    TRANSACOES_BATCH_CHUNK = int(os.getenv('TRANSACOES_BATCH_CHUNK', 1000))
+    # Logs: dev escreve tudo na hora; prod usa fila (enqueue) e amostra os eventos de requisição
+    LOG_MODO = os.getenv('LOG_MODO', 'dev')
+    LOG_AMOSTRAGEM = os.getenv('LOG_AMOSTRAGEM', 'DEBUG=0,INFO=0.1,SUCCESS=0.1')
+    IMPORTACAO_LINHAS_POR_BLOCO = int(os.getenv('IMPORTACAO_LINHAS_POR_BLOCO', 2000))
@@ -0,0 +1,139 @@
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+
+from app.core.metricas import consultas_db, rota_da_requisicao, tempo_db
+from app.logger import log_database_operation, restaurar_amostra, sortear_amostra
+
+# Lista de parâmetros de um IN expandido ou de um INSERT de várias linhas: "(?, ?, ?)"
+_PARAMETROS = re.compile(r"\((?:\s*\?\s*,)*\s*\?\s*\)")
+_VARIAS_LINHAS = re.compile(r"\(\?\.\.\.\)(?:\s*,\s*\(\?\.\.\.\))+")
+
+
+def forma_da_instrucao(instrucao: str) -> str:
+    """Instrução sem o que muda entre chamadas iguais (quantidade de parâmetros e espaços)."""
+    forma = _PARAMETROS.sub("(?...)", " ".join(instrucao.split()))
+    return _VARIAS_LINHAS.sub("(?...)", forma)
+
+
+class ConsultasDaRequisicao:
+    """
+    Instruções SQL executadas durante uma requisição: quantas, o tempo somado no banco e,
+    se `contar_formas`, quantas vezes cada forma de instrução apareceu (para achar N+1).
+    """
+    __slots__ = ("quantidade", "tempo", "formas")
+
+    def __init__(self, contar_formas: bool = False):
+        self.quantidade = 0
+        self.tempo = 0.0
+        self.formas: Optional[Counter] = Counter() if contar_formas else None
+
+    def registrar(self, instrucao: str, duracao: float) -> None:
+        self.quantidade += 1
+        self.tempo += duracao
+        if self.formas is not None:
+            self.formas[forma_da_instrucao(instrucao)] += 1
+
+    def repetidas(self, limite: int) -> List[Tuple[str, int]]:
+        if not self.formas:
+            return []
+        return [(forma, vezes) for forma, vezes in self.formas.most_common() if vezes > limite]
+
+
+# Contador da requisição em andamento. As unidades do escritor único e o greenlet do driver
+# assíncrono herdam o contexto de quem chamou, então as instruções delas entram na conta.
+_requisicao: ContextVar[Optional[ConsultasDaRequisicao]] = ContextVar("consultas_requisicao", default=None)
+
+
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    if _requisicao.get() is not None:
+        context._inicio_consulta = time.perf_counter()
+
+
+def _depois(conn, cursor, statement, parameters, context, executemany):
+    consultas = _requisicao.get()
+    inicio = getattr(context, "_inicio_consulta", None)
+    if consultas is not None and inicio is not None:
+        consultas.registrar(statement, time.perf_counter() - inicio)
+
+
+def instrumentar_engine(engine: AsyncEngine) -> None:
+    """Conta as instruções do engine na requisição em andamento (fora de uma, não faz nada)."""
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _antes):
+        event.listen(sync_engine, "before_cursor_execute", _antes)
+        event.listen(sync_engine, "after_cursor_execute", _depois)
+
+
+class ConsultasPorRequisicao:
+    """
+    Middleware ASGI: conta as instruções SQL e o tempo no banco de cada requisição HTTP,
+    devolve os números nos cabeçalhos X-DB-Consultas, X-DB-Tempo-Ms e Server-Timing e
+    registra um log estruturado ao final. Com `repetidas_max` > 0 (perfil dev), avisa
+    quando a mesma forma de instrução se repete mais que isso numa requisição.
+
+    O commit de get_session acontece antes da resposta começar, então entra nos cabeçalhos;
+    o que rodar depois (tarefas em segundo plano, respostas em streaming) só entra no log.
+    """
+
+    def __init__(self, app, repetidas_max: int = 0):
+        self.app = app
+        self.repetidas_max = repetidas_max
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        consultas = ConsultasDaRequisicao(contar_formas=self.repetidas_max > 0)
+        token = _requisicao.set(consultas)
+        # Amostragem de log da requisição inteira, inclusive deste resumo ao final
+        token_amostra = sortear_amostra()
+        resposta = {"status": 500}
+        inicio = time.perf_counter()
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                resposta["status"] = mensagem["status"]
+                tempo_ms = consultas.tempo * 1000
+                cabecalhos = MutableHeaders(scope=mensagem)
+                cabecalhos.append("X-DB-Consultas", str(consultas.quantidade))
+                cabecalhos.append("X-DB-Tempo-Ms", f"{tempo_ms:.2f}")
+                cabecalhos.append("Server-Timing", f'db;dur={tempo_ms:.2f};desc="{consultas.quantidade} consultas"')
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _requisicao.reset(token)
+            try:
+                self._registrar(scope, consultas, resposta["status"], time.perf_counter() - inicio)
+            finally:
+                restaurar_amostra(token_amostra)
+
+    def _registrar(self, scope, consultas: ConsultasDaRequisicao, status: int, duracao: float) -> None:
+        rota = rota_da_requisicao(scope)
+        consultas_db.inc(scope["method"], rota, valor=consultas.quantidade)
+        tempo_db.inc(scope["method"], rota, valor=consultas.tempo)
+        log = log_database_operation(
+            operation="consultas_requisicao",
+            http_method=scope["method"],
+            endpoint=scope["path"],
+            status=status,
+            consultas=consultas.quantidade,
+            tempo_db_ms=round(consultas.tempo * 1000, 2),
+            duracao_ms=round(duracao * 1000, 2),
+        )
+        log.info(
+            f"{scope['method']} {scope['path']}: {consultas.quantidade} consulta(s), "
+            f"{consultas.tempo * 1000:.1f} ms no banco de {duracao * 1000:.1f} ms"
+        )
+        for forma, vezes in consultas.repetidas(self.repetidas_max):
+            log.bind(forma=forma, repeticoes=vezes).warning(
+                f"Possível N+1 em {scope['method']} {scope['path']}: mesma instrução {vezes} vezes: {forma[:200]}"
+            )
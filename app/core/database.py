@@ -1,19 +1,74 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 from .config import Config
+from fastapi import Depends
+
+from .consultas import instrumentar_engine
+from .engine import configuracao_ativa, criar_engine_async, criar_engine_sync, em_memoria, obter_perfil
 from app.db.base import Base
 
-engine = create_async_engine(Config.DATABASE_URL, future=True, echo=True)
+# Perfil escolhido por DB_PERFIL (dev, prod, bench); os PRAGMAs valem para cada conexão nova
+perfil = obter_perfil(Config.DB_PERFIL)
+engine = criar_engine_async(Config.DATABASE_URL, perfil)
 AsyncSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
-sync_engine = create_engine(
-    Config.DATABASE_URL.replace('+aiosqlite', ''),  # usa sqlite:///
-    echo=False,
-    future=True,
-)
+# Leituras (dashboard e rotas GET): engine próprio com query_only e pool separado, e sessões
+# sem autoflush. Um banco em memória só existe na conexão do engine principal, que é reaproveitado.
+perfil_leitura = perfil.para_leitura()
+engine_leitura = engine if em_memoria(Config.DATABASE_URL) else criar_engine_async(Config.DATABASE_URL, perfil_leitura)
+AsyncSessionLeitura = sessionmaker(bind=engine_leitura, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+# Instruções por requisição (ver app/core/consultas.py)
+instrumentar_engine(engine)
+instrumentar_engine(engine_leitura)
+
+
+def criar_sync_engine() -> Engine:
+    """Engine síncrono para scripts (create_tables.py), com o mesmo perfil; criado sob demanda."""
+    return criar_engine_sync(Config.DATABASE_URL, perfil)
+
+
+async def configuracao_banco() -> Dict[str, Any]:
+    return {
+        "escrita": await configuracao_ativa(engine, perfil),
+        "leitura": await configuracao_ativa(engine_leitura, perfil_leitura),
+    }
+
+
+@asynccontextmanager
+async def unidade_de_trabalho(Session=AsyncSessionLocal) -> AsyncIterator[AsyncSession]:
+    """
+    Sessão com um único commit ao final do bloco, ou um único rollback se ele sair
+    por exceção. Os repositórios só fazem flush; quem abre a unidade confirma.
+    """
+    async with Session() as session:
+        try:
+            yield session
+        except BaseException:
+            await session.rollback()
+            raise
+        await session.commit()
 
 async def get_session():
-    async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+    # Usar com Depends(get_session, scope="function"): o commit acontece quando a rota
+    # retorna, antes da resposta ser enviada, e uma falha nele vira erro da requisição
+    async with unidade_de_trabalho() as session:
+        yield session
+
+
+async def get_session_leitura():
+    # Nada a confirmar: a sessão é fechada (e a transação de leitura desfeita) ao final
+    async with AsyncSessionLeitura() as session:
+        yield session
+
+
+def leitura(Repositorio):
+    """Dependência que monta o repositório sobre uma sessão somente leitura."""
+    def repositorio(db: AsyncSession = Depends(get_session_leitura, scope="function")):
+        return Repositorio(db)
+    return repositorio
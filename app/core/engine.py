@@ -0,0 +1,189 @@
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict
+
+from sqlalchemy import Engine, create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from .metricas import PoolMedido
+
+
+@dataclass(frozen=True)
+class PerfilEngine:
+    """
+    Ajustes de um engine: PRAGMAs aplicados em cada conexão SQLite nova, tamanho do pool,
+    cache de instruções compiladas e echo do SQL.
+    """
+    nome: str
+    pragmas: Dict[str, Any] = field(default_factory=dict)
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    pool_recycle: int = -1
+    compiled_cache_size: int = 500
+    echo: bool = False
+    # Aviso de N+1: mesma forma de instrução mais que isso numa requisição (0 desliga)
+    consultas_repetidas_max: int = 0
+    # Pool do engine de leitura (ver para_leitura)
+    leitura_pool_size: int = 5
+    leitura_max_overflow: int = 10
+
+    def kwargs_engine(self, url: str) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {"echo": self.echo, "query_cache_size": self.compiled_cache_size}
+        if _usa_pool(url):
+            kwargs.update(
+                pool_size=self.pool_size,
+                max_overflow=self.max_overflow,
+                pool_timeout=self.pool_timeout,
+                pool_recycle=self.pool_recycle,
+            )
+        return kwargs
+
+    def para_leitura(self) -> "PerfilEngine":
+        """
+        Mesmo perfil para o engine somente leitura: query_only impede qualquer escrita pela
+        conexão (o SQLite recusa com "attempt to write a readonly database") e o pool é o
+        de leitura.
+        """
+        return replace(
+            self,
+            nome=f"{self.nome}-leitura",
+            pragmas={**self.pragmas, "query_only": "ON"},
+            pool_size=self.leitura_pool_size,
+            max_overflow=self.leitura_max_overflow,
+        )
+
+
+# cache_size negativo é em KiB; mmap_size em bytes; busy_timeout em ms.
+# WAL deixa leitores e o escritor trabalharem ao mesmo tempo, e com ele synchronous=NORMAL
+# só faz fsync no checkpoint (uma queda de energia pode perder os últimos commits, nunca
+# corromper o banco). O perfil bench desliga o fsync de vez e não serve para dados reais.
+PERFIS: Dict[str, PerfilEngine] = {
+    "dev": PerfilEngine(
+        nome="dev",
+        pragmas={
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -16_000,
+            "temp_store": "DEFAULT",
+            "busy_timeout": 5_000,
+        },
+        echo=True,
+        consultas_repetidas_max=10,
+    ),
+    "prod": PerfilEngine(
+        nome="prod",
+        pragmas={
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -64_000,
+            "mmap_size": 256 * 2**20,
+            "temp_store": "MEMORY",
+            "busy_timeout": 5_000,
+        },
+        pool_size=10,
+        max_overflow=20,
+        pool_recycle=3600,
+        compiled_cache_size=1500,
+        leitura_pool_size=20,
+        leitura_max_overflow=20,
+    ),
+    "bench": PerfilEngine(
+        nome="bench",
+        pragmas={
+            "journal_mode": "WAL",
+            "synchronous": "OFF",
+            "cache_size": -256_000,
+            "mmap_size": 2**30,
+            "temp_store": "MEMORY",
+            "busy_timeout": 10_000,
+        },
+        pool_size=20,
+        max_overflow=0,
+        compiled_cache_size=2000,
+        leitura_pool_size=20,
+        leitura_max_overflow=0,
+    ),
+}
+
+
+def obter_perfil(nome: str) -> PerfilEngine:
+    try:
+        return PERFIS[nome]
+    except KeyError:
+        raise ValueError(f"Perfil de engine desconhecido: '{nome}' (opções: {', '.join(PERFIS)})") from None
+
+
+def em_memoria(url: str) -> bool:
+    u = make_url(url)
+    return u.get_backend_name() == "sqlite" and u.database in (None, "", ":memory:")
+
+
+def _usa_pool(url: str) -> bool:
+    # SQLite em memória usa StaticPool (uma conexão só), que não aceita os parâmetros de pool
+    return not em_memoria(url)
+
+
+def aplicar_pragmas(engine: Engine, pragmas: Dict[str, Any]) -> None:
+    """Executa os PRAGMAs em cada conexão que o pool abrir, antes de ela ser usada."""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _ao_conectar(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for nome, valor in pragmas.items():
+                cursor.execute(f"PRAGMA {nome}={valor}")
+        finally:
+            cursor.close()
+
+
+def criar_engine_async(url: str, perfil: PerfilEngine, **pragmas_extras) -> AsyncEngine:
+    kwargs = perfil.kwargs_engine(url)
+    if _usa_pool(url):
+        # Mesmo pool padrão, medindo a espera por conexão (métrica db_pool_espera_segundos)
+        kwargs.update(poolclass=PoolMedido, pool_logging_name=perfil.nome)
+    engine = create_async_engine(url, **kwargs)
+    aplicar_pragmas(engine.sync_engine, {**perfil.pragmas, **pragmas_extras})
+    return engine
+
+
+def criar_engine_sync(url: str, perfil: PerfilEngine) -> Engine:
+    # Mesmo banco pelo driver síncrono (sqlite:/// em vez de sqlite+aiosqlite:///)
+    url = url.replace("+aiosqlite", "")
+    engine = create_engine(url, **perfil.kwargs_engine(url))
+    aplicar_pragmas(engine, perfil.pragmas)
+    return engine
+
+
+async def configuracao_ativa(engine: AsyncEngine, perfil: PerfilEngine) -> Dict[str, Any]:
+    """
+    Configuração em vigor: perfil, pool e os PRAGMAs lidos de volta de uma conexão
+    (o SQLite pode recusar algum, por exemplo WAL em banco na memória).
+    """
+    pool = engine.pool
+    ativa: Dict[str, Any] = {
+        "perfil": perfil.nome,
+        "dialeto": engine.dialect.name,
+        "echo": engine.echo,
+        "compiled_cache_size": perfil.compiled_cache_size,
+        "pool": {
+            "classe": type(pool).__name__,
+            "status": pool.status(),
+        },
+    }
+    if _usa_pool(str(engine.url)):
+        ativa["pool"].update(
+            pool_size=perfil.pool_size,
+            max_overflow=perfil.max_overflow,
+            pool_timeout=perfil.pool_timeout,
+            pool_recycle=perfil.pool_recycle,
+        )
+    if engine.dialect.name == "sqlite":
+        async with engine.connect() as conn:
+            ativa["pragmas"] = {
+                nome: (await conn.execute(text(f"PRAGMA {nome}"))).scalar()
+                for nome in perfil.pragmas
+            }
+    return ativa
@@ -0,0 +1,155 @@
+import asyncio
+import contextvars
+import functools
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.logger import log_database_operation
+
+UnidadeEscrita = Callable[[AsyncSession], Awaitable[Any]]
+
+# Verdadeiro dentro da tarefa do escritor: chamadas aninhadas executam direto na sessão dele
+_no_escritor: ContextVar[bool] = ContextVar("no_escritor", default=False)
+
+
+class EscritorUnico:
+    """
+    Uma única tarefa grava no banco. Cada unidade de escrita (função que recebe a sessão)
+    entra numa fila; o escritor junta até `lote_max` unidades, executa cada uma num
+    SAVEPOINT próprio e confirma todas com um só commit (group commit). O futuro de cada
+    chamador só é resolvido depois desse commit: com o resultado da unidade, com a exceção
+    dela (só o SAVEPOINT dela é desfeito) ou com o erro do commit, se ele falhar.
+
+    Leituras continuam em sessões próprias e em paralelo; com WAL elas não esperam o escritor,
+    mas dividem o event loop com ele, então muita leitura simultânea alonga os lotes.
+    """
+
+    def __init__(self, Session, lote_max: int = 64, espera_max: float = 0.002):
+        self.Session = Session
+        self.lote_max = lote_max
+        self.espera_max = espera_max
+        self._fila: "asyncio.Queue[Tuple[UnidadeEscrita, asyncio.Future, contextvars.Context]]" = asyncio.Queue()
+        self._tarefa: Optional[asyncio.Task] = None
+        self.lotes = 0
+        self.unidades = 0
+        self.falhas = 0
+        self.maior_lote = 0
+
+    def iniciar(self) -> None:
+        if self._tarefa is None:
+            self._tarefa = asyncio.create_task(self._executar_lotes(), name="escritor-unico")
+
+    async def parar(self) -> None:
+        """Espera a fila esvaziar e encerra a tarefa."""
+        if self._tarefa is None:
+            return
+        await self._fila.join()
+        self._tarefa.cancel()
+        try:
+            await self._tarefa
+        except asyncio.CancelledError:
+            pass
+        self._tarefa = None
+
+    async def executar(self, unidade: UnidadeEscrita) -> Any:
+        """Enfileira a unidade e espera o commit do lote em que ela entrar."""
+        if self._tarefa is None:
+            raise RuntimeError("Escritor não iniciado")
+        futuro = asyncio.get_running_loop().create_future()
+        # A unidade roda com o contexto de quem chamou (amostragem de log, métricas da requisição)
+        await self._fila.put((unidade, futuro, contextvars.copy_context()))
+        return await futuro
+
+    async def _proximo_lote(self) -> List[Tuple[UnidadeEscrita, asyncio.Future, contextvars.Context]]:
+        lote = [await self._fila.get()]
+        # Dá uma janela curta para chegarem mais unidades antes de confirmar
+        if self._fila.qsize() < self.lote_max - 1:
+            await asyncio.sleep(self.espera_max)
+        while len(lote) < self.lote_max and not self._fila.empty():
+            lote.append(self._fila.get_nowait())
+        return lote
+
+    async def _executar_lotes(self) -> None:
+        log = log_database_operation(operation="escritor_unico")
+        while True:
+            lote = await self._proximo_lote()
+            resultados: List[Tuple[asyncio.Future, Any, Optional[BaseException]]] = []
+            try:
+                async with self.Session() as db:
+                    for unidade, futuro, contexto in lote:
+                        contexto.run(_no_escritor.set, True)
+                        try:
+                            async with db.begin_nested():
+                                resultado = await asyncio.create_task(unidade(db), context=contexto)
+                            resultados.append((futuro, resultado, None))
+                        except Exception as e:
+                            resultados.append((futuro, None, e))
+                    await db.commit()
+            except Exception as e:
+                log.error(f"Falha ao confirmar lote de {len(lote)} escrita(s): {e}")
+                resultados = [(futuro, None, erro or e) for futuro, _, erro in resultados]
+                resultados += [(futuro, None, e) for _, futuro, _ in lote[len(resultados):]]
+            finally:
+                for _ in lote:
+                    self._fila.task_done()
+
+            self.lotes += 1
+            self.unidades += len(lote)
+            self.maior_lote = max(self.maior_lote, len(lote))
+            for futuro, resultado, erro in resultados:
+                if futuro.done():
+                    continue
+                if erro is not None:
+                    self.falhas += 1
+                    futuro.set_exception(erro)
+                else:
+                    futuro.set_result(resultado)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ativo": self._tarefa is not None,
+            "fila": self._fila.qsize(),
+            "lotes": self.lotes,
+            "unidades": self.unidades,
+            "falhas": self.falhas,
+            "maior_lote": self.maior_lote,
+            "media_por_lote": self.unidades / self.lotes if self.lotes else 0.0,
+        }
+
+
+escritor: Optional[EscritorUnico] = None
+
+
+def ativar_escritor(Session, **opcoes) -> EscritorUnico:
+    global escritor
+    escritor = EscritorUnico(Session, **opcoes)
+    escritor.iniciar()
+    return escritor
+
+
+async def desativar_escritor() -> None:
+    global escritor
+    if escritor is not None:
+        await escritor.parar()
+        escritor = None
+
+
+def estado_escritor() -> Dict[str, Any]:
+    return escritor.stats() if escritor is not None else {"ativo": False}
+
+
+def escrita(metodo):
+    """
+    Marca um método de escrita de repositório. Sem escritor ativo (o padrão) ele roda na
+    sessão do próprio repositório; com escritor, roda como uma unidade do escritor, num
+    repositório do mesmo tipo criado sobre a sessão dele. O repositório precisa poder ser
+    construído só com a sessão.
+    """
+    @functools.wraps(metodo)
+    async def envolto(self, *args, **kwargs):
+        if escritor is None or _no_escritor.get():
+            return await metodo(self, *args, **kwargs)
+        return await escritor.executar(lambda db: metodo(type(self)(db), *args, **kwargs))
+    return envolto
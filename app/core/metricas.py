@@ -0,0 +1,258 @@
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+if TYPE_CHECKING:
+    from app.core.cache import ResponseCache
+
+# Formato de texto do Prometheus (exposição 0.0.4)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Segundos: de 1 ms a 10 s para requisições; a espera por conexão vai mais para baixo
+BUCKETS_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_ESPERA = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+Rotulos = Tuple[str, ...]
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_rotulos(nomes: Sequence[str], valores: Sequence[str], extra: str = "") -> str:
+    pares = [f'{nome}="{_escapar(str(valor))}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Metrica(ABC):
+    """Base das métricas: nome, ajuda, nomes dos rótulos e um valor por combinação de rótulos."""
+    tipo = "untyped"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+
+    @abstractmethod
+    def amostras(self) -> Iterable[str]:
+        """Linhas de amostra da métrica, já no formato de texto."""
+
+    def expor(self) -> str:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        linhas.extend(self.amostras())
+        return "\n".join(linhas)
+
+
+class Contador(Metrica):
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        super().__init__(nome, ajuda, rotulos)
+        self._valores: Dict[Rotulos, float] = {}
+
+    def inc(self, *rotulos: str, valor: float = 1) -> None:
+        self._valores[rotulos] = self._valores.get(rotulos, 0) + valor
+
+    def amostras(self) -> Iterable[str]:
+        for rotulos, valor in list(self._valores.items()):
+            yield f"{self.nome}{_formatar_rotulos(self.rotulos, rotulos)} {_numero(valor)}"
+
+
+class Medidor(Contador):
+    """Valor que sobe e desce (por exemplo, requisições em andamento)."""
+    tipo = "gauge"
+
+    def dec(self, *rotulos: str, valor: float = 1) -> None:
+        self.inc(*rotulos, valor=-valor)
+
+
+class Coletada(Metrica):
+    """
+    Métrica lida só na hora da coleta, de um estado que já existe (estatísticas do cache,
+    pool): `coletar` devolve [(rótulos, valor)].
+    """
+
+    def __init__(
+        self, nome: str, ajuda: str, rotulos: Sequence[str],
+        coletar: Callable[[], List[Tuple[Rotulos, float]]], tipo: str = "gauge",
+    ):
+        super().__init__(nome, ajuda, rotulos)
+        self.coletar = coletar
+        self.tipo = tipo
+
+    def amostras(self) -> Iterable[str]:
+        for rotulos, valor in self.coletar():
+            yield f"{self.nome}{_formatar_rotulos(self.rotulos, rotulos)} {_numero(valor)}"
+
+
+class Histograma(Metrica):
+    """
+    Contagens por faixa (buckets) com a soma e o total. Cada observação só incrementa a
+    faixa dela; as contagens acumuladas que o formato pede são montadas na coleta.
+    """
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = (), buckets: Sequence[float] = BUCKETS_LATENCIA):
+        super().__init__(nome, ajuda, rotulos)
+        self.buckets = tuple(sorted(buckets))
+        # rótulos -> [contagem por faixa (a última é +Inf), soma]
+        self._series: Dict[Rotulos, list] = {}
+
+    def observar(self, valor: float, *rotulos: str) -> None:
+        serie = self._series.get(rotulos)
+        if serie is None:
+            serie = self._series[rotulos] = [[0] * (len(self.buckets) + 1), 0.0]
+        serie[0][bisect_left(self.buckets, valor)] += 1
+        serie[1] += valor
+
+    def amostras(self) -> Iterable[str]:
+        limites = [_numero(b) for b in self.buckets] + ["+Inf"]
+        for rotulos, (contagens, soma) in list(self._series.items()):
+            acumulado = 0
+            for limite, contagem in zip(limites, contagens):
+                acumulado += contagem
+                le = f'le="{limite}"'
+                yield f"{self.nome}_bucket{_formatar_rotulos(self.rotulos, rotulos, le)} {acumulado}"
+            yield f"{self.nome}_sum{_formatar_rotulos(self.rotulos, rotulos)} {_numero(soma)}"
+            yield f"{self.nome}_count{_formatar_rotulos(self.rotulos, rotulos)} {acumulado}"
+
+
+class Registro:
+    def __init__(self):
+        self._metricas: Dict[str, Metrica] = {}
+
+    def registrar(self, metrica: Metrica) -> Metrica:
+        if metrica.nome in self._metricas:
+            raise ValueError(f"Métrica já registrada: '{metrica.nome}'")
+        self._metricas[metrica.nome] = metrica
+        return metrica
+
+    def expor(self) -> str:
+        return "\n".join(m.expor() for m in self._metricas.values()) + "\n"
+
+
+registro = Registro()
+
+requisicoes = registro.registrar(Contador(
+    "http_requisicoes_total", "Requisições HTTP concluídas.", ("metodo", "rota", "status")))
+duracao_requisicoes = registro.registrar(Histograma(
+    "http_requisicao_duracao_segundos", "Duração das requisições HTTP até o fim da resposta.", ("metodo", "rota")))
+em_andamento = registro.registrar(Medidor(
+    "http_requisicoes_em_andamento", "Requisições HTTP sendo atendidas agora.", ("metodo",)))
+erros = registro.registrar(Contador(
+    "http_erros_total", "Respostas 4xx/5xx e exceções não tratadas, por rota.", ("metodo", "rota", "classe")))
+consultas_db = registro.registrar(Contador(
+    "db_consultas_total", "Instruções SQL executadas durante requisições, por rota.", ("metodo", "rota")))
+tempo_db = registro.registrar(Contador(
+    "db_tempo_segundos_total", "Tempo gasto nas instruções SQL durante requisições, por rota.", ("metodo", "rota")))
+espera_pool = registro.registrar(Histograma(
+    "db_pool_espera_segundos", "Espera para obter uma conexão do pool (checkout), incluindo abrir uma nova.", ("pool",), BUCKETS_ESPERA))
+
+
+class PoolMedido(AsyncAdaptedQueuePool):
+    """Pool assíncrono padrão que mede a espera de cada checkout (rótulo: logging name do pool)."""
+
+    def connect(self):
+        inicio = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            espera_pool.observar(time.perf_counter() - inicio, self._orig_logging_name or "padrao")
+
+
+def registrar_caches(caches: Dict[str, "ResponseCache"]) -> None:
+    """Acertos, falhas e taxa de acerto de cada ResponseCache, lidos do stats() na coleta."""
+    def contagem(campo: str):
+        return lambda: [((nome,), cache.stats()[campo]) for nome, cache in caches.items()]
+
+    def taxa():
+        amostras = []
+        for nome, cache in caches.items():
+            stats = cache.stats()
+            total = stats["hits"] + stats["misses"]
+            amostras.append(((nome,), stats["hits"] / total if total else 0.0))
+        return amostras
+
+    registro.registrar(Coletada("cache_acertos_total", "Leituras servidas pelo cache.", ("cache",), contagem("hits"), "counter"))
+    registro.registrar(Coletada("cache_falhas_total", "Leituras que não estavam no cache.", ("cache",), contagem("misses"), "counter"))
+    registro.registrar(Coletada("cache_taxa_acerto", "Acertos / (acertos + falhas) desde o início.", ("cache",), taxa))
+    registro.registrar(Coletada("cache_entradas", "Entradas guardadas no cache.", ("cache",), contagem("size")))
+
+
+def registrar_pools(engines: Iterable[AsyncEngine]) -> None:
+    """Conexões em uso e paradas em cada pool, lidas na coleta (o pool muda a cada dispose)."""
+    engines = list({id(e): e for e in engines}.values())
+
+    def conexoes(metodo: str):
+        def coletar():
+            amostras = []
+            for engine in engines:
+                pool = engine.sync_engine.pool
+                if isinstance(pool, QueuePool):
+                    amostras.append(((pool._orig_logging_name or "padrao",), getattr(pool, metodo)()))
+            return amostras
+        return coletar
+
+    registro.registrar(Coletada("db_pool_conexoes_em_uso", "Conexões emprestadas pelo pool agora.", ("pool",), conexoes("checkedout")))
+    registro.registrar(Coletada("db_pool_conexoes_livres", "Conexões paradas no pool, prontas para uso.", ("pool",), conexoes("checkedin")))
+
+
+def rota_da_requisicao(scope) -> str:
+    # Modelo da rota ("/transacoes/{transacao_id}"), não o caminho, para os rótulos não explodirem
+    rota = scope.get("route")
+    return getattr(rota, "path", None) or "<sem rota>"
+
+
+class MetricasHTTP:
+    """
+    Middleware ASGI que alimenta as métricas HTTP: duração por rota (histograma), total por
+    status, erros por rota e requisições em andamento. O custo por requisição é algumas
+    operações em dicionários; a formatação do texto só acontece quando /metrics é lido.
+    """
+
+    def __init__(self, app, ignorar: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.ignorar = frozenset(ignorar)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.ignorar:
+            return await self.app(scope, receive, send)
+
+        metodo = scope["method"]
+        resposta = {"status": 500}
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                resposta["status"] = mensagem["status"]
+            await send(mensagem)
+
+        em_andamento.inc(metodo)
+        inicio = time.perf_counter()
+        excecao: Optional[BaseException] = None
+        try:
+            await self.app(scope, receive, enviar)
+        except BaseException as e:
+            excecao = e
+            raise
+        finally:
+            em_andamento.dec(metodo)
+            rota = rota_da_requisicao(scope)
+            status = resposta["status"]
+            duracao_requisicoes.observar(time.perf_counter() - inicio, metodo, rota)
+            requisicoes.inc(metodo, rota, str(status))
+            if excecao is not None:
+                erros.inc(metodo, rota, "excecao")
+            elif status >= 400:
+                erros.inc(metodo, rota, f"{status // 100}xx")
@@ -0,0 +1,75 @@
+"""subcategoria unica por categoria
+
+Revision ID: a9d3e5f7c214
+Revises: f2c8a4d6b1e7
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3e5f7c214'
+down_revision: Union[str, Sequence[str], None] = 'f2c8a4d6b1e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _mesclar_duplicadas(conn) -> None:
+    """
+    Antes de criar a restrição, funde subcategorias repetidas na mesma categoria
+    na de menor id, levando junto as transações e os totais do resumo mensal.
+    """
+    conn.execute(sa.text("""
+        CREATE TEMP TABLE subcategorias_duplicadas AS
+        SELECT s.id AS id, m.id_mantido AS id_mantido
+        FROM subcategorias s
+        JOIN (
+            SELECT categoria_id, subcategoria_nome, MIN(id) AS id_mantido
+            FROM subcategorias
+            GROUP BY categoria_id, subcategoria_nome
+            HAVING COUNT(*) > 1
+        ) m ON s.categoria_id = m.categoria_id AND s.subcategoria_nome = m.subcategoria_nome
+        WHERE s.id <> m.id_mantido
+    """))
+    conn.execute(sa.text("""
+        UPDATE transacoes
+        SET subcategoria_id = (
+            SELECT d.id_mantido FROM subcategorias_duplicadas d WHERE d.id = transacoes.subcategoria_id
+        )
+        WHERE subcategoria_id IN (SELECT id FROM subcategorias_duplicadas)
+    """))
+    conn.execute(sa.text("""
+        INSERT INTO resumo_mensal (ano, mes, natureza, tipo, categoria_id, subcategoria_id, total, quantidade)
+        SELECT r.ano, r.mes, r.natureza, r.tipo, r.categoria_id, d.id_mantido, r.total, r.quantidade
+        FROM resumo_mensal r
+        JOIN subcategorias_duplicadas d ON d.id = r.subcategoria_id
+        WHERE true
+        ON CONFLICT (ano, mes, natureza, tipo, categoria_id, subcategoria_id) DO UPDATE SET
+            total = total + excluded.total,
+            quantidade = quantidade + excluded.quantidade
+    """))
+    conn.execute(sa.text(
+        "DELETE FROM resumo_mensal WHERE subcategoria_id IN (SELECT id FROM subcategorias_duplicadas)"
+    ))
+    conn.execute(sa.text("DELETE FROM subcategorias WHERE id IN (SELECT id FROM subcategorias_duplicadas)"))
+    conn.execute(sa.text("DROP TABLE subcategorias_duplicadas"))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _mesclar_duplicadas(op.get_bind())
+
+    with op.batch_alter_table('subcategorias', schema=None) as batch_op:
+        batch_op.drop_index('ix_subcategorias_categoria_nome')
+        batch_op.create_index('ix_subcategorias_categoria_nome', ['categoria_id', 'subcategoria_nome'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('subcategorias', schema=None) as batch_op:
+        batch_op.drop_index('ix_subcategorias_categoria_nome')
+        batch_op.create_index('ix_subcategorias_categoria_nome', ['categoria_id', 'subcategoria_nome'], unique=False)
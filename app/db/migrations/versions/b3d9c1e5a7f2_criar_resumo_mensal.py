@@ -0,0 +1,62 @@
+"""criar resumo mensal
+
+Revision ID: b3d9c1e5a7f2
+Revises: f663715f5ec3
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d9c1e5a7f2'
+down_revision: Union[str, Sequence[str], None] = 'f663715f5ec3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Quantidade de ids de transações agregados por lote no backfill
+BACKFILL_CHUNK = 10_000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('resumo_mensal',
+    sa.Column('ano', sa.Integer(), nullable=False),
+    sa.Column('mes', sa.Integer(), nullable=False),
+    sa.Column('natureza', sa.String(), nullable=False),
+    sa.Column('tipo', sa.String(), nullable=False),
+    sa.Column('categoria_id', sa.Integer(), nullable=False),
+    sa.Column('subcategoria_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('quantidade', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['categoria_id'], ['categorias.id'], ),
+    sa.ForeignKeyConstraint(['subcategoria_id'], ['subcategorias.id'], ),
+    sa.PrimaryKeyConstraint('ano', 'mes', 'natureza', 'tipo', 'categoria_id', 'subcategoria_id')
+    )
+
+    # Backfill em lotes de ids para não montar um único GROUP BY sobre a tabela inteira
+    conn = op.get_bind()
+    max_id = conn.execute(sa.text("SELECT MAX(id) FROM transacoes")).scalar() or 0
+    backfill = sa.text("""
+        INSERT INTO resumo_mensal (ano, mes, natureza, tipo, categoria_id, subcategoria_id, total, quantidade)
+        SELECT CAST(strftime('%Y', data_transacao) AS INTEGER),
+               CAST(strftime('%m', data_transacao) AS INTEGER),
+               natureza, tipo, categoria_id, subcategoria_id,
+               SUM(valor), COUNT(*)
+        FROM transacoes
+        WHERE id > :inicio AND id <= :fim
+        GROUP BY 1, 2, 3, 4, 5, 6
+        ON CONFLICT (ano, mes, natureza, tipo, categoria_id, subcategoria_id) DO UPDATE SET
+            total = total + excluded.total,
+            quantidade = quantidade + excluded.quantidade
+    """)
+    for inicio in range(0, max_id, BACKFILL_CHUNK):
+        conn.execute(backfill, {'inicio': inicio, 'fim': inicio + BACKFILL_CHUNK})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('resumo_mensal')
@@ -0,0 +1,42 @@
+"""indices paginacao transacoes
+
+Revision ID: c7a2e4f81d06
+Revises: b3d9c1e5a7f2
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a2e4f81d06'
+down_revision: Union[str, Sequence[str], None] = 'b3d9c1e5a7f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDICES = {
+    'ix_transacoes_data_id': ['data_transacao', 'id'],
+    'ix_transacoes_tipo_data_id': ['tipo', 'data_transacao', 'id'],
+    'ix_transacoes_natureza_data_id': ['natureza', 'data_transacao', 'id'],
+    'ix_transacoes_forma_pagamento_data_id': ['forma_pagamento', 'data_transacao', 'id'],
+    'ix_transacoes_categoria_data_id': ['categoria_id', 'data_transacao', 'id'],
+    'ix_transacoes_subcategoria_data_id': ['subcategoria_id', 'data_transacao', 'id'],
+    'ix_transacoes_valor': ['valor'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('transacoes', schema=None) as batch_op:
+        for nome, colunas in INDICES.items():
+            batch_op.create_index(nome, colunas, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('transacoes', schema=None) as batch_op:
+        for nome in INDICES:
+            batch_op.drop_index(nome)
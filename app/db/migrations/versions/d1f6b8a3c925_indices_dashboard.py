@@ -0,0 +1,50 @@
+"""indices dashboard
+
+Revision ID: d1f6b8a3c925
+Revises: c7a2e4f81d06
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1f6b8a3c925'
+down_revision: Union[str, Sequence[str], None] = 'c7a2e4f81d06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('transacoes', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_transacoes_natureza_tipo_data',
+            ['natureza', 'tipo', 'data_transacao', 'categoria_id', 'subcategoria_id', 'valor'],
+            unique=False
+        )
+
+    with op.batch_alter_table('resumo_mensal', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_resumo_mensal_natureza_tipo_periodo',
+            ['natureza', 'tipo', 'ano', 'mes', 'categoria_id', 'subcategoria_id', 'total'],
+            unique=False
+        )
+
+    with op.batch_alter_table('subcategorias', schema=None) as batch_op:
+        batch_op.create_index('ix_subcategorias_categoria_nome', ['categoria_id', 'subcategoria_nome'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('subcategorias', schema=None) as batch_op:
+        batch_op.drop_index('ix_subcategorias_categoria_nome')
+
+    with op.batch_alter_table('resumo_mensal', schema=None) as batch_op:
+        batch_op.drop_index('ix_resumo_mensal_natureza_tipo_periodo')
+
+    with op.batch_alter_table('transacoes', schema=None) as batch_op:
+        batch_op.drop_index('ix_transacoes_natureza_tipo_data')
@@ -0,0 +1,72 @@
+"""valores em centavos
+
+Revision ID: e4b7d2a9f013
+Revises: d1f6b8a3c925
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7d2a9f013'
+down_revision: Union[str, Sequence[str], None] = 'd1f6b8a3c925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (tabela, coluna monetária, nullable, convertida com UPDATE)
+COLUNAS = [
+    ('transacoes', 'valor', False, True),
+    ('categorias', 'limite', True, True),
+    # Regravado a partir das transações já convertidas: arredondar a soma em reais não
+    # dá necessariamente a soma dos valores arredondados
+    ('resumo_mensal', 'total', False, False),
+]
+
+
+def reconstruir_resumo_mensal() -> None:
+    """Regrava o resumo mensal a partir das transações, como ResumoMensalRepository.reconstruir."""
+    op.execute('DELETE FROM resumo_mensal')
+    op.execute("""
+        INSERT INTO resumo_mensal (ano, mes, natureza, tipo, categoria_id, subcategoria_id, total, quantidade)
+        SELECT CAST(strftime('%Y', data_transacao) AS INTEGER),
+               CAST(strftime('%m', data_transacao) AS INTEGER),
+               natureza, tipo, categoria_id, subcategoria_id,
+               SUM(valor), COUNT(*)
+        FROM transacoes
+        GROUP BY 1, 2, 3, 4, 5, 6
+    """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for tabela, coluna, nullable, converter in COLUNAS:
+        if converter:
+            # Backfill: reais -> centavos inteiros, arredondando o ruído de float
+            op.execute(f'UPDATE {tabela} SET {coluna} = CAST(ROUND({coluna} * 100) AS INTEGER)')
+        with op.batch_alter_table(tabela, schema=None) as batch_op:
+            batch_op.alter_column(
+                coluna,
+                existing_type=sa.Float(),
+                type_=sa.Integer(),
+                existing_nullable=nullable
+            )
+    reconstruir_resumo_mensal()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for tabela, coluna, nullable, converter in COLUNAS:
+        with op.batch_alter_table(tabela, schema=None) as batch_op:
+            batch_op.alter_column(
+                coluna,
+                existing_type=sa.Integer(),
+                type_=sa.Float(),
+                existing_nullable=nullable
+            )
+        if converter:
+            op.execute(f'UPDATE {tabela} SET {coluna} = {coluna} / 100.0')
+    reconstruir_resumo_mensal()
@@ -0,0 +1,46 @@
+"""criar importacoes
+
+Revision ID: f2c8a4d6b1e7
+Revises: e4b7d2a9f013
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8a4d6b1e7'
+down_revision: Union[str, Sequence[str], None] = 'e4b7d2a9f013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'importacoes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('hash_arquivo', sa.String(), nullable=False),
+        sa.Column('arquivo', sa.String(), nullable=False),
+        sa.Column('formato', sa.String(), nullable=False),
+        sa.Column('linhas_processadas', sa.Integer(), nullable=False),
+        sa.Column('linhas_importadas', sa.Integer(), nullable=False),
+        sa.Column('linhas_rejeitadas', sa.Integer(), nullable=False),
+        sa.Column('concluida', sa.Boolean(), nullable=False),
+        sa.Column('data_criacao', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('data_atualizacao', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('hash_arquivo'),
+    )
+    with op.batch_alter_table('importacoes', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_importacoes_id'), ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('importacoes', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_importacoes_id'))
+    op.drop_table('importacoes')
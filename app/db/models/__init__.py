@@ -1,2 +1,4 @@
 from app.db.base import Base
 from .categoria import CategoriaORM, SubcategoriaORM
+from .resumo_mensal import ResumoMensalORM
+from .importacao import ImportacaoORM
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base
+from app.db.types import Centavos
 
 class CategoriaORM(Base):
     __tablename__ = 'categorias'
@@ -8,18 +9,23 @@ class CategoriaORM(Base):
     id = Column(Integer, primary_key=True, index=True)
     categoria_nome = Column(String, unique=True, nullable=False)
     natureza = Column(String, nullable=False)
-    limite = Column(Float, default=0)
+    limite = Column(Centavos, default=0)
     
+    # Sem carregamento implícito: cada consulta escolhe o que carregar (selectinload etc.)
     subcategorias = relationship(
         'SubcategoriaORM',
         back_populates='categoria',
         cascade='all, delete-orphan',
-        lazy='joined'
+        lazy='raise'
     )
 
 
 class SubcategoriaORM(Base):
     __tablename__ = 'subcategorias'
+    __table_args__ = (
+        # Uma subcategoria por nome em cada categoria (alvo do ON CONFLICT no get-or-create)
+        Index('ix_subcategorias_categoria_nome', 'categoria_id', 'subcategoria_nome', unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     subcategoria_nome = Column(String, nullable=False)
@@ -31,5 +37,5 @@ class SubcategoriaORM(Base):
     categoria = relationship(
         'CategoriaORM', 
         back_populates='subcategorias',
-        lazy='joined'
+        lazy='raise'
         )
\ No newline at end of file
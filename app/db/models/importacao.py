@@ -0,0 +1,21 @@
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, func
+from app.db.base import Base
+
+class ImportacaoORM(Base):
+    """
+    Progresso de uma importação de extrato. É atualizada na mesma transação de banco
+    de cada bloco gravado, então `linhas_processadas` sempre corresponde ao último
+    bloco confirmado e serve de ponto de retomada.
+    """
+    __tablename__ = "importacoes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    hash_arquivo = Column(String, unique=True, nullable=False)
+    arquivo = Column(String, nullable=False)
+    formato = Column(String, nullable=False)
+    linhas_processadas = Column(Integer, nullable=False, default=0)
+    linhas_importadas = Column(Integer, nullable=False, default=0)
+    linhas_rejeitadas = Column(Integer, nullable=False, default=0)
+    concluida = Column(Boolean, nullable=False, default=False)
+    data_criacao = Column(DateTime, server_default=func.now())
+    data_atualizacao = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.db.base import Base
+from app.db.types import Centavos
+
+class ResumoMensalORM(Base):
+    """
+    Totais mensais pré-agregados de transações, mantidos pelo TransacaoRepository
+    na mesma transação de banco de cada escrita.
+    """
+    __tablename__ = "resumo_mensal"
+    __table_args__ = (
+        # gastos/entradas por categoria em meses inteiros: natureza + tipo + (ano, mes)
+        Index(
+            "ix_resumo_mensal_natureza_tipo_periodo",
+            "natureza", "tipo", "ano", "mes", "categoria_id", "subcategoria_id", "total",
+        ),
+    )
+
+    ano = Column(Integer, primary_key=True)
+    mes = Column(Integer, primary_key=True)
+    natureza = Column(String, primary_key=True)
+    tipo = Column(String, primary_key=True)
+    categoria_id = Column(Integer, ForeignKey("categorias.id"), primary_key=True)
+    subcategoria_id = Column(Integer, ForeignKey("subcategorias.id"), primary_key=True)
+    total = Column(Centavos, nullable=False, default=0)
+    quantidade = Column(Integer, nullable=False, default=0)
@@ -1,15 +1,31 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.db.base import Base
+from app.db.types import Centavos
 from uuid import uuid4
 
 class TransacaoORM(Base):
     __tablename__ = "transacoes"
+    __table_args__ = (
+        # Paginação por cursor em (data_transacao, id), com e sem filtro de igualdade
+        Index("ix_transacoes_data_id", "data_transacao", "id"),
+        Index("ix_transacoes_tipo_data_id", "tipo", "data_transacao", "id"),
+        Index("ix_transacoes_natureza_data_id", "natureza", "data_transacao", "id"),
+        Index("ix_transacoes_forma_pagamento_data_id", "forma_pagamento", "data_transacao", "id"),
+        Index("ix_transacoes_categoria_data_id", "categoria_id", "data_transacao", "id"),
+        Index("ix_transacoes_subcategoria_data_id", "subcategoria_id", "data_transacao", "id"),
+        Index("ix_transacoes_valor", "valor"),
+        # Agregações do dashboard: natureza + tipo + período, cobrindo as colunas somadas
+        Index(
+            "ix_transacoes_natureza_tipo_data",
+            "natureza", "tipo", "data_transacao", "categoria_id", "subcategoria_id", "valor",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     group_id = Column(UUID(as_uuid=True), nullable=False, default=uuid4, index=True)
-    valor = Column(Float, nullable=False)
+    valor = Column(Centavos, nullable=False)
     descricao = Column(String, nullable=False)
     parcela = Column(Integer)
     total_parcelas = Column(Integer)
@@ -25,5 +41,6 @@ class TransacaoORM(Base):
     categoria_id = Column(Integer, ForeignKey("categorias.id"), nullable=False)
     subcategoria_id = Column(Integer, ForeignKey("subcategorias.id"), nullable=False)
 
-    categoria = relationship("CategoriaORM", lazy="joined")
-    subcategoria = relationship("SubcategoriaORM", lazy="joined")
+    # Sem carregamento implícito: as leituras projetam as colunas que precisam
+    categoria = relationship("CategoriaORM", lazy="raise")
+    subcategoria = relationship("SubcategoriaORM", lazy="raise")
@@ -1,23 +1,50 @@
 # app/db/repositories/categoria.py
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update as sql_update
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 
+from app.core.cache import categorias_cache
 from app.core.database import get_session
-from app.db.models.categoria import CategoriaORM
+from app.core.escritor import escrita
+from app.db.models.categoria import CategoriaORM, SubcategoriaORM
 from app.db.repositories.subcategoria import SubcategoriaRepository
 from app.schemas.categorias import CategoriaCreate, CategoriaUpdate
-from app.logger import log_database_operation
+from app.logger import Preguicoso, log_database_operation
+
+class MapaCategorias:
+    """
+    Retrato das tabelas categorias/subcategorias reduzido a IDs, usado para resolver
+    categoria e subcategoria das transações sem consultar o banco a cada escrita.
+    """
+
+    def __init__(self, categorias: List[Tuple[int, str]], subcategorias: List[Tuple[int, int, str]]):
+        self.categoria_por_nome: Dict[str, int] = {nome: cid for cid, nome in categorias}
+        self.categorias_ids = {cid for cid, _ in categorias}
+        self.subcategoria_por_nome: Dict[Tuple[int, str], int] = {}
+        self.categoria_da_subcategoria: Dict[int, int] = {}
+        for sid, cid, nome in subcategorias:
+            self.subcategoria_por_nome[(cid, nome)] = sid
+            self.categoria_da_subcategoria[sid] = cid
+
+    def conhece(self, categoria_id: Optional[int] = None, subcategoria_id: Optional[int] = None) -> bool:
+        """Se os ids informados (None é ignorado) estão no retrato."""
+        return (
+            (categoria_id is None or categoria_id in self.categorias_ids)
+            and (subcategoria_id is None or subcategoria_id in self.categoria_da_subcategoria)
+        )
+
 
 class CategoriaRepository:
     """
     Repositório para operações CRUD de Categoria e sincronização de Subcategoria.
     """
 
-    def __init__(self, db: AsyncSession = Depends(get_session)):
+    def __init__(self, db: AsyncSession = Depends(get_session, scope="function")):
         self.db = db
         self.model = CategoriaORM
         self.sub_repo = SubcategoriaRepository(db)
@@ -29,30 +56,71 @@ class CategoriaRepository:
     async def get_by_nome(self, nome: str) -> Optional[CategoriaORM]:
         result = await self.db.execute(select(self.model).where(self.model.categoria_nome == nome))
         return result.scalars().first()
+
+    async def get_or_create_id(self, nome: str, natureza: str) -> int:
+        """
+        Id da categoria `nome`, criando-a com limite 0 se não existir, num único
+        INSERT ... ON CONFLICT. Não faz commit: a categoria nova é confirmada junto
+        com a escrita de quem chamou.
+        """
+        stmt = insert(self.model).values(categoria_nome=nome, natureza=natureza, limite=0)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.categoria_nome],
+            # Atualização sem efeito, só para o RETURNING devolver também a linha existente
+            set_={"categoria_nome": stmt.excluded.categoria_nome},
+        ).returning(self.model.id)
+        return await self.db.scalar(stmt)
+
+    async def mapa_ids(
+        self, categoria_id: Optional[int] = None, subcategoria_id: Optional[int] = None
+    ) -> MapaCategorias:
+        """
+        Mapa nome -> id de categorias e subcategorias, compartilhado pelo processo e
+        descartado a cada escrita confirmada (ou desfeita) nessas tabelas.
+
+        O cache só vê as escritas deste processo: se `categoria_id` ou `subcategoria_id`
+        não estiverem no mapa (podem ter sido criados por outro worker ou pelo
+        importar_extrato.py), ele é recarregado do banco uma vez antes de ser devolvido.
+        """
+        async def carregar() -> MapaCategorias:
+            categorias = await self.db.execute(select(self.model.id, self.model.categoria_nome))
+            subcategorias = await self.db.execute(
+                select(SubcategoriaORM.id, SubcategoriaORM.categoria_id, SubcategoriaORM.subcategoria_nome)
+            )
+            return MapaCategorias(categorias.all(), subcategorias.all())
+
+        if self.db.info.get("categorias_alteradas"):
+            # A sessão tem escritas não confirmadas nessas tabelas: não publica o que enxerga
+            return await carregar()
+        chave = categorias_cache.key("mapa_ids")
+        mapa = await categorias_cache.get_or_compute(chave, carregar)
+        if not mapa.conhece(categoria_id, subcategoria_id):
+            categorias_cache.invalidate()
+            mapa = await categorias_cache.get_or_compute(chave, carregar)
+        return mapa
     
+    @escrita
     async def create(self, obj_in: CategoriaCreate) -> CategoriaORM:
         """
         Insere uma nova categoria e suas subcategorias (se houver).
         Lança HTTPException em caso de erro de unicidade.
         """
-        log = log_database_operation(operation="create", collection="categorias", payload=obj_in.model_dump())
+        log = log_database_operation(operation="create", collection="categorias", payload=Preguicoso(obj_in.model_dump))
         try:
             instance = self.model(**obj_in.model_dump(exclude={"subcategorias"}))
             self.db.add(instance)
-            await self.db.commit()
+            await self.db.flush()
             await self.db.refresh(instance)
 
             if obj_in.subcategorias:
                 await self.sub_repo.create_many(instance.id, obj_in.subcategorias)
 
             # Recarrega categoria completa
-            result = await self.db.execute(select(self.model).where(self.model.id == instance.id))
-            categoria = result.scalars().first()
+            categoria = await self._carregar(instance.id)
             log.info(f"Categoria {categoria.id} criada")
             return categoria
 
         except IntegrityError as e:
-            await self.db.rollback()
             if "categorias.categoria_nome" in str(e):
                 log.error("Violação de unicidade em categoria_nome")
                 raise HTTPException(
@@ -70,18 +138,24 @@ class CategoriaRepository:
         Recupera todas as categorias, incluindo subcategorias.
         """
         log = log_database_operation(operation="read_all", collection="categorias")
-        stmt = select(self.model).order_by(self.model.categoria_nome)
+        stmt = (
+            select(self.model)
+            .options(selectinload(self.model.subcategorias))
+            .order_by(self.model.categoria_nome)
+        )
         result = await self.db.execute(stmt)
-        categorias = result.unique().scalars().all()
+        categorias = result.scalars().all()
         log.info(f"{len(categorias)} categorias recuperadas")
         return categorias
 
     async def get_by_id(self, id: int) -> Optional[CategoriaORM]:
         """
-        Busca uma categoria pelo ID.
+        Busca uma categoria pelo ID, com as subcategorias.
         """
         log = log_database_operation(operation="read", collection="categorias", categoria_id=id)
-        result = await self.db.execute(select(self.model).where(self.model.id == id))
+        result = await self.db.execute(
+            select(self.model).options(selectinload(self.model.subcategorias)).where(self.model.id == id)
+        )
         categoria = result.scalars().first()
         if categoria:
             log.info(f"Categoria {id} encontrada")
@@ -89,6 +163,7 @@ class CategoriaRepository:
             log.warning(f"Categoria {id} não encontrada")
         return categoria
 
+    @escrita
     async def update(self, id: int, obj_in: CategoriaUpdate) -> Optional[CategoriaORM]:
         categoria = await self.get_by_id(id)
         if not categoria:
@@ -110,7 +185,7 @@ class CategoriaRepository:
         base = obj_in.model_dump(exclude_unset=True, exclude={"subcategorias"})
         for field, val in base.items():
             setattr(categoria, field, val)
-        await self.db.commit()
+        await self.db.flush()
 
         # 3) Sincroniza subcategorias sem deletar as existentes
         incoming = obj_in.subcategorias or []
@@ -126,9 +201,19 @@ class CategoriaRepository:
             await self.sub_repo.create_many(categoria.id, new_subs)
 
         # 4) Recarrega e retorna
-        await self.db.refresh(categoria)
-        return categoria
+        return await self._carregar(categoria.id)
+
+    async def _carregar(self, id: int) -> Optional[CategoriaORM]:
+        """Relê a categoria e suas subcategorias, sobrescrevendo o que a sessão já tinha."""
+        result = await self.db.execute(
+            select(self.model)
+            .options(selectinload(self.model.subcategorias))
+            .where(self.model.id == id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().first()
 
+    @escrita
     async def delete(self, id: int) -> Optional[CategoriaORM]:
         """
         Remove uma categoria pelo ID.
@@ -138,6 +223,6 @@ class CategoriaRepository:
         if not categoria:
             return None
         await self.db.delete(categoria)
-        await self.db.commit()
+        await self.db.flush()
         log.info(f"Categoria {id} excluída")
         return categoria
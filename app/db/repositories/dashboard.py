@@ -1,13 +1,15 @@
 # app/db/repositories/dashboard.py
 
 import calendar
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any, Tuple
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import case, select, func, tuple_
 from app.db.models.transacao import TransacaoORM
-from app.db.models.categoria import CategoriaORM
+from app.db.models.categoria import CategoriaORM, SubcategoriaORM
+from app.db.models.resumo_mensal import ResumoMensalORM
+from app.db.repositories.resumo_mensal import meses_completos
+from app.db.types import de_centavos, para_centavos
 from app.schemas.dashboard import CategoriaOpcao, EntradasPorCategoriaResponse, ExtratoResponse, OpcoesCategoriaResponse, RendimentoPeriodoResponse, SubcategoriaOpcao, TipoTrans, TransacaoExtrato
 from app.schemas.transacao import NaturezaTransacao, TransacaoResponse
 
@@ -15,6 +17,45 @@ class DashboardRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    def _fonte_agregada(self, data_inicio: datetime, data_final: datetime):
+        """
+        Escolhe de onde somar os valores: resumo_mensal quando o período cobre meses
+        inteiros, senão a própria tabela de transações.
+        Retorna (modelo, coluna de valor, filtros de período).
+        """
+        periodo = meses_completos(data_inicio, data_final)
+        if periodo:
+            r = ResumoMensalORM
+            inicio, fim = periodo
+            # Comparação por row value para usar o índice em (ano, mes)
+            return r, r.total, [tuple_(r.ano, r.mes).between(tuple_(*inicio), tuple_(*fim))]
+        t = TransacaoORM
+        return t, t.valor, [t.data_transacao >= data_inicio, t.data_transacao <= data_final]
+
+    async def meta_mensal(self) -> float:
+        """Limite da categoria de id 1, usado como meta mensal nos painéis."""
+        limite = await self.db.scalar(select(CategoriaORM.limite).where(CategoriaORM.id == 1))
+        return limite or 0.0
+
+    async def totais_periodo(
+        self,
+        data_inicio: datetime,
+        data_final: datetime,
+        natureza: str
+    ) -> Tuple[float, float]:
+        """Total de entradas e saídas no período, somados no banco."""
+        fonte, valor, periodo = self._fonte_agregada(data_inicio, data_final)
+        stmt = (
+            select(
+                func.sum(case((fonte.tipo == "entrada", valor), else_=0)),
+                func.sum(case((fonte.tipo == "saida", valor), else_=0)),
+            )
+            .where(*periodo)
+            .where(fonte.natureza == natureza)
+        )
+        entradas, saidas = (await self.db.execute(stmt)).one()
+        return entradas or 0.0, saidas or 0.0
+
     async def gastos_por_categoria(
         self,
         data_inicio: datetime,
@@ -22,37 +63,37 @@ class DashboardRepository:
         natureza: str,
         tipo: TipoTrans,
     ) -> List[Dict[str, Any]]:
+        # Agrega direto no banco: uma linha por (categoria, subcategoria), com o total
+        # da categoria já somado em centavos pela window function
+        fonte, valor, periodo = self._fonte_agregada(data_inicio, data_final)
         stmt = (
-            select(TransacaoORM)
-            .where(TransacaoORM.data_transacao >= data_inicio)
-            .where(TransacaoORM.data_transacao <= data_final)
-            .where(TransacaoORM.natureza == NaturezaTransacao(natureza))
-            .where(TransacaoORM.tipo == tipo.value)
-            .options(
-                selectinload(TransacaoORM.categoria),
-                selectinload(TransacaoORM.subcategoria),
+            select(
+                CategoriaORM.id,
+                CategoriaORM.categoria_nome,
+                CategoriaORM.limite,
+                SubcategoriaORM.subcategoria_nome,
+                func.sum(valor),
+                func.sum(func.sum(valor)).over(partition_by=CategoriaORM.id),
             )
+            .select_from(fonte)
+            .join(CategoriaORM, fonte.categoria_id == CategoriaORM.id)
+            .join(SubcategoriaORM, fonte.subcategoria_id == SubcategoriaORM.id)
+            .where(*periodo)
+            .where(fonte.natureza == NaturezaTransacao(natureza))
+            .where(fonte.tipo == tipo.value)
+            .group_by(CategoriaORM.id, SubcategoriaORM.subcategoria_nome)
+            .order_by(CategoriaORM.categoria_nome, SubcategoriaORM.subcategoria_nome)
         )
 
         result = await self.db.execute(stmt)
-        transacoes = result.unique().scalars().all()
 
         gastos: Dict[int, Dict[str, Any]] = {}
-        for t in transacoes:
-            if not t.categoria or not t.subcategoria:
-                continue
-            cid = t.categoria.id
-            cat_nome = t.categoria.categoria_nome
-            sub_nome = t.subcategoria.subcategoria_nome
-            limite = t.categoria.limite
-
+        for cid, cat_nome, limite, sub_nome, soma, total in result.all():
             cat = gastos.setdefault(
                 cid,
-                {"nome": cat_nome, "total": 0.0, "limite": limite, "subcategorias": {}},
+                {"nome": cat_nome, "total": total, "limite": limite, "subcategorias": {}},
             )
-            cat["total"] += t.valor
-            cat["subcategorias"].setdefault(sub_nome, 0.0)
-            cat["subcategorias"][sub_nome] += t.valor
+            cat["subcategorias"][sub_nome] = soma
 
         resultado = []
         for data in gastos.values():
@@ -60,10 +101,10 @@ class DashboardRepository:
                 resultado.append(
                     {
                         "nome": data["nome"],
-                        "total": round(data["total"], 2),
+                        "total": data["total"],
                         "limite": data["limite"],
                         "subcategorias": [
-                            {"nome": sn, "valor": f"{round(v,2):.2f}"}
+                            {"nome": sn, "valor": f"{v:.2f}"}
                             for sn, v in data["subcategorias"].items()
                         ],
                     }
@@ -71,43 +112,46 @@ class DashboardRepository:
 
         return resultado
 
-    async def rendimento_por_periodo(
-        self, 
+    async def meses_rendimento(
+        self,
         ano: int,
-        natureza: str) -> Dict[str, Dict[str, float]]:
-
-        meses_data: Dict[str, Dict[str, float]] = {}
-
-        for m in range(1, 13):
-            first = datetime(ano, m, 1)
-            last_day = calendar.monthrange(ano, m)[1]
-            last = datetime(ano, m, last_day, 23, 59, 59)
+        natureza: str,
+        meses: range = range(1, 13)) -> Dict[str, Dict[str, float]]:
 
-            stmt = (
-                select(TransacaoORM)
-                .where(TransacaoORM.data_transacao >= first)
-                .where(TransacaoORM.data_transacao <= last)
-                .where(TransacaoORM.natureza == natureza)
+        # Uma única consulta ao resumo mensal, com somas condicionais por tipo
+        r = ResumoMensalORM
+        stmt = (
+            select(
+                r.mes,
+                func.sum(case((r.tipo == "entrada", r.total), else_=0)),
+                func.sum(case((r.tipo == "saida", r.total), else_=0)),
             )
+            .where(r.ano == ano)
+            .where(r.mes.between(meses[0], meses[-1]))
+            .where(r.natureza == natureza)
+            .group_by(r.mes)
+        )
 
-            result = await self.db.execute(stmt)
-            transacoes = result.unique().scalars().all()
-
-            entradas = sum(t.valor for t in transacoes if t.tipo == "entrada")
-            saidas = sum(t.valor for t in transacoes if t.tipo == "saida")
+        result = await self.db.execute(stmt)
+        totais = {int(m): (entradas, saidas) for m, entradas, saidas in result.all()}
 
+        meses_data: Dict[str, Dict[str, float]] = {}
+        for m in meses:
+            entradas, saidas = totais.get(m, (0.0, 0.0))
             meses_data[calendar.month_name[m].lower()] = {
-                "entrada": round(entradas, 2),
-                "saida": round(saidas, 2),
+                "entrada": entradas,
+                "saida": saidas,
             }
+        return meses_data
 
-        mensal_cat = await self.db.execute(
-            select(CategoriaORM)
-            .where(CategoriaORM.id == 1)
-        )
+    async def rendimento_por_periodo(
+        self, 
+        ano: int,
+        natureza: str,
+        meses: range = range(1, 13)) -> RendimentoPeriodoResponse:
 
-        mensal_obj = mensal_cat.scalars().first()
-        limite_mensal = mensal_obj.limite if mensal_obj else 0.0
+        meses_data = await self.meses_rendimento(ano, natureza, meses)
+        limite_mensal = await self.meta_mensal()
 
         return RendimentoPeriodoResponse(limite=limite_mensal, meses=meses_data)
     
@@ -119,49 +163,13 @@ class DashboardRepository:
         data_inicio_str: str,
         data_final_str: str
     ) -> ExtratoResponse:
-        stmt = (
-            select(TransacaoORM)
-            .where(TransacaoORM.data_transacao >= data_inicio)
-            .where(TransacaoORM.data_transacao <= data_final)
-            .where(TransacaoORM.natureza == natureza)
-            .options(
-                selectinload(TransacaoORM.categoria),
-                selectinload(TransacaoORM.subcategoria)
-            )
-            .order_by(TransacaoORM.data_transacao.desc())
-        )
-        result = await self.db.execute(stmt)
-        transacoes = result.unique().scalars().all()
-    
-        entradas = sum(t.valor for t in transacoes if t.tipo == "entrada")
-        saidas = sum(t.valor for t in transacoes if t.tipo == "saida")
-    
-        txs = [
-            TransacaoExtrato(
-                id=t.id,
-                valor=t.valor,
-                descricao=t.descricao,
-                parcela=t.parcela,
-                total_parcelas=t.total_parcelas,
-                data_transacao=t.data_transacao,
-                tipo=t.tipo,
-                natureza_transacao=t.natureza,
-                forma_pagamento=t.forma_pagamento,
-                categoria=t.categoria.categoria_nome if t.categoria else "",
-                subcategoria=t.subcategoria.subcategoria_nome if t.subcategoria else "",
-                data_criacao=t.data_criacao,
-                data_atualizacao=t.data_atualizacao,
-            )
-            for t in transacoes
-        ]
-    
-        mensal_cat = await self.db.execute(
-            select(CategoriaORM)
-            .where(CategoriaORM.id == 1)
-        )
+        result = await self.db.execute(self._consulta_extrato(data_inicio, data_final, natureza))
+        txs = [TransacaoExtrato(**row) for row in result.mappings()]
 
-        mensal_obj = mensal_cat.scalars().first()
-        limite_mensal = mensal_obj.limite if mensal_obj else 0.0
+        entradas = de_centavos(sum(para_centavos(t.valor) for t in txs if t.tipo == "entrada"))
+        saidas = de_centavos(sum(para_centavos(t.valor) for t in txs if t.tipo == "saida"))
+    
+        limite_mensal = await self.meta_mensal()
     
         return ExtratoResponse(
             entradas=entradas,
@@ -173,31 +181,71 @@ class DashboardRepository:
             transacoes=txs
         )
 
+    async def stream_extrato(
+        self,
+        data_inicio: datetime,
+        data_final: datetime,
+        natureza: str,
+        yield_per: int = 500
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Percorre as transações do extrato à medida que são lidas do banco (server-side),
+        sem montar a lista completa em memória. Cada item tem os campos de TransacaoExtrato.
+        """
+        stmt = self._consulta_extrato(data_inicio, data_final, natureza).execution_options(yield_per=yield_per)
+        result = await self.db.stream(stmt)
+        async for row in result.mappings():
+            yield row
+
+    @staticmethod
+    def _consulta_extrato(data_inicio: datetime, data_final: datetime, natureza: str):
+        """Só as colunas de TransacaoExtrato, com os nomes de categoria/subcategoria por join."""
+        return (
+            select(
+                TransacaoORM.id,
+                TransacaoORM.valor,
+                TransacaoORM.descricao,
+                TransacaoORM.parcela.label("parcelas"),
+                TransacaoORM.total_parcelas,
+                TransacaoORM.data_transacao,
+                TransacaoORM.tipo,
+                TransacaoORM.natureza.label("natureza_transacao"),
+                TransacaoORM.forma_pagamento,
+                func.coalesce(CategoriaORM.categoria_nome, "").label("categoria"),
+                func.coalesce(SubcategoriaORM.subcategoria_nome, "").label("subcategoria"),
+                TransacaoORM.data_criacao,
+                TransacaoORM.data_atualizacao,
+            )
+            .outerjoin(CategoriaORM, TransacaoORM.categoria_id == CategoriaORM.id)
+            .outerjoin(SubcategoriaORM, TransacaoORM.subcategoria_id == SubcategoriaORM.id)
+            .where(TransacaoORM.data_transacao >= data_inicio)
+            .where(TransacaoORM.data_transacao <= data_final)
+            .where(TransacaoORM.natureza == natureza)
+            .order_by(TransacaoORM.data_transacao.desc())
+        )
+
     async def opcoes_categorias(self, natureza: str = 'all') -> OpcoesCategoriaResponse:
-        stmt = select(CategoriaORM).options(
-            selectinload(CategoriaORM.subcategorias)
+        # Uma consulta só com ids e nomes; as linhas de cada categoria vêm juntas pela ordenação
+        stmt = (
+            select(
+                CategoriaORM.id,
+                CategoriaORM.categoria_nome,
+                SubcategoriaORM.id,
+                SubcategoriaORM.subcategoria_nome,
+            )
+            .outerjoin(SubcategoriaORM, SubcategoriaORM.categoria_id == CategoriaORM.id)
+            .order_by(CategoriaORM.id, SubcategoriaORM.subcategoria_nome)
         )
         if natureza != 'all':
             stmt = stmt.where(CategoriaORM.natureza == NaturezaTransacao(natureza))
         result = await self.db.execute(stmt)
-        categorias = result.unique().scalars().all()
 
         opcoes: List[CategoriaOpcao] = []
-        for categoria in categorias:
-            subs = [
-                SubcategoriaOpcao(
-                    id=sub.id,
-                    nome=sub.subcategoria_nome
-                )
-                for sub in categoria.subcategorias
-            ]
-            opcoes.append(
-                CategoriaOpcao(
-                    id=categoria.id,
-                    categoria=categoria.categoria_nome,
-                    subcategorias=subs
-                )
-            )
+        for cid, cat_nome, sub_id, sub_nome in result.all():
+            if not opcoes or opcoes[-1].id != cid:
+                opcoes.append(CategoriaOpcao(id=cid, categoria=cat_nome, subcategorias=[]))
+            if sub_id is not None:
+                opcoes[-1].subcategorias.append(SubcategoriaOpcao(id=sub_id, nome=sub_nome))
 
         return OpcoesCategoriaResponse(opcoes=opcoes)
 
@@ -210,47 +258,41 @@ class DashboardRepository:
         data_final_str: str
     ) -> EntradasPorCategoriaResponse:
         
-        # Buscar todas as categorias
-        stmt_categorias = select(CategoriaORM)
-        result = await self.db.execute(stmt_categorias)
-        categorias = result.unique().scalars().all()
-        
-        output: List[Dict[str, Any]] = []
-        
-        for categoria in categorias:
-            # Buscar transações de entrada para esta categoria
-            stmt_transacoes = (
-                select(TransacaoORM)
-                .where(TransacaoORM.data_transacao >= data_inicio)
-                .where(TransacaoORM.data_transacao <= data_final)
-                .where(TransacaoORM.natureza == natureza)
-                .where(TransacaoORM.categoria_id == categoria.id)
-                .where(TransacaoORM.tipo == "entrada")
-                .options(selectinload(TransacaoORM.subcategoria))
+        # Uma única agregação: só retornam categorias que tiveram entradas
+        fonte, valor, periodo = self._fonte_agregada(data_inicio, data_final)
+        stmt = (
+            select(
+                CategoriaORM.id,
+                CategoriaORM.categoria_nome,
+                SubcategoriaORM.subcategoria_nome,
+                func.sum(valor),
+                func.sum(func.sum(valor)).over(partition_by=CategoriaORM.id),
             )
-            
-            result_trans = await self.db.execute(stmt_transacoes)
-            transacoes = result_trans.unique().scalars().all()
-            
-            subs: Dict[str, float] = {}
-            total = 0.0
-            
-            for transacao in transacoes:
-                valor = transacao.valor
-                total += valor
-                
-                if transacao.subcategoria:
-                    sub_nome = transacao.subcategoria.subcategoria_nome
-                    subs.setdefault(sub_nome, 0.0)
-                    subs[sub_nome] += valor
-            
+            .select_from(fonte)
+            .join(CategoriaORM, fonte.categoria_id == CategoriaORM.id)
+            .join(SubcategoriaORM, fonte.subcategoria_id == SubcategoriaORM.id)
+            .where(*periodo)
+            .where(fonte.natureza == natureza)
+            .where(fonte.tipo == "entrada")
+            .group_by(CategoriaORM.id, SubcategoriaORM.subcategoria_nome)
+            .order_by(CategoriaORM.id)
+        )
+        result = await self.db.execute(stmt)
+
+        categorias: Dict[int, Dict[str, Any]] = {}
+        for cid, cat_nome, sub_nome, soma, total in result.all():
+            cat = categorias.setdefault(cid, {"nome": cat_nome, "total": total, "subs": {}})
+            cat["subs"][sub_nome] = soma
+
+        output: List[Dict[str, Any]] = [
+            {
+                'total': cat["total"],
+                cat["nome"].lower(): dict(cat["subs"])
+            }
+            for cat in categorias.values()
             # Só adiciona se tiver algum valor
-            if total > 0:
-                categoria_data = {
-                    'total': round(total, 2),
-                    categoria.categoria_nome.lower(): {k: round(v, 2) for k, v in subs.items()}
-                }
-                output.append(categoria_data)
+            if cat["total"] > 0
+        ]
         
         return EntradasPorCategoriaResponse(
             data_inicial=data_inicio_str,
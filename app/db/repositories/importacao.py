@@ -0,0 +1,57 @@
+# app/db/repositories/importacao.py
+
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.db.models.importacao import ImportacaoORM
+from app.logger import log_database_operation
+
+
+class ImportacaoRepository:
+    """
+    Controle de progresso das importações de extrato. As operações não fazem commit:
+    o importador confirma o avanço junto com as transações de cada bloco.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.model = ImportacaoORM
+
+    async def get_by_hash(self, hash_arquivo: str) -> Optional[ImportacaoORM]:
+        result = await self.db.execute(select(self.model).where(self.model.hash_arquivo == hash_arquivo))
+        return result.scalars().first()
+
+    async def iniciar(self, hash_arquivo: str, arquivo: str, formato: str) -> ImportacaoORM:
+        """Retorna a importação já registrada para o arquivo ou registra uma nova."""
+        importacao = await self.get_by_hash(hash_arquivo)
+        if importacao:
+            log_database_operation(operation="retomar", collection="importacoes", hash_arquivo=hash_arquivo).info(
+                f"Retomando importação {importacao.id} após {importacao.linhas_processadas} linhas"
+            )
+            return importacao
+
+        importacao = self.model(
+            hash_arquivo=hash_arquivo,
+            arquivo=arquivo,
+            formato=formato,
+            linhas_processadas=0,
+            linhas_importadas=0,
+            linhas_rejeitadas=0,
+            concluida=False,
+        )
+        self.db.add(importacao)
+        await self.db.flush()
+        return importacao
+
+    async def avancar(self, importacao: ImportacaoORM, processadas: int, importadas: int, rejeitadas: int) -> None:
+        """Soma o resultado de um bloco ao progresso da importação."""
+        importacao.linhas_processadas += processadas
+        importacao.linhas_importadas += importadas
+        importacao.linhas_rejeitadas += rejeitadas
+        await self.db.flush()
+
+    async def concluir(self, importacao: ImportacaoORM) -> None:
+        importacao.concluida = True
+        await self.db.flush()
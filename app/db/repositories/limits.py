@@ -1,20 +1,18 @@
 # app/db/repositories/limits.py
 
-from typing import List, Dict, Any
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import insert, or_, select, update
 
 from app.core.database import get_session
+from app.core.escritor import escrita
 from app.db.models.categoria import CategoriaORM, SubcategoriaORM
 
-from app.db.repositories.categoria import CategoriaRepository
-from app.db.repositories.subcategoria import SubcategoriaRepository
 from app.schemas.limits import LimitsUpdatePayload, LimitsUpdateResponse, CategoriaLimiteUpdate
 from app.schemas.categorias import CategoriaCreate, CategoriaUpdate
-from app.schemas.subcategoria import SubcategoriaCreate, SubcategoriaUpdate
-from app.logger import log_database_operation
+from app.logger import Preguicoso, log_database_operation
 
 
 class LimitsRepository:
@@ -22,19 +20,23 @@ class LimitsRepository:
     Repositório especializado para operações em lote de limites de categorias/subcategorias.
     """
 
-    def __init__(self, db: AsyncSession = Depends(get_session)):
+    def __init__(self, db: AsyncSession = Depends(get_session, scope="function")):
         self.db = db
-        self.categoria_repo = CategoriaRepository(db)
-        self.subcategoria_repo = SubcategoriaRepository(db)
 
+    @escrita
     async def bulk_update_limits(self, payload: LimitsUpdatePayload) -> LimitsUpdateResponse:
         """
         Processa atualizações em lote de limites de categorias e subcategorias.
+
+        O estado atual é lido em duas consultas e cada item é validado em memória, na
+        ordem do payload (novas antes das modificadas). Os itens aceitos são gravados
+        com INSERTs multi-linha e UPDATEs em lote por id; um item recusado entra em
+        `errors` e não grava nada.
         """
         log = log_database_operation(
             operation="bulk_update_limits",
             collection="categorias",
-            payload=payload.model_dump()
+            payload=Preguicoso(payload.model_dump)
         )
 
         response = LimitsUpdateResponse(
@@ -43,24 +45,66 @@ class LimitsRepository:
         )
 
         try:
+            categorias, dono_do_nome, categoria_da_sub, nomes_subs = await self._carregar_estado(payload)
+
             # Processa categorias novas
+            novas: List[Tuple[CategoriaCreate, List[str]]] = []
             for new_cat in payload.new:
                 try:
-                    await self._create_new_category(new_cat, response)
-                except Exception as e:
+                    novas.append(self._validar_nova(new_cat, dono_do_nome))
+                except ValueError as e:
                     response.errors.append(f"Erro ao criar categoria '{new_cat.categoria_nome}': {str(e)}")
                     log.error(f"Erro ao criar categoria: {e}")
+                    continue
+                dono_do_nome[new_cat.categoria_nome] = None
 
             # Processa categorias modificadas
+            alteradas: List[Dict[str, Any]] = []
+            subs_criadas: List[Dict[str, Any]] = []
+            subs_renomeadas: List[Dict[str, Any]] = []
             for mod_cat in payload.modified:
                 try:
-                    await self._update_existing_category(mod_cat, response)
-                except Exception as e:
+                    dados, nomes, criar, renomear = self._validar_modificada(
+                        mod_cat, categorias, dono_do_nome, categoria_da_sub, nomes_subs
+                    )
+                except ValueError as e:
                     response.errors.append(f"Erro ao atualizar categoria ID {mod_cat.id}: {str(e)}")
                     log.error(f"Erro ao atualizar categoria: {e}")
+                    continue
+                # Item aceito: o estado em memória passa a refletir a alteração
+                if dono_do_nome.get(categorias[mod_cat.id]) == mod_cat.id:
+                    del dono_do_nome[categorias[mod_cat.id]]
+                dono_do_nome[mod_cat.categoria_nome] = mod_cat.id
+                categorias[mod_cat.id] = mod_cat.categoria_nome
+                nomes_subs[mod_cat.id] = nomes
+                alteradas.append({"id": mod_cat.id, **dados.model_dump(exclude={"subcategorias"})})
+                subs_criadas.extend(criar)
+                subs_renomeadas.extend(renomear)
+
+            if novas:
+                # Um INSERT multi-linha para as categorias novas, já devolvendo os ids
+                ids_novas = dict((await self.db.execute(
+                    insert(CategoriaORM).returning(CategoriaORM.categoria_nome, CategoriaORM.id),
+                    [dados.model_dump(exclude={"subcategorias"}) for dados, _ in novas]
+                )).all())
+                subs_criadas.extend(
+                    {"categoria_id": ids_novas[dados.categoria_nome], "subcategoria_nome": nome}
+                    for dados, subs in novas
+                    for nome in subs
+                )
+            if alteradas:
+                await self.db.execute(update(CategoriaORM), alteradas)
+            # Renomeações antes das inserções: uma subcategoria nova pode usar o nome
+            # liberado por outra; a ordem do payload já foi validada em memória
+            if subs_renomeadas:
+                await self.db.execute(update(SubcategoriaORM), subs_renomeadas)
+            if subs_criadas:
+                await self.db.execute(insert(SubcategoriaORM), subs_criadas)
 
-            # Commit final se não houver erros críticos
-            await self.db.commit()
+            response.created_categories = len(novas)
+            response.updated_categories = len(alteradas)
+            response.created_subcategories = len(subs_criadas)
+            response.updated_subcategories = len(subs_renomeadas)
 
             if response.errors:
                 response.success = False
@@ -70,122 +114,156 @@ class LimitsRepository:
             return response
 
         except Exception as e:
-            await self.db.rollback()
             log.error(f"Erro crítico no bulk update: {e}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Erro interno ao processar limites: {str(e)}"
             )
 
-    async def _create_new_category(self, new_cat: CategoriaLimiteUpdate, response: LimitsUpdateResponse):
-        """Cria uma nova categoria com suas subcategorias."""
-        
+    async def _carregar_estado(self, payload: LimitsUpdatePayload):
+        """
+        Lê, em uma consulta por tabela, as categorias citadas no payload (por id ou nome)
+        e as subcategorias das categorias modificadas ou citadas por id.
+        Retorna (nome por id de categoria, id por nome de categoria,
+        categoria por id de subcategoria, {categoria_id: {nome: id}} das subcategorias).
+        """
+        nomes = {c.categoria_nome for c in [*payload.new, *payload.modified]}
+        ids = {c.id for c in payload.modified if c.id}
+        sub_ids = {s.id for c in payload.modified for s in c.subcategorias if s.id}
+
+        result = await self.db.execute(
+            select(CategoriaORM.id, CategoriaORM.categoria_nome)
+            .where(or_(CategoriaORM.categoria_nome.in_(nomes), CategoriaORM.id.in_(ids)))
+        )
+        categorias: Dict[int, str] = dict(result.all())
+        dono_do_nome: Dict[str, Optional[int]] = {nome: cid for cid, nome in categorias.items()}
+
+        categoria_da_sub: Dict[int, int] = {}
+        nomes_subs: Dict[int, Dict[str, Optional[int]]] = {}
+        if ids or sub_ids:
+            result = await self.db.execute(
+                select(SubcategoriaORM.id, SubcategoriaORM.categoria_id, SubcategoriaORM.subcategoria_nome)
+                .where(or_(SubcategoriaORM.categoria_id.in_(ids), SubcategoriaORM.id.in_(sub_ids)))
+            )
+            for sid, cid, nome in result.all():
+                categoria_da_sub[sid] = cid
+                nomes_subs.setdefault(cid, {})[nome] = sid
+        return categorias, dono_do_nome, categoria_da_sub, nomes_subs
+
+    @staticmethod
+    def _validar_nova(new_cat: CategoriaLimiteUpdate, dono_do_nome: Dict[str, Optional[int]]):
+        """Valida uma categoria nova; retorna (CategoriaCreate, nomes das subcategorias)."""
         # Verifica se já existe categoria com mesmo nome
-        existing = await self.categoria_repo.get_by_nome(new_cat.categoria_nome)
-        if existing:
+        if new_cat.categoria_nome in dono_do_nome:
             raise ValueError(f"Categoria '{new_cat.categoria_nome}' já existe")
 
-        # Cria a categoria
         categoria_create = CategoriaCreate(
             categoria_nome=new_cat.categoria_nome,
             natureza=new_cat.natureza,
             limite=new_cat.limite,
-            subcategorias=[]  # Vamos criar as subcategorias separadamente
+            subcategorias=[]
         )
+        # Só cria subcategorias com nome
+        subs = [s.subcategoria_nome for s in new_cat.subcategorias if s.subcategoria_nome.strip()]
+        repetidas = [nome for nome, n in Counter(subs).items() if n > 1]
+        if repetidas:
+            raise ValueError(f"Subcategoria '{repetidas[0]}' repetida")
+        return categoria_create, subs
 
-        categoria = await self.categoria_repo.create(categoria_create)
-        response.created_categories += 1
-
-        # Cria subcategorias associadas
-        for sub_data in new_cat.subcategorias:
-            if sub_data.subcategoria_nome.strip():  # Só cria se tiver nome
-                sub_create = SubcategoriaCreate(
-                    subcategoria_nome=sub_data.subcategoria_nome
-                )
-                await self.subcategoria_repo.create(categoria.id, sub_create)
-                response.created_subcategories += 1
-
-    async def _update_existing_category(self, mod_cat: CategoriaLimiteUpdate, response: LimitsUpdateResponse):
-        """Atualiza uma categoria existente e suas subcategorias."""
-        
+    @staticmethod
+    def _validar_modificada(
+        mod_cat: CategoriaLimiteUpdate,
+        categorias: Dict[int, str],
+        dono_do_nome: Dict[str, Optional[int]],
+        categoria_da_sub: Dict[int, int],
+        nomes_subs: Dict[int, Dict[str, Optional[int]]],
+    ):
+        """
+        Valida uma categoria modificada e suas subcategorias contra o estado em memória.
+        Retorna (CategoriaUpdate, nomes das subcategorias após o item, linhas a inserir,
+        linhas a renomear).
+        """
         if not mod_cat.id:
             raise ValueError("ID da categoria é obrigatório para atualização")
-
-        # Verifica se a categoria existe
-        categoria = await self.categoria_repo.get_by_id(mod_cat.id)
-        if not categoria:
+        if mod_cat.id not in categorias:
             raise ValueError(f"Categoria ID {mod_cat.id} não encontrada")
+        if dono_do_nome.get(mod_cat.categoria_nome, mod_cat.id) != mod_cat.id:
+            raise ValueError(f"Outra categoria com nome '{mod_cat.categoria_nome}' já existe")
 
-        # Atualiza campos básicos da categoria
         categoria_update = CategoriaUpdate(
             categoria_nome=mod_cat.categoria_nome,
             natureza=mod_cat.natureza,
             limite=mod_cat.limite,
-            subcategorias=[]  # Processaremos separadamente
+            subcategorias=[]
         )
 
-        await self.categoria_repo.update(mod_cat.id, categoria_update)
-        response.updated_categories += 1
-
-        # Processa subcategorias
-        await self._process_subcategories(mod_cat.id, mod_cat.subcategorias, response)
-
-    async def _process_subcategories(self, categoria_id: int, subcategorias: List, response: LimitsUpdateResponse):
-        """Processa subcategorias de uma categoria (novas e atualizações)."""
-        
-        for sub_data in subcategorias:
-            if not sub_data.subcategoria_nome.strip():  # Ignora vazias
+        nomes = dict(nomes_subs.get(mod_cat.id, {}))
+        criar: List[Dict[str, Any]] = []
+        renomear: List[Dict[str, Any]] = []
+        for sub_data in mod_cat.subcategorias:
+            nome = sub_data.subcategoria_nome
+            if not nome.strip():  # Ignora vazias
                 continue
 
             if sub_data.id:
-                # Subcategoria existente - atualizar
-                sub_update = SubcategoriaUpdate(
-                    subcategoria_nome=sub_data.subcategoria_nome
-                )
-                updated_sub = await self.subcategoria_repo.update(sub_data.id, sub_update)
-                if updated_sub:
-                    response.updated_subcategories += 1
+                # Subcategoria existente - atualizar (ids inexistentes são ignorados)
+                dona = categoria_da_sub.get(sub_data.id)
+                if dona is None:
+                    continue
+                if dona != mod_cat.id:
+                    raise ValueError(f"Subcategoria {sub_data.id} não pertence à categoria {mod_cat.id}")
+                if nomes.get(nome, sub_data.id) != sub_data.id:
+                    raise ValueError(f"Subcategoria '{nome}' já existe na categoria")
+                anterior = next(n for n, sid in nomes.items() if sid == sub_data.id)
+                del nomes[anterior]
+                nomes[nome] = sub_data.id
+                renomear.append({"id": sub_data.id, "subcategoria_nome": nome})
             else:
                 # Nova subcategoria - criar
-                sub_create = SubcategoriaCreate(
-                    subcategoria_nome=sub_data.subcategoria_nome
-                )
-                await self.subcategoria_repo.create(categoria_id, sub_create)
-                response.created_subcategories += 1
+                if nome in nomes:
+                    raise ValueError(f"Subcategoria '{nome}' já existe na categoria")
+                nomes[nome] = None
+                criar.append({"categoria_id": mod_cat.id, "subcategoria_nome": nome})
+
+        return categoria_update, nomes, criar, renomear
 
     async def get_all_limits(self) -> List[Dict[str, Any]]:
         """
-        Retorna todas as categorias formatadas para o frontend de limites.
+        Retorna todas as categorias formatadas para o frontend de limites, numa única
+        consulta (categorias LEFT JOIN subcategorias, só as colunas usadas).
         """
         log = log_database_operation(operation="get_all_limits", collection="categorias")
-        
-        # Busca todas as categorias com subcategorias
-        stmt = select(CategoriaORM).order_by(CategoriaORM.categoria_nome)
+
+        stmt = (
+            select(
+                CategoriaORM.id,
+                CategoriaORM.categoria_nome,
+                CategoriaORM.natureza,
+                CategoriaORM.limite,
+                SubcategoriaORM.id,
+                SubcategoriaORM.subcategoria_nome,
+            )
+            .outerjoin(SubcategoriaORM, SubcategoriaORM.categoria_id == CategoriaORM.id)
+            .order_by(CategoriaORM.categoria_nome, SubcategoriaORM.subcategoria_nome)
+        )
         result = await self.db.execute(stmt)
-        categorias = result.scalars().all()
-
-        # Formata para o frontend
-        formatted_data = []
-        for cat in categorias:
-            # Busca subcategorias da categoria
-            sub_stmt = select(SubcategoriaORM).where(SubcategoriaORM.categoria_id == cat.id)
-            sub_result = await self.db.execute(sub_stmt)
-            subcategorias = sub_result.scalars().all()
-
-            categoria_data = {
-                "id": cat.id,
-                "categoria_nome": cat.categoria_nome,
-                "natureza": cat.natureza,
-                "limite": cat.limite,
-                "subcategorias": [
-                    {
-                        "id": sub.id,
-                        "subcategoria_nome": sub.subcategoria_nome
-                    }
-                    for sub in subcategorias
-                ]
-            }
-            formatted_data.append(categoria_data)
+
+        # Formata para o frontend: as linhas de uma categoria vêm juntas pela ordenação
+        formatted_data: List[Dict[str, Any]] = []
+        for cid, nome, natureza, limite, sub_id, sub_nome in result.all():
+            if not formatted_data or formatted_data[-1]["id"] != cid:
+                formatted_data.append({
+                    "id": cid,
+                    "categoria_nome": nome,
+                    "natureza": natureza,
+                    "limite": limite,
+                    "subcategorias": []
+                })
+            if sub_id is not None:
+                formatted_data[-1]["subcategorias"].append({
+                    "id": sub_id,
+                    "subcategoria_nome": sub_nome
+                })
 
         log.info(f"{len(formatted_data)} categorias recuperadas para limites")
-        return formatted_data
\ No newline at end of file
+        return formatted_data
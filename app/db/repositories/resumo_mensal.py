@@ -0,0 +1,192 @@
+# app/db/repositories/resumo_mensal.py
+
+import calendar
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, extract, func, select
+from sqlalchemy.dialects.sqlite import insert
+
+from app.db.models.resumo_mensal import ResumoMensalORM
+from app.db.models.transacao import TransacaoORM
+from app.db.types import de_centavos, para_centavos
+from app.logger import log_database_operation
+
+Chave = Tuple[int, int, str, str, int, int]
+
+def _valor(v):
+    return getattr(v, "value", v)
+
+
+def chave_transacao(t) -> Chave:
+    """Chave (ano, mes, natureza, tipo, categoria_id, subcategoria_id) de uma transação."""
+    return (
+        t.data_transacao.year,
+        t.data_transacao.month,
+        _valor(t.natureza),
+        _valor(t.tipo),
+        t.categoria_id,
+        t.subcategoria_id,
+    )
+
+
+def meses_completos(
+    data_inicio: datetime, data_final: datetime
+) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """
+    Retorna o intervalo ((ano, mes) inicial, (ano, mes) final) se o período cobrir meses
+    inteiros, ou None quando for preciso consultar as transações diretamente.
+
+    O caminho pelas transações filtra data_transacao <= data_final, então o mês só conta
+    como inteiro se data_final for o fim real do último dia (time.max, como as rotas
+    montam): com 23:59:59 ele deixaria de fora transações de 23:59:59.xxx que o resumo soma.
+    """
+    if data_inicio != datetime(data_inicio.year, data_inicio.month, 1):
+        return None
+    ultimo_dia = calendar.monthrange(data_final.year, data_final.month)[1]
+    if data_final.day != ultimo_dia or data_final.time() < time.max:
+        return None
+    return (data_inicio.year, data_inicio.month), (data_final.year, data_final.month)
+
+
+class ResumoMensalRepository:
+    """
+    Mantém a tabela resumo_mensal. As operações não fazem commit: entram na mesma
+    unidade de trabalho da escrita original e são confirmadas junto com ela.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.model = ResumoMensalORM
+
+    def _upsert(self):
+        stmt = insert(self.model)
+        return stmt.on_conflict_do_update(
+            index_elements=[
+                self.model.ano, self.model.mes, self.model.natureza,
+                self.model.tipo, self.model.categoria_id, self.model.subcategoria_id,
+            ],
+            set_={
+                "total": self.model.total + stmt.excluded.total,
+                "quantidade": self.model.quantidade + stmt.excluded.quantidade,
+            },
+        )
+
+    @staticmethod
+    def _linha(chave: Chave, valor: float, quantidade: int) -> Dict[str, Any]:
+        ano, mes, natureza, tipo, categoria_id, subcategoria_id = chave
+        return {
+            "ano": ano,
+            "mes": mes,
+            "natureza": natureza,
+            "tipo": tipo,
+            "categoria_id": categoria_id,
+            "subcategoria_id": subcategoria_id,
+            "total": valor,
+            "quantidade": quantidade,
+        }
+
+    async def _aplicar(self, chave: Chave, valor: float, quantidade: int) -> None:
+        await self.db.execute(self._upsert(), [self._linha(chave, valor, quantidade)])
+
+        if quantidade < 0:
+            ano, mes, natureza, tipo, categoria_id, subcategoria_id = chave
+            # Remove chaves que ficaram sem transações
+            await self.db.execute(
+                delete(self.model).where(
+                    self.model.ano == ano,
+                    self.model.mes == mes,
+                    self.model.natureza == natureza,
+                    self.model.tipo == tipo,
+                    self.model.categoria_id == categoria_id,
+                    self.model.subcategoria_id == subcategoria_id,
+                    self.model.quantidade <= 0,
+                )
+            )
+
+    async def registrar(self, transacoes: List[TransacaoORM]) -> None:
+        """
+        Soma as transações informadas ao resumo. As linhas são agrupadas por chave e
+        gravadas num único executemany, qualquer que seja o número de meses afetados.
+        """
+        deltas: Dict[Chave, List[int]] = {}
+        for t in transacoes:
+            delta = deltas.setdefault(chave_transacao(t), [0, 0])
+            delta[0] += para_centavos(t.valor)
+            delta[1] += 1
+        if deltas:
+            await self.db.execute(self._upsert(), [
+                self._linha(chave, de_centavos(centavos), quantidade)
+                for chave, (centavos, quantidade) in deltas.items()
+            ])
+
+    async def remover(self, chave: Chave, valor: float) -> None:
+        """Desconta do resumo uma transação removida ou alterada."""
+        await self._aplicar(chave, -valor, -1)
+
+    @staticmethod
+    def _agregado_transacoes():
+        ano = extract("year", TransacaoORM.data_transacao)
+        mes = extract("month", TransacaoORM.data_transacao)
+        return (
+            select(
+                ano, mes,
+                TransacaoORM.natureza, TransacaoORM.tipo,
+                TransacaoORM.categoria_id, TransacaoORM.subcategoria_id,
+                func.sum(TransacaoORM.valor), func.count(),
+            )
+            .group_by(
+                ano, mes,
+                TransacaoORM.natureza, TransacaoORM.tipo,
+                TransacaoORM.categoria_id, TransacaoORM.subcategoria_id,
+            )
+        )
+
+    async def recalcular(self) -> Dict[Chave, Tuple[float, int]]:
+        """Recalcula o resumo do zero a partir da tabela transacoes (sem gravar)."""
+        result = await self.db.execute(self._agregado_transacoes())
+        return {
+            (int(ano), int(mes), natureza, tipo, cid, sid): (total, quantidade)
+            for ano, mes, natureza, tipo, cid, sid, total, quantidade in result.all()
+        }
+
+    async def atual(self) -> Dict[Chave, Tuple[float, int]]:
+        result = await self.db.execute(select(self.model))
+        return {
+            (r.ano, r.mes, r.natureza, r.tipo, r.categoria_id, r.subcategoria_id): (r.total, r.quantidade)
+            for r in result.scalars().all()
+        }
+
+    async def verificar(self) -> List[str]:
+        """
+        Compara o resumo gravado com um recálculo completo e retorna as divergências encontradas.
+        """
+        log = log_database_operation(operation="verificar", collection="resumo_mensal")
+        esperado = await self.recalcular()
+        gravado = await self.atual()
+
+        divergencias = []
+        for chave in sorted(esperado.keys() | gravado.keys()):
+            total_e, qtd_e = esperado.get(chave, (0.0, 0))
+            total_g, qtd_g = gravado.get(chave, (0.0, 0))
+            if qtd_e != qtd_g or total_e != total_g:
+                divergencias.append(
+                    f"{chave}: esperado total={total_e:.2f} qtd={qtd_e}, gravado total={total_g:.2f} qtd={qtd_g}"
+                )
+
+        if divergencias:
+            log.warning(f"{len(divergencias)} divergência(s) no resumo mensal")
+        else:
+            log.info(f"Resumo mensal consistente ({len(esperado)} chaves)")
+        return divergencias
+
+    async def reconstruir(self) -> None:
+        """Apaga e regrava o resumo inteiro a partir das transações."""
+        await self.db.execute(delete(self.model))
+        await self.db.execute(
+            insert(self.model).from_select(
+                ["ano", "mes", "natureza", "tipo", "categoria_id", "subcategoria_id", "total", "quantidade"],
+                self._agregado_transacoes(),
+            )
+        )
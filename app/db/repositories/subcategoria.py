@@ -3,18 +3,19 @@
 from typing import List, Optional
 from fastapi import Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import insert, select, delete
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.exc import IntegrityError
 
 from app.core.database import get_session
 from app.db.models.categoria import SubcategoriaORM
-from app.logger import log_database_operation
+from app.logger import Preguicoso, log_database_operation
 from app.schemas.categorias import Subcategoria, SubcategoriaUpdate
 from app.schemas.subcategoria import SubcategoriaCreate
 
 
 class SubcategoriaRepository:
-    def __init__(self, db: AsyncSession = Depends(get_session)):
+    def __init__(self, db: AsyncSession = Depends(get_session, scope="function")):
         self.db = db
         self.model = SubcategoriaORM
 
@@ -30,26 +31,37 @@ class SubcategoriaRepository:
         )
         return result.scalars().first()
     
+    async def get_or_create_id(self, categoria_id: int, nome: str) -> int:
+        """
+        Id da subcategoria `nome` da categoria, criando-a se não existir, num único
+        INSERT ... ON CONFLICT sobre (categoria_id, subcategoria_nome). Não faz commit.
+        """
+        stmt = insert(self.model).values(subcategoria_nome=nome, categoria_id=categoria_id)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.categoria_id, self.model.subcategoria_nome],
+            set_={"subcategoria_nome": stmt.excluded.subcategoria_nome},
+        ).returning(self.model.id)
+        return await self.db.scalar(stmt)
+
     async def create(self, categoria_id: int, obj_in: SubcategoriaCreate) -> SubcategoriaORM:
-        log = log_database_operation(operation="create", collection="subcategorias", payload=obj_in.dict())
+        log = log_database_operation(operation="create", collection="subcategorias", payload=Preguicoso(obj_in.dict))
         try:
             inst = self.model(subcategoria_nome=obj_in.subcategoria_nome, categoria_id=categoria_id)
             self.db.add(inst)
-            await self.db.commit()
+            await self.db.flush()
             await self.db.refresh(inst)
             log.info(f"Subcategoria {inst.id} criada para categoria {categoria_id}")
             return inst
         except IntegrityError:
-            await self.db.rollback()
             raise HTTPException(status_code=400, detail="Erro ao criar subcategoria")
 
     async def create_many(self, categoria_id: int, subs: List[SubcategoriaCreate]):
+        # Nomes que a categoria já tem são ignorados (restrição única em categoria_id + nome)
         stmt = insert(self.model).values([
             {'subcategoria_nome': s.subcategoria_nome, 'categoria_id': categoria_id}
             for s in subs
-        ])
+        ]).on_conflict_do_nothing(index_elements=['categoria_id', 'subcategoria_nome'])
         await self.db.execute(stmt)
-        await self.db.commit()
 
     async def get_by_categoria(self, categoria_id: int) -> List[SubcategoriaORM]:
         """Busca todas as subcategorias de uma categoria"""
@@ -68,7 +80,7 @@ class SubcategoriaRepository:
         for field, value in update_data.items():
             setattr(sub, field, value)
         
-        await self.db.commit()
+        await self.db.flush()
         await self.db.refresh(sub)
         return sub
 
@@ -79,7 +91,7 @@ class SubcategoriaRepository:
             return None
         
         await self.db.delete(sub)
-        await self.db.commit()
+        await self.db.flush()
         return sub
 
     async def delete_by_categoria(self, categoria_id: int) -> None:
@@ -87,4 +99,3 @@ class SubcategoriaRepository:
         await self.db.execute(
             delete(self.model).where(self.model.categoria_id == categoria_id)
         )
-        await self.db.commit()
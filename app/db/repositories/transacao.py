@@ -1,35 +1,61 @@
 # app/db/repositories/transacao.py
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, time
 
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Row, select, tuple_
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import selectinload
 
+from app.core.config import Config
 from app.core.database import get_session
+from app.core.escritor import escrita
+from app.db.models.categoria import CategoriaORM, SubcategoriaORM
 from app.db.models.transacao import TransacaoORM
+from app.db.types import de_centavos, para_centavos
 from app.db.repositories.categoria import CategoriaRepository
 from app.db.repositories.subcategoria import SubcategoriaRepository
-from app.schemas.transacao import TipoPagamento, TipoTransacao, TransacaoCreate, TransacaoUpdate
-from app.schemas.categorias import CategoriaCreate
-from app.schemas.subcategoria import SubcategoriaCreate
-from app.logger import log_database_operation
+from app.db.repositories.resumo_mensal import ResumoMensalRepository, chave_transacao
+from app.schemas.transacao import (
+    TipoPagamento, TipoTransacao, TransacaoBatchItemResult, TransacaoBatchResponse, TransacaoCreate,
+    TransacaoFiltros, TransacaoUpdate
+)
+from app.logger import Preguicoso, log_database_operation
 
-from uuid import uuid4
+from uuid import UUID, uuid4
 from dateutil.relativedelta import relativedelta
 
+# Colunas de TransacaoResponse: as listagens leem só isso, sem objetos ORM
+COLUNAS_RESPOSTA = (
+    TransacaoORM.id,
+    TransacaoORM.group_id,
+    TransacaoORM.valor,
+    TransacaoORM.descricao,
+    TransacaoORM.parcela.label("parcelas"),
+    TransacaoORM.total_parcelas,
+    TransacaoORM.data_transacao,
+    TransacaoORM.tipo,
+    TransacaoORM.natureza,
+    TransacaoORM.forma_pagamento,
+    TransacaoORM.categoria_id,
+    TransacaoORM.subcategoria_id,
+    TransacaoORM.data_criacao,
+    TransacaoORM.data_atualizacao,
+)
 
 class TransacaoRepository:
-    def __init__(self, db: AsyncSession = Depends(get_session)):
+    def __init__(self, db: AsyncSession = Depends(get_session, scope="function")):
         self.db = db
         self.categoria_repo = CategoriaRepository(db)
         self.subcategoria_repo = SubcategoriaRepository(db)
+        self.resumo_repo = ResumoMensalRepository(db)
 
-    def _calcular_valor_parcela(self, valor_total: float, total_parcelas: int) -> float:
-        return round(valor_total / total_parcelas, 2)
+    def _calcular_valores_parcelas(self, valor_total: float, total_parcelas: int) -> List[float]:
+        """Divide o valor em centavos exatos; o resto da divisão fica na primeira parcela."""
+        base, resto = divmod(para_centavos(valor_total), total_parcelas)
+        return [de_centavos(base + resto if i == 0 else base) for i in range(total_parcelas)]
     
     def _gerar_datas_parcelas(self, data_base: datetime, total_parcelas: int) -> List[datetime]:
         dates = []
@@ -53,15 +79,15 @@ class TransacaoRepository:
             data_transacao: datetime,
             categoria_id=int,
             sub_id=int
-    ) -> TransacaoORM:
-        return TransacaoORM(
+    ) -> dict:
+        return dict(
             group_id=group_id,
-            tipo=obj_in.tipo,
+            tipo=obj_in.tipo.value,
             valor=valor,
             descricao=f'{obj_in.descricao} - parcela {parcela}/{total_parcelas}',
             data_transacao=data_transacao,
-            forma_pagamento=obj_in.forma_pagamento,
-            natureza=obj_in.natureza,
+            forma_pagamento=obj_in.forma_pagamento.value,
+            natureza=obj_in.natureza.value,
             parcela=parcela,  
             total_parcelas=total_parcelas,
             categoria_id=categoria_id,
@@ -69,16 +95,6 @@ class TransacaoRepository:
 
         )
     
-    def _ajustar_ultima_parcela(self, transacoes: List, valor: float):
-        if not transacoes:
-            return
-        
-        total_parcelas = sum(t.valor for t in transacoes)
-        diferenca = round(valor - total_parcelas, 2)
-
-        if diferenca != 0:
-            transacoes[0].valor = round(transacoes[0].valor + diferenca, 2)
-    
     async def _create_transacaoes_parceladas(self, 
                                       obj_in, 
                                       group_id: str, 
@@ -86,74 +102,67 @@ class TransacaoRepository:
                                       sub_id: int
                                       ):
         total_parcelas = obj_in.total_parcelas
-        valor = self._calcular_valor_parcela(obj_in.valor, total_parcelas)
+        valores = self._calcular_valores_parcelas(obj_in.valor, total_parcelas)
         datas_parcelas = self._gerar_datas_parcelas(obj_in.data_transacao, total_parcelas)
 
-        created_transactions = []
-
-        for i in range(total_parcelas):
-            transacao = self._create_transacaoes(
+        parcelas = [
+            self._create_transacaoes(
                 obj_in=obj_in,
                 group_id=group_id,
                 parcela=i + 1,
                 total_parcelas=total_parcelas,
-                valor=valor,
+                valor=valores[i],
                 data_transacao=datas_parcelas[i],
                 categoria_id=categoria_id,
                 sub_id=sub_id
             )
-            self.db.add(transacao)
-            created_transactions.append(transacao)
-
-        self._ajustar_ultima_parcela(created_transactions, obj_in.valor)
+            for i in range(total_parcelas)
+        ]
 
-        await self.db.commit()
+        # Um único INSERT ... VALUES (...), (...) RETURNING para todas as parcelas:
+        # os objetos já voltam com id e defaults do servidor, sem refresh por linha
+        result = await self.db.scalars(
+            insert(TransacaoORM).returning(TransacaoORM),
+            parcelas
+        )
+        created_transactions = sorted(result.all(), key=lambda t: t.parcela)
 
-        for transacao in created_transactions:
-            await self.db.refresh(transacao)
+        await self.resumo_repo.registrar(created_transactions)
 
         return created_transactions
 
+    @escrita
     async def create(self, obj_in: TransacaoCreate) -> TransacaoORM:
-        log = log_database_operation(operation="create", collection="transacoes", payload=obj_in.model_dump())
+        log = log_database_operation(operation="create", collection="transacoes", payload=Preguicoso(obj_in.model_dump))
         group_id = uuid4()
 
         # 1) Categoria: se id não informado, busca ou cria por nome
+        mapa = await self.categoria_repo.mapa_ids(obj_in.categoria_id, obj_in.subcategoria_id)
         if obj_in.categoria_id is not None:
-            categoria = await self.categoria_repo.get_by_id(obj_in.categoria_id)
-            if not categoria:
+            if obj_in.categoria_id not in mapa.categorias_ids:
                 raise HTTPException(status_code=400, detail="Categoria não encontrada")
+            categoria_id = obj_in.categoria_id
         else:
-            categoria = await self.categoria_repo.get_by_nome(obj_in.categoria_nome)
-            if not categoria:
-                categoria = await self.categoria_repo.create(
-                    CategoriaCreate(
-                        categoria_nome=obj_in.categoria_nome,
-                        natureza=obj_in.natureza,
-                        limite=0,
-                        subcategorias=[]
-                    )
+            categoria_id = mapa.categoria_por_nome.get(obj_in.categoria_nome)
+            if categoria_id is None:
+                categoria_id = await self.categoria_repo.get_or_create_id(
+                    obj_in.categoria_nome, obj_in.natureza.value
                 )
 
         # 2) Subcategoria: se id não informado, busca ou cria por nome sob a categoria
         if obj_in.subcategoria_id is not None:
-            sub = await self.subcategoria_repo.get_by_id(obj_in.subcategoria_id)
-            if not sub or sub.categoria_id != categoria.id:
+            if mapa.categoria_da_subcategoria.get(obj_in.subcategoria_id) != categoria_id:
                 raise HTTPException(status_code=400, detail="Subcategoria inválida")
+            sub_id = obj_in.subcategoria_id
         else:
-            sub = await self.subcategoria_repo.get_by_nome_and_categoria(
-                obj_in.subcategoria_nome, categoria.id
-            )
-            if not sub:
-                sub = await self.subcategoria_repo.create(
-                    categoria_id=categoria.id,
-                    obj_in=SubcategoriaCreate(subcategoria_nome=obj_in.subcategoria_nome)
-                )
+            sub_id = mapa.subcategoria_por_nome.get((categoria_id, obj_in.subcategoria_nome))
+            if sub_id is None:
+                sub_id = await self.subcategoria_repo.get_or_create_id(categoria_id, obj_in.subcategoria_nome)
 
         # 3) Cria a transação usando os IDs resolvidos
         try:
             if (obj_in.forma_pagamento == TipoPagamento.CREDITO and obj_in.total_parcelas > 1):
-                transacoes = await self._create_transacaoes_parceladas(obj_in, group_id, categoria.id, sub.id)
+                transacoes = await self._create_transacaoes_parceladas(obj_in, group_id, categoria_id, sub_id)
                 log.info(f"Transação {group_id} criada, com {len(transacoes)} parcelas")
                 return transacoes[0]
             else: 
@@ -166,30 +175,241 @@ class TransacaoRepository:
                     tipo=obj_in.tipo.value,
                     natureza=obj_in.natureza.value,
                     forma_pagamento=obj_in.forma_pagamento.value,
-                    categoria_id=categoria.id,
-                    subcategoria_id=sub.id,
+                    categoria_id=categoria_id,
+                    subcategoria_id=sub_id,
                     group_id=group_id
                 )
 
 
             self.db.add(inst)
-            await self.db.commit()
+            await self.resumo_repo.registrar([inst])
+            await self.db.flush()
             await self.db.refresh(inst)
             log.info(f"Transação {inst.id} criada")
             return inst
         except IntegrityError:
-            await self.db.rollback()
             raise HTTPException(status_code=400, detail="Erro ao criar transação")
 
+    def _linhas_item(self, obj_in: TransacaoCreate, group_id, categoria_id: int, sub_id: int) -> List[dict]:
+        """Linhas de transacoes geradas por um item (uma por parcela nas compras parceladas no crédito)."""
+        if obj_in.forma_pagamento == TipoPagamento.CREDITO and (obj_in.total_parcelas or 1) > 1:
+            valores = self._calcular_valores_parcelas(obj_in.valor, obj_in.total_parcelas)
+            datas = self._gerar_datas_parcelas(obj_in.data_transacao, obj_in.total_parcelas)
+            return [
+                self._create_transacaoes(
+                    obj_in=obj_in,
+                    group_id=group_id,
+                    parcela=i + 1,
+                    total_parcelas=obj_in.total_parcelas,
+                    valor=valores[i],
+                    data_transacao=datas[i],
+                    categoria_id=categoria_id,
+                    sub_id=sub_id
+                )
+                for i in range(obj_in.total_parcelas)
+            ]
+        return [dict(
+            valor=obj_in.valor,
+            descricao=obj_in.descricao,
+            parcela=obj_in.parcelas,
+            total_parcelas=obj_in.total_parcelas,
+            data_transacao=obj_in.data_transacao,
+            tipo=obj_in.tipo.value,
+            natureza=obj_in.natureza.value,
+            forma_pagamento=obj_in.forma_pagamento.value,
+            categoria_id=categoria_id,
+            subcategoria_id=sub_id,
+            group_id=group_id
+        )]
+
+    async def _resolver_categorias(
+        self, itens: List[TransacaoCreate], erros: Dict[int, str]
+    ) -> Tuple[Dict[int, int], int]:
+        """
+        Resolve a categoria de cada item com uma consulta por IDs e outra por nomes,
+        criando de uma vez as categorias que faltam. Retorna ({índice: categoria_id}, criadas).
+        """
+        ids = {i.categoria_id for i in itens if i.categoria_id is not None}
+        nomes = {i.categoria_nome for i in itens if i.categoria_id is None}
+
+        existentes = set()
+        if ids:
+            existentes = set((await self.db.scalars(
+                select(CategoriaORM.id).where(CategoriaORM.id.in_(ids))
+            )).all())
+        por_nome: Dict[str, int] = {}
+        if nomes:
+            result = await self.db.execute(
+                select(CategoriaORM.categoria_nome, CategoriaORM.id)
+                .where(CategoriaORM.categoria_nome.in_(nomes))
+            )
+            por_nome = dict(result.all())
+
+        # Categorias novas herdam a natureza do primeiro item que as cita
+        novas: Dict[str, str] = {}
+        for obj_in in itens:
+            if obj_in.categoria_id is None and obj_in.categoria_nome not in por_nome:
+                novas.setdefault(obj_in.categoria_nome, obj_in.natureza.value)
+        if novas:
+            # ON CONFLICT: se outra escrita criar a mesma categoria antes, reaproveita o id dela
+            stmt = insert(CategoriaORM)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[CategoriaORM.categoria_nome],
+                set_={"categoria_nome": stmt.excluded.categoria_nome},
+            ).returning(CategoriaORM.categoria_nome, CategoriaORM.id)
+            result = await self.db.execute(
+                stmt, [{"categoria_nome": n, "natureza": nat, "limite": 0} for n, nat in novas.items()]
+            )
+            por_nome.update(result.all())
+
+        categorias: Dict[int, int] = {}
+        for idx, obj_in in enumerate(itens):
+            if obj_in.categoria_id is None:
+                categorias[idx] = por_nome[obj_in.categoria_nome]
+            elif obj_in.categoria_id in existentes:
+                categorias[idx] = obj_in.categoria_id
+            else:
+                erros[idx] = "Categoria não encontrada"
+        return categorias, len(novas)
+
+    async def _resolver_subcategorias(
+        self, itens: List[TransacaoCreate], categorias: Dict[int, int], erros: Dict[int, str]
+    ) -> Tuple[Dict[int, int], int]:
+        """
+        Resolve a subcategoria de cada item já com categoria, no mesmo esquema de
+        _resolver_categorias. Retorna ({índice: subcategoria_id}, criadas).
+        """
+        ids = {itens[idx].subcategoria_id for idx in categorias if itens[idx].subcategoria_id is not None}
+        pares = {
+            (categorias[idx], itens[idx].subcategoria_nome)
+            for idx in categorias if itens[idx].subcategoria_id is None
+        }
+
+        dono: Dict[int, int] = {}
+        if ids:
+            result = await self.db.execute(
+                select(SubcategoriaORM.id, SubcategoriaORM.categoria_id)
+                .where(SubcategoriaORM.id.in_(ids))
+            )
+            dono = dict(result.all())
+        por_par: Dict[Tuple[int, str], int] = {}
+        if pares:
+            result = await self.db.execute(
+                select(SubcategoriaORM.categoria_id, SubcategoriaORM.subcategoria_nome, SubcategoriaORM.id)
+                .where(SubcategoriaORM.categoria_id.in_({c for c, _ in pares}))
+                .where(SubcategoriaORM.subcategoria_nome.in_({n for _, n in pares}))
+            )
+            por_par = {(cid, nome): sid for cid, nome, sid in result.all() if (cid, nome) in pares}
+
+        novas = [par for par in pares if par not in por_par]
+        if novas:
+            stmt = insert(SubcategoriaORM)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[SubcategoriaORM.categoria_id, SubcategoriaORM.subcategoria_nome],
+                set_={"subcategoria_nome": stmt.excluded.subcategoria_nome},
+            ).returning(SubcategoriaORM.categoria_id, SubcategoriaORM.subcategoria_nome, SubcategoriaORM.id)
+            result = await self.db.execute(
+                stmt, [{"categoria_id": cid, "subcategoria_nome": nome} for cid, nome in novas]
+            )
+            por_par.update({(cid, nome): sid for cid, nome, sid in result.all()})
+
+        subcategorias: Dict[int, int] = {}
+        for idx, categoria_id in categorias.items():
+            obj_in = itens[idx]
+            if obj_in.subcategoria_id is None:
+                subcategorias[idx] = por_par[(categoria_id, obj_in.subcategoria_nome)]
+            elif dono.get(obj_in.subcategoria_id) == categoria_id:
+                subcategorias[idx] = obj_in.subcategoria_id
+            else:
+                erros[idx] = "Subcategoria inválida"
+        return subcategorias, len(novas)
+
+    async def inserir_lote(self, itens: List[TransacaoCreate]) -> TransacaoBatchResponse:
+        """
+        Grava um lote de transações sem fazer commit (o importador confirma por bloco).
+
+        Categorias e subcategorias são resolvidas por conjunto (uma consulta por tipo
+        de chave) e as que faltam são criadas uma única vez; as linhas, já com as
+        parcelas expandidas, são gravadas em blocos de TRANSACOES_BATCH_CHUNK.
+        Itens com categoria/subcategoria inválida são rejeitados individualmente.
+        """
+        erros: Dict[int, str] = {}
+        response = TransacaoBatchResponse(success=True, message="Lote criado com sucesso")
+
+        categorias, response.created_categories = await self._resolver_categorias(itens, erros)
+        subcategorias, response.created_subcategories = await self._resolver_subcategorias(itens, categorias, erros)
+
+        grupos: Dict[UUID, int] = {}
+        linhas: List[dict] = []
+        for idx, sub_id in subcategorias.items():
+            group_id = uuid4()
+            grupos[group_id] = idx
+            linhas.extend(self._linhas_item(itens[idx], group_id, categorias[idx], sub_id))
+
+        criadas: List[TransacaoORM] = []
+        chunk = Config.TRANSACOES_BATCH_CHUNK
+        for inicio in range(0, len(linhas), chunk):
+            # render_nulls mantém o mesmo conjunto de colunas em todas as linhas
+            # (parcela=None nas à vista), para o bloco sair num único INSERT
+            result = await self.db.scalars(
+                insert(TransacaoORM).returning(TransacaoORM),
+                linhas[inicio:inicio + chunk],
+                execution_options={"render_nulls": True}
+            )
+            criadas.extend(result.all())
+
+        await self.resumo_repo.registrar(criadas)
+
+        ids: Dict[int, List[int]] = {}
+        for t in sorted(criadas, key=lambda t: (t.parcela or 0, t.id)):
+            ids.setdefault(grupos[t.group_id], []).append(t.id)
+        por_indice = {idx: group_id for group_id, idx in grupos.items()}
+
+        for idx in range(len(itens)):
+            if idx in erros:
+                response.results.append(TransacaoBatchItemResult(index=idx, success=False, error=erros[idx]))
+            else:
+                response.results.append(TransacaoBatchItemResult(
+                    index=idx, success=True, group_id=por_indice[idx], ids=ids.get(idx, [])
+                ))
+
+        response.created_items = len(grupos)
+        response.created_transactions = len(criadas)
+        if erros:
+            response.success = False
+            response.message = f"Lote concluído com {len(erros)} item(ns) rejeitado(s)"
+        return response
+
+    @escrita
+    async def create_batch(self, itens: List[TransacaoCreate]) -> TransacaoBatchResponse:
+        """Cria um lote de transações; o lote inteiro é confirmado no commit da requisição."""
+        log = log_database_operation(operation="create_batch", collection="transacoes", itens=len(itens))
+        try:
+            response = await self.inserir_lote(itens)
+        except IntegrityError as e:
+            log.error(f"Erro de integridade ao criar lote: {e}")
+            raise HTTPException(status_code=400, detail="Erro ao criar lote de transações")
+
+        log.info(
+            f"Lote concluído: {response.created_items}/{len(itens)} itens, "
+            f"{response.created_transactions} transações"
+        )
+        return response
+
     async def get_all(
         self,
         data_inicio: Optional[datetime] = None,
-        data_final: Optional[datetime] = None
-    ) -> List[TransacaoORM]:
-        stmt = select(TransacaoORM).options(
-            selectinload(TransacaoORM.categoria),
-            selectinload(TransacaoORM.subcategoria)
-        )
+        data_final: Optional[datetime] = None,
+        filtros: Optional[TransacaoFiltros] = None,
+        cursor: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None
+    ) -> List[Row]:
+        """
+        Lista transações da mais recente para a mais antiga, ordenadas por (data_transacao, id).
+        `cursor` é a chave da última linha da página anterior (paginação keyset).
+        Devolve linhas só com as colunas de TransacaoResponse, sem montar objetos ORM.
+        """
+        stmt = select(*COLUNAS_RESPOSTA)
         if data_inicio:
             stmt = stmt.where(TransacaoORM.data_transacao >= data_inicio)
         if data_final:
@@ -197,58 +417,64 @@ class TransacaoRepository:
             data_final_completo = datetime.combine(data_final.date(), time.max)
             stmt = stmt.where(TransacaoORM.data_transacao <= data_final_completo)
 
-        stmt = stmt.order_by(TransacaoORM.data_transacao.desc())
+        if filtros:
+            for campo in ("tipo", "natureza", "forma_pagamento", "categoria_id", "subcategoria_id"):
+                valor = getattr(filtros, campo)
+                if valor is not None:
+                    stmt = stmt.where(getattr(TransacaoORM, campo) == getattr(valor, "value", valor))
+            if filtros.valor_min is not None:
+                stmt = stmt.where(TransacaoORM.valor >= filtros.valor_min)
+            if filtros.valor_max is not None:
+                stmt = stmt.where(TransacaoORM.valor <= filtros.valor_max)
+
+        if cursor:
+            stmt = stmt.where(tuple_(TransacaoORM.data_transacao, TransacaoORM.id) < tuple_(*cursor))
+
+        stmt = stmt.order_by(TransacaoORM.data_transacao.desc(), TransacaoORM.id.desc())
+        if limit:
+            stmt = stmt.limit(limit)
         result = await self.db.execute(stmt)
-        return result.scalars().all()
+        return result.all()
 
     async def get_by_id(self, id: int) -> Optional[TransacaoORM]:
-        stmt = select(TransacaoORM).options(
-            selectinload(TransacaoORM.categoria),
-            selectinload(TransacaoORM.subcategoria)
-        ).where(TransacaoORM.id == id)
+        stmt = select(TransacaoORM).where(TransacaoORM.id == id)
         result = await self.db.execute(stmt)
         return result.scalars().first()
 
+    @escrita
     async def update(self, id: int, obj_in: TransacaoUpdate) -> Optional[TransacaoORM]:
         trans = await self.get_by_id(id)
         if not trans:
             return None
+        chave_anterior, valor_anterior = chave_transacao(trans), trans.valor
 
         # 1) Se categoria_id ou categoria_nome vierem, resolve/cria
+        mapa = await self.categoria_repo.mapa_ids(obj_in.categoria_id, obj_in.subcategoria_id)
         if obj_in.categoria_id is not None or obj_in.categoria_nome is not None:
             if obj_in.categoria_id is not None:
-                categoria = await self.categoria_repo.get_by_id(obj_in.categoria_id)
-                if not categoria:
+                if obj_in.categoria_id not in mapa.categorias_ids:
                     raise HTTPException(status_code=400, detail="Categoria não encontrada")
+                categoria_id = obj_in.categoria_id
             else:
-                categoria = await self.categoria_repo.get_by_nome(obj_in.categoria_nome)
-                if not categoria:
-                    categoria = await self.categoria_repo.create(
-                        CategoriaCreate(
-                            categoria_nome=obj_in.categoria_nome,
-                            natureza=obj_in.natureza or trans.natureza_transacao,
-                            limite=0,
-                            subcategorias=[]
-                        )
-                    )
-            trans.categoria_id = categoria.id
+                categoria_id = mapa.categoria_por_nome.get(obj_in.categoria_nome)
+                if categoria_id is None:
+                    natureza = obj_in.natureza.value if obj_in.natureza else trans.natureza
+                    categoria_id = await self.categoria_repo.get_or_create_id(obj_in.categoria_nome, natureza)
+            trans.categoria_id = categoria_id
 
         # 2) Se subcategoria_id ou subcategoria_nome vierem, resolve/cria
         if obj_in.subcategoria_id is not None or obj_in.subcategoria_nome is not None:
             if obj_in.subcategoria_id is not None:
-                sub = await self.subcategoria_repo.get_by_id(obj_in.subcategoria_id)
-                if not sub or sub.categoria_id != trans.categoria_id:
+                if mapa.categoria_da_subcategoria.get(obj_in.subcategoria_id) != trans.categoria_id:
                     raise HTTPException(status_code=400, detail="Subcategoria inválida")
+                sub_id = obj_in.subcategoria_id
             else:
-                sub = await self.subcategoria_repo.get_by_nome_and_categoria(
-                    obj_in.subcategoria_nome, trans.categoria_id
-                )
-                if not sub:
-                    sub = await self.subcategoria_repo.create(
-                        categoria_id=trans.categoria_id,
-                        obj_in=SubcategoriaCreate(subcategoria_nome=obj_in.subcategoria_nome)
+                sub_id = mapa.subcategoria_por_nome.get((trans.categoria_id, obj_in.subcategoria_nome))
+                if sub_id is None:
+                    sub_id = await self.subcategoria_repo.get_or_create_id(
+                        trans.categoria_id, obj_in.subcategoria_nome
                     )
-            trans.subcategoria_id = sub.id
+            trans.subcategoria_id = sub_id
 
         # 3) Atualiza demais campos
         data = obj_in.model_dump(exclude_unset=True, exclude={
@@ -258,17 +484,20 @@ class TransacaoRepository:
             setattr(trans, field, val)
 
         try:
-            await self.db.commit()
+            await self.resumo_repo.remover(chave_anterior, valor_anterior)
+            await self.resumo_repo.registrar([trans])
+            await self.db.flush()
             await self.db.refresh(trans)
             return trans
         except IntegrityError:
-            await self.db.rollback()
             raise HTTPException(status_code=400, detail="Erro ao atualizar transação")
 
+    @escrita
     async def delete(self, id: int) -> Optional[TransacaoORM]:
         trans = await self.get_by_id(id)
         if not trans:
             return None
         await self.db.delete(trans)
-        await self.db.commit()
+        await self.resumo_repo.remover(chave_transacao(trans), trans.valor)
+        await self.db.flush()
         return trans
@@ -0,0 +1,37 @@
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional, Union
+
+from sqlalchemy import Integer
+from sqlalchemy.types import TypeDecorator
+
+Numero = Union[int, float, Decimal]
+
+
+def para_centavos(valor: Numero) -> int:
+    """Converte um valor decimal (ex.: 10.35) para centavos inteiros (1035), sem erro de float."""
+    return int((Decimal(str(valor)) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def de_centavos(centavos: int) -> float:
+    return centavos / 100
+
+
+class Centavos(TypeDecorator):
+    """
+    Valor monetário armazenado como inteiro em centavos.
+
+    A aplicação continua lendo e escrevendo valores decimais (float); a conversão
+    acontece no bind/result, então SUM e comparações no banco são exatos.
+    """
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[Numero], dialect) -> Optional[int]:
+        if value is None:
+            return None
+        return para_centavos(value)
+
+    def process_result_value(self, value: Optional[int], dialect) -> Optional[float]:
+        if value is None:
+            return None
+        return de_centavos(value)
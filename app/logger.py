@@ -1,22 +1,226 @@
 # app/logger.py
+import atexit
+import copy
 import logging
+import queue
+import random
 import sys
+import threading
+from contextvars import ContextVar, Token
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
 from loguru import logger
 from datetime import datetime
 
-def setup_logger(app_name: str = "financas_backend"):
+from app.core.config import Config
+
+MODOS = ("dev", "prod")
+
+# Número sorteado por requisição (ver sortear_amostra); os registros da mesma requisição
+# são mantidos ou descartados juntos em todos os sinks
+_amostra_requisicao: ContextVar[Optional[float]] = ContextVar("amostra_requisicao", default=None)
+
+
+class Preguicoso:
+    """
+    Valor de contexto calculado só quando algum sink escreve o registro, por exemplo
+    payload=Preguicoso(payload.model_dump). Registros descartados pelo nível ou pela
+    amostragem nunca pagam a serialização. Se o registro for serializado com pickle,
+    vai como texto.
+    """
+    __slots__ = ("_funcao", "_valor")
+
+    def __init__(self, funcao: Callable[[], Any]):
+        self._funcao = funcao
+        self._valor = None
+
+    def valor(self) -> Any:
+        if self._funcao is not None:
+            self._valor, self._funcao = self._funcao(), None
+        return self._valor
+
+    def __str__(self) -> str:
+        return str(self.valor())
+
+    __repr__ = __str__
+
+    def __reduce__(self):
+        return (str, (str(self),))
+
+
+class FilaDeLog:
     """
-    Configura o Loguru uma única vez para todo o projeto
+    Sinks do modo prod: quem loga só formata a mensagem e a põe numa fila em memória; uma
+    thread em segundo plano escreve no console e nos arquivos. Os arquivos (com rotação,
+    retenção e compressão) ficam num logger interno, independente do global, que só essa
+    thread usa e que grava a mensagem já formatada como veio.
+
+    Diferente do enqueue do Loguru, não há pickle nem pipe por registro e por sink.
+    """
+
+    def __init__(self, console):
+        self._console = console
+        self._fila: "queue.Queue" = queue.Queue()
+        self._interno = copy.deepcopy(logger)
+        self._interno.remove()
+        self._thread = threading.Thread(target=self._escrever, name="logs", daemon=True)
+        self._thread.start()
+
+    def console(self):
+        return lambda mensagem: self._fila.put((None, str(mensagem)))
+
+    def arquivo(self, caminho: Path, **opcoes):
+        destino = str(caminho)
+        self._interno.add(
+            caminho, format="{message}", level=0,
+            filter=lambda record: record["extra"].get("destino") == destino, **opcoes
+        )
+        return lambda mensagem: self._fila.put((destino, str(mensagem)))
+
+    def _escrever(self):
+        while True:
+            # Escreve o que estiver acumulado de uma vez: um write por destino, não por registro
+            itens = [self._fila.get()]
+            while len(itens) < 1000 and not self._fila.empty():
+                itens.append(self._fila.get_nowait())
+            por_destino: Dict[Optional[str], List[str]] = {}
+            for item in itens:
+                if item is not None:
+                    por_destino.setdefault(item[0], []).append(item[1])
+            try:
+                for destino, textos in por_destino.items():
+                    if destino is None:
+                        self._console.write("".join(textos))
+                        self._console.flush()
+                    else:
+                        self._interno.bind(destino=destino).opt(raw=True).info("".join(textos))
+            finally:
+                for _ in itens:
+                    self._fila.task_done()
+            if None in itens:
+                return
+
+    def esvaziar(self) -> None:
+        """Espera a thread escrever tudo o que já está na fila."""
+        self._fila.join()
+
+    def fechar(self) -> None:
+        self._fila.put(None)
+        self._thread.join()
+        self._interno.remove()
+
+
+_fila: Optional[FilaDeLog] = None
+
+# Taxas de amostragem em vigor (vazio no modo dev)
+_taxas: Dict[str, float] = {}
+
+
+def esvaziar_logs() -> None:
+    """No modo prod, espera os logs enfileirados serem escritos (no modo dev não há fila)."""
+    if _fila is not None:
+        _fila.esvaziar()
+
+
+def _fechar_fila() -> None:
+    global _fila
+    if _fila is not None:
+        _fila.fechar()
+        _fila = None
+
+
+atexit.register(_fechar_fila)
+
+
+def parse_amostragem(texto: str) -> Dict[str, float]:
+    """'DEBUG=0,INFO=0.1' -> {'DEBUG': 0.0, 'INFO': 0.1}"""
+    taxas = {}
+    for parte in filter(None, (p.strip() for p in texto.split(","))):
+        nivel, _, taxa = parte.partition("=")
+        taxas[nivel.strip().upper()] = float(taxa)
+    return taxas
+
+
+def _nada(*args, **kwargs) -> None:
+    pass
+
+
+class _ForaDaAmostra:
     """
-    
+    Logger de uma requisição que ficou fora da amostra em algum nível: as chamadas desses
+    níveis não fazem nada (nem chegam a criar o registro); as demais vão para o logger.
+    """
+    __slots__ = ("_log", "_descartados")
+
+    def __init__(self, log, descartados):
+        self._log = log
+        self._descartados = descartados
+
+    def __getattr__(self, nome):
+        return _nada if nome in self._descartados else getattr(self._log, nome)
+
+
+def _amostrado(log, amostra: float):
+    descartados = {nivel.lower() for nivel, taxa in _taxas.items() if amostra >= taxa}
+    return _ForaDaAmostra(log, descartados) if descartados else log
+
+
+def _filtro_amostragem(taxas: Dict[str, float]):
+    """
+    Mantém todo registro de WARNING para cima e os que não vêm de uma requisição; dos
+    demais, a fração `taxas[nível]` das requisições (pelo número sorteado em `amostra`).
+    """
+    def filtro(record) -> bool:
+        if record["level"].no >= logging.WARNING:
+            return True
+        amostra = record["extra"].get("amostra")
+        return amostra is None or amostra < taxas.get(record["level"].name, 1.0)
+    return filtro
+
+
+def setup_logger(
+    app_name: str = "financas_backend",
+    modo: str = Config.LOG_MODO,
+    logs_dir: Path = Path("logs"),
+    amostragem: Optional[Dict[str, float]] = None,
+):
+    """
+    Configura o Loguru uma única vez para todo o projeto.
+
+    modo="dev": tudo em DEBUG, escrito na hora, com backtrace/diagnose.
+    modo="prod": escrita em segundo plano (FilaDeLog), INFO para cima, sem diagnose, e
+    amostragem por nível dos eventos de requisição (LOG_AMOSTRAGEM, por exemplo
+    "DEBUG=0,INFO=0.1,SUCCESS=0.1").
+    """
+    global _fila, _taxas
+    if modo not in MODOS:
+        raise ValueError(f"Modo de log desconhecido: '{modo}' (opções: {', '.join(MODOS)})")
+    prod = modo == "prod"
+    if amostragem is None:
+        amostragem = parse_amostragem(Config.LOG_AMOSTRAGEM) if prod else {}
+    _taxas = {nivel: taxa for nivel, taxa in amostragem.items() if logger.level(nivel).no < logging.WARNING}
+
     # Remove handlers padrão
     logger.remove()
-    
+    _fechar_fila()
+
     # Cria diretório de logs
-    logs_dir = Path("logs")
+    logs_dir = Path(logs_dir)
     logs_dir.mkdir(exist_ok=True)
-    
+
+    comuns = dict(
+        backtrace=not prod,
+        diagnose=not prod,
+        filter=_filtro_amostragem(amostragem) if amostragem else None,
+    )
+    nivel = "INFO" if prod else "DEBUG"
+    if prod:
+        _fila = FilaDeLog(sys.stdout)
+
+    def arquivo(caminho: Path, **opcoes):
+        # No modo prod a rotação/retenção fica com o logger interno da fila
+        return dict(sink=_fila.arquivo(caminho, **opcoes)) if prod else dict(sink=caminho, **opcoes)
+
     # Formato para console (colorido e limpo)
     console_format = (
         "<green>{time:HH:mm:ss}</green> | "
@@ -24,7 +228,7 @@ def setup_logger(app_name: str = "financas_backend"):
         "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | "
         "<level>{message}</level>"
     )
-    
+
     # Formato para arquivo (mais detalhado)
     file_format = (
         "{time:YYYY-MM-DD HH:mm:ss} | "
@@ -33,61 +237,79 @@ def setup_logger(app_name: str = "financas_backend"):
         "{extra} | "
         "{message}"
     )
-    
+
     # Console handler
     logger.add(
-        sys.stdout,
+        _fila.console() if prod else sys.stdout,
         format=console_format,
-        level="DEBUG",
-        colorize=True,
-        backtrace=True,
-        diagnose=True
+        level=nivel,
+        colorize=not prod,
+        **comuns
     )
-    
+
     # Arquivo geral
     logger.add(
-        logs_dir / f"{app_name}.log",
+        **arquivo(
+            logs_dir / f"{app_name}.log",
+            rotation="50 MB",
+            retention="30 days",
+            compression="zip",
+            encoding="utf-8",
+        ),
         format=file_format,
-        level="DEBUG",
-        rotation="50 MB",
-        retention="30 days",
-        compression="zip",
-        encoding="utf-8",
-        backtrace=True,
-        diagnose=True
+        level=nivel,
+        **comuns
     )
-    
+
     # Arquivo só para erros
     logger.add(
-        logs_dir / f"{app_name}_errors.log",
+        **arquivo(
+            logs_dir / f"{app_name}_errors.log",
+            rotation="10 MB",
+            retention="90 days",
+            compression="zip",
+            encoding="utf-8",
+        ),
         format=file_format,
         level="ERROR",
-        rotation="10 MB",
-        retention="90 days",
-        compression="zip",
-        encoding="utf-8",
-        backtrace=True,
-        diagnose=True
+        **comuns
     )
-    
+
     # Logs estruturados em JSON
     logger.add(
-        logs_dir / f"{app_name}_structured.json",
+        **arquivo(
+            logs_dir / f"{app_name}_structured.json",
+            rotation="25 MB",
+            retention="30 days",
+            encoding="utf-8",
+        ),
         format="{message}",
         level="INFO",
         serialize=True,  # Formato JSON
-        rotation="25 MB",
-        retention="30 days",
-        encoding="utf-8"
+        **comuns
     )
-    
-    logger.info(f"Logger configurado para {app_name}")
+
+    logger.info(f"Logger configurado para {app_name} (modo {modo})")
 
     return logger
 
 # Configura o logger na importação
 setup_logger()
 
+
+def sortear_amostra() -> Token:
+    """
+    Sorteia o número da requisição que começa (o middleware de consultas faz isso para
+    cada requisição HTTP); os logs feitos depois, no mesmo contexto, reaproveitam. Devolve
+    o token para restaurar o valor anterior ao fim da requisição.
+    """
+    return _amostra_requisicao.set(random.random())
+
+
+def restaurar_amostra(token: Token) -> None:
+    _amostra_requisicao.reset(token)
+
+
 # Função para adicionar contexto
 def log_with_context(**kwargs):
     """
@@ -101,19 +323,30 @@ def log_database_operation(operation: str, collection: str = None, **context):
     """
     Log específico para operações de banco
     """
-    return logger.bind(
+    amostra = _amostra_requisicao.get()
+    if amostra is None:
+        # Fora de uma requisição (scripts, verificações, tarefas em segundo plano): sem amostragem
+        return logger.bind(operation=operation, collection=collection, **context)
+    return _amostrado(logger.bind(
         operation=operation,
         collection=collection,
+        amostra=amostra,
         **context
-    )
+    ), amostra)
 
 # Função para logs de API requests
 def log_api_request(method: str, endpoint: str, **context):
     """
     Log específico para requests de API
     """
-    return logger.bind(
+    amostra = _amostra_requisicao.get()
+    if amostra is None:
+        # Rota chamada sem o middleware: a própria chamada marca o início da requisição
+        sortear_amostra()
+        amostra = _amostra_requisicao.get()
+    return _amostrado(logger.bind(
         http_method=method,
         endpoint=endpoint,
+        amostra=amostra,
         **context
-    )
+    ), amostra)
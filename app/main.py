@@ -1,18 +1,50 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 # from .core.database import connect_to_mongo, close_mongo_connection
-from .logger import logger, log_with_context
+from .logger import esvaziar_logs, logger, log_with_context
+from .core.cache import categorias_cache, dashboard_cache
+from .core.config import Config
+from .core.consultas import ConsultasPorRequisicao
+from .core.database import AsyncSessionLocal, configuracao_banco, engine, engine_leitura, perfil
+from .core.escritor import ativar_escritor, desativar_escritor, estado_escritor
+from .core.metricas import CONTENT_TYPE, MetricasHTTP, registrar_caches, registrar_pools, registro
 
 from .routes.transacoes_routes import router as trasacoes_router
 from .routes.categorias_routes import router as categorias_router
 from .routes.dashboard_routes import router as dashboard_router
 from .routes.limits_routes import router as limits_router
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configuracao = await configuracao_banco()
+    for uso, ativa in configuracao.items():
+        log_with_context(banco=ativa).info(
+            f"Banco ({uso}) com perfil '{ativa['perfil']}': {ativa.get('pragmas', {})}"
+        )
+    if Config.DB_ESCRITOR_UNICO:
+        ativar_escritor(
+            AsyncSessionLocal,
+            lote_max=Config.DB_ESCRITOR_LOTE_MAX,
+            espera_max=Config.DB_ESCRITOR_ESPERA_MS / 1000,
+        )
+        logger.info(f"Escritor único ativo (até {Config.DB_ESCRITOR_LOTE_MAX} escritas por commit)")
+    yield
+    await desativar_escritor()
+    await engine.dispose()
+    await engine_leitura.dispose()
+    # No modo prod, espera a fila de logs ser escrita
+    esvaziar_logs()
+
+
 app = FastAPI(
     title="API Financeira",
     description='API para gerenciamento de transações financeiras',
     version='1.0.0',
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -21,7 +53,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Consultas", "X-DB-Tempo-Ms", "Server-Timing"],
 )
+app.add_middleware(ConsultasPorRequisicao, repetidas_max=perfil.consultas_repetidas_max)
+app.add_middleware(MetricasHTTP)
+
+registrar_caches({'dashboard': dashboard_cache, 'categorias': categorias_cache})
+registrar_pools([engine, engine_leitura])
 
 app.include_router(trasacoes_router)
 app.include_router(categorias_router)
@@ -43,5 +81,14 @@ async def health():
     '''Health check geral da api'''
     return {
         'status': 'Healthy',
-        'service': 'api-financeira'
-    }
\ No newline at end of file
+        'service': 'api-financeira',
+        'dashboard_cache': dashboard_cache.stats(),
+        'categorias_cache': categorias_cache.stats(),
+        'database': await configuracao_banco(),
+        'escritor': estado_escritor()
+    }
+
+@app.get('/metrics', tags=['Health'], response_class=Response)
+async def metrics():
+    '''Métricas no formato de texto do Prometheus'''
+    return Response(registro.expor(), media_type=CONTENT_TYPE)
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from typing import List
 
+from app.core.database import leitura
 from app.db.repositories.categoria import CategoriaRepository
 from app.schemas.categorias import Categoria, CategoriaCreate, CategoriaUpdate
-from app.logger import log_api_request
+from app.logger import Preguicoso, log_api_request
 
 router = APIRouter(prefix="/categorias", tags=["Categorias"])
 
@@ -17,7 +18,7 @@ router = APIRouter(prefix="/categorias", tags=["Categorias"])
 )
 async def list_categoria(
     request: Request,
-    repo: CategoriaRepository = Depends(CategoriaRepository)
+    repo: CategoriaRepository = Depends(leitura(CategoriaRepository))
 ):
     """
     Obtém a lista completa de categorias.
@@ -45,7 +46,7 @@ async def list_categoria(
 async def get_categoria_by_id(
     request: Request,
     categoria_id: int,
-    repo: CategoriaRepository = Depends(CategoriaRepository)
+    repo: CategoriaRepository = Depends(leitura(CategoriaRepository))
 ):
     """
     Busca uma categoria pelo seu identificador.
@@ -77,7 +78,7 @@ async def create_categoria(
     """
     Cria uma categoria a partir dos dados fornecidos.
     """
-    log = log_api_request(method="POST", endpoint=str(request.url), payload=payload.dict())
+    log = log_api_request(method="POST", endpoint=str(request.url), payload=Preguicoso(payload.dict))
     try:
         categoria = await repo.create(payload)
         log.info(f"Categoria criada com ID {categoria.id}")
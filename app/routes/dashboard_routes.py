@@ -1,15 +1,19 @@
+import asyncio
 import calendar
 from fastapi import APIRouter, Query, Depends, HTTPException, status
-from typing import Any, Dict, Literal
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, Literal, Optional
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_session
+from app.core.cache import dashboard_cache
+from app.core.database import AsyncSessionLeitura, get_session_leitura
 
 from app.db.repositories.dashboard import DashboardRepository
-from app.schemas.dashboard import EntradasPorCategoriaResponse, ExtratoResponse, GastosPorCategoriaResponse, OpcoesCategoriaResponse, RendimentoPeriodoResponse, TipoTrans
+from app.schemas.dashboard import DashboardOverviewResponse, EntradasPorCategoriaResponse, ExtratoResponse, GastosPorCategoriaResponse, OpcoesCategoriaResponse, RendimentoPeriodoResponse, TipoTrans
 
 from app.logger import log_api_request
+from app.utils.exportacao import ExportadorExtrato
 
 
 
@@ -26,14 +30,18 @@ def parse_date(date_str: str, field_name: str) -> datetime:
     "/extrato",
     response_model=ExtratoResponse,
     summary="Extrato financeiro completo",
-    description="Retorna entradas, saídas, meta e lista de transações no período",
+    description="Retorna entradas, saídas, meta e lista de transações no período. "
+                "Com formato=ndjson ou formato=csv as transações são enviadas em streaming, "
+                "com os totais em um registro final.",
     status_code=status.HTTP_200_OK
 )
 async def extrato_financeiro(
     data_inicio: str = Query(..., description="Data inicial DD/MM/YYYY"),
     data_final: str = Query(..., description="Data final DD/MM/YYYY"),
     natureza: str = Query(..., description="Natureza jurídica: pf ou pj"),
-    db: AsyncSession = Depends(get_session)
+    formato: Literal["json", "ndjson", "csv"] = Query("json", description="Formato da resposta"),
+    # scope="request": a sessão só é fechada depois do envio do corpo, então o streaming usa a mesma
+    db: AsyncSession = Depends(get_session_leitura, scope="request")
 ):
     api_logger = log_api_request("GET", "/dashboard/extrato")
 
@@ -41,8 +49,14 @@ async def extrato_financeiro(
     dt_f = parse_date(data_final, "data_final")
     dt_f = datetime.combine(dt_f.date(), datetime.max.time())
 
+    if formato != "json":
+        return _stream_extrato(db, dt_i, dt_f, natureza, data_inicio, data_final, formato)
+
     dashboard_repo = DashboardRepository(db)
-    extrato = await dashboard_repo.extrato_financeiro(dt_i, dt_f, natureza, data_inicio, data_final)
+    extrato = await dashboard_cache.get_or_compute(
+        dashboard_cache.key("/dashboard/extrato", data_inicio=dt_i, data_final=dt_f, natureza=natureza),
+        lambda: dashboard_repo.extrato_financeiro(dt_i, dt_f, natureza, data_inicio, data_final)
+    )
 
     api_logger.success(
         "Extrato gerado", 
@@ -55,21 +69,64 @@ async def extrato_financeiro(
 
 
 
+def _stream_extrato(db: AsyncSession, dt_i, dt_f, natureza, data_inicio, data_final, formato) -> StreamingResponse:
+    """
+    Resposta em streaming do extrato, lida da sessão da rota: a dependência com
+    scope="request" só a encerra depois que o gerador termina de enviar o corpo.
+    """
+    api_logger = log_api_request("GET", "/dashboard/extrato", formato=formato)
+    exportador = ExportadorExtrato(formato)
+    dashboard_repo = DashboardRepository(db)
+
+    async def corpo():
+        async def rodape(entradas, saidas):
+            return {
+                "entradas": entradas,
+                "saidas": saidas,
+                "total_investido": entradas,
+                "meta_mensal": await dashboard_repo.meta_mensal(),
+                "data_inicial": data_inicio,
+                "data_final": data_final,
+            }
+
+        linhas = dashboard_repo.stream_extrato(dt_i, dt_f, natureza)
+        async for bloco in exportador.gerar(linhas, rodape):
+            yield bloco
+
+        api_logger.success("Extrato exportado", formato=formato, count=exportador.quantidade)
+
+    return StreamingResponse(
+        corpo(),
+        media_type=exportador.media_type,
+        headers={"Content-Disposition": f'attachment; filename="extrato.{formato}"'}
+    )
+
+
 @router.get(
     "/rendimento-periodo",
     response_model=RendimentoPeriodoResponse,
     summary="Rendimento por período",
-    description="Retorna entradas/saídas agregadas por mês no ano"
+    description="Retorna entradas/saídas agregadas por mês no ano (opcionalmente só entre mes_inicio e mes_fim)"
 )
 async def rendimento_periodo(
     ano: int = Query(..., description="Ano para agregação (YYYY)"),
     natureza: str = Query(..., description="Natureza jurídica: pf ou pj"),
-    db: AsyncSession = Depends(get_session)
+    mes_inicio: int = Query(1, ge=1, le=12, description="Primeiro mês do intervalo (1-12)"),
+    mes_fim: int = Query(12, ge=1, le=12, description="Último mês do intervalo (1-12)"),
+    db: AsyncSession = Depends(get_session_leitura, scope="function")
 ):
     api_logger = log_api_request("GET", "/dashboard/rendimento-periodo")
 
+    if mes_inicio > mes_fim:
+        raise HTTPException(status_code=400, detail="mes_inicio não pode ser maior que mes_fim.")
+
     dashboard_repo = DashboardRepository(db)
-    rendimento_ano = await dashboard_repo.rendimento_por_periodo(ano, natureza)
+    rendimento_ano = await dashboard_cache.get_or_compute(
+        dashboard_cache.key(
+            "/dashboard/rendimento-periodo", ano=ano, natureza=natureza, mes_inicio=mes_inicio, mes_fim=mes_fim
+        ),
+        lambda: dashboard_repo.rendimento_por_periodo(ano, natureza, range(mes_inicio, mes_fim + 1))
+    )
 
     api_logger.success("Rendimento por período gerado", year=ano)
 
@@ -87,21 +144,27 @@ async def gastos_por_categoria(
     data_final: str = Query(..., description="Data final DD/MM/YYYY"),
     natureza: str = Query(..., description="Natureza jurídica: pf ou pj"),
     tipo: Literal["entrada", "saida"] = Query(..., description="Tipo de transação"),
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_session_leitura, scope="function"),
 ):
     dt_i = datetime.strptime(data_inicio, "%d/%m/%Y")
     dt_f = datetime.strptime(data_final, "%d/%m/%Y")
     dt_f = datetime.combine(dt_f.date(), datetime.max.time())
 
     repo = DashboardRepository(db)
-    categorias = await repo.gastos_por_categoria(
-        dt_i, dt_f, natureza, TipoTrans(tipo)
-    )
 
-    return GastosPorCategoriaResponse(
-        data_inicial=data_inicio,
-        data_final=data_final,
-        categorias=categorias,
+    async def calcular():
+        categorias = await repo.gastos_por_categoria(
+            dt_i, dt_f, natureza, TipoTrans(tipo)
+        )
+        return GastosPorCategoriaResponse(
+            data_inicial=data_inicio,
+            data_final=data_final,
+            categorias=categorias,
+        )
+
+    return await dashboard_cache.get_or_compute(
+        dashboard_cache.key("/dashboard/gastos-por-categoria", data_inicio=dt_i, data_final=dt_f, natureza=natureza, tipo=tipo),
+        calcular
     )
 @router.get(
     '/opcoes-categorias',
@@ -111,7 +174,7 @@ async def gastos_por_categoria(
 )
 async def opcoes_categorias(
     natureza: Literal['pf', 'pj', 'all'] = Query('all'),
-    db: AsyncSession = Depends(get_session)
+    db: AsyncSession = Depends(get_session_leitura, scope="function")
 ) -> OpcoesCategoriaResponse:
     
     api_logger = log_api_request('GET', '/dashboard/opcoes-categorias', natureza=natureza)
@@ -133,7 +196,7 @@ async def entradas_por_categoria(
     data_inicio: str = Query(..., description='Data inicial DD/MM/YYYY'),
     data_final: str = Query(..., description='Data final DD/MM/YYYY'),
     natureza: str = Query(..., description='Natureza jurídica: pf ou pj'),
-    db: AsyncSession = Depends(get_session)
+    db: AsyncSession = Depends(get_session_leitura, scope="function")
 ):
     api_logger = log_api_request('GET', '/dashboard/entradas-por-categoria')
     
@@ -142,7 +205,65 @@ async def entradas_por_categoria(
     dt_f = datetime.combine(dt_f.date(), datetime.max.time())
 
     dashboard_repo = DashboardRepository(db)
-    resultado = await dashboard_repo.entradas_por_categoria(dt_i, dt_f, natureza, data_inicio, data_final)
+    resultado = await dashboard_cache.get_or_compute(
+        dashboard_cache.key('/dashboard/entradas-por-categoria', data_inicio=dt_i, data_final=dt_f, natureza=natureza),
+        lambda: dashboard_repo.entradas_por_categoria(dt_i, dt_f, natureza, data_inicio, data_final)
+    )
 
     api_logger.success('Entradas por categoria geradas', count=len(resultado.subcategorias))
     return resultado
+
+
+async def _painel(consulta):
+    """Executa uma consulta do dashboard em uma sessão própria, para rodar em paralelo."""
+    async with AsyncSessionLeitura() as db:
+        return await consulta(DashboardRepository(db))
+
+
+@router.get(
+    '/overview',
+    response_model=DashboardOverviewResponse,
+    summary='Visão geral do dashboard',
+    description='Retorna totais do extrato, rendimento mensal, gastos/entradas por categoria e a meta em uma única resposta'
+)
+async def overview(
+    data_inicio: str = Query(..., description='Data inicial DD/MM/YYYY'),
+    data_final: str = Query(..., description='Data final DD/MM/YYYY'),
+    natureza: str = Query(..., description='Natureza jurídica: pf ou pj'),
+    ano: Optional[int] = Query(None, description='Ano do rendimento mensal (padrão: ano de data_inicio)'),
+):
+    api_logger = log_api_request('GET', '/dashboard/overview')
+
+    dt_i = parse_date(data_inicio, 'data_inicio')
+    dt_f = parse_date(data_final, 'data_final')
+    dt_f = datetime.combine(dt_f.date(), datetime.max.time())
+    ano = ano or dt_i.year
+
+    async def calcular():
+        # Cada painel usa sua própria sessão; período e meta são calculados uma única vez
+        meta, (entradas, saidas), meses, gastos, entradas_cat = await asyncio.gather(
+            _painel(lambda repo: repo.meta_mensal()),
+            _painel(lambda repo: repo.totais_periodo(dt_i, dt_f, natureza)),
+            _painel(lambda repo: repo.meses_rendimento(ano, natureza)),
+            _painel(lambda repo: repo.gastos_por_categoria(dt_i, dt_f, natureza, TipoTrans.saida)),
+            _painel(lambda repo: repo.entradas_por_categoria(dt_i, dt_f, natureza, data_inicio, data_final)),
+        )
+        return DashboardOverviewResponse(
+            data_inicial=data_inicio,
+            data_final=data_final,
+            meta_mensal=meta,
+            entradas=entradas,
+            saidas=saidas,
+            total_investido=entradas,
+            rendimento=meses,
+            gastos_por_categoria=gastos,
+            entradas_por_categoria=entradas_cat.subcategorias,
+        )
+
+    resultado = await dashboard_cache.get_or_compute(
+        dashboard_cache.key('/dashboard/overview', data_inicio=dt_i, data_final=dt_f, natureza=natureza, ano=ano),
+        calcular
+    )
+
+    api_logger.success('Visão geral gerada', entradas=resultado.entradas, saidas=resultado.saidas)
+    return resultado
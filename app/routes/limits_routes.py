@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any
 
-from app.core.database import get_session
+from app.core.database import get_session, get_session_leitura
 from app.db.repositories.limits import LimitsRepository
 from app.schemas.limits import LimitsUpdatePayload, LimitsUpdateResponse
 
@@ -18,7 +18,7 @@ router = APIRouter(prefix="/limits", tags=["Limits"])
     description="Retorna todas as categorias com subcategorias formatadas para gestão de limites"
 )
 async def get_all_limits(
-    db: AsyncSession = Depends(get_session)
+    db: AsyncSession = Depends(get_session_leitura, scope="function")
 ):
     """
     Endpoint para buscar todas as categorias e subcategorias para gestão de limites.
@@ -36,7 +36,7 @@ async def get_all_limits(
 )
 async def update_limits_bulk(
     payload: LimitsUpdatePayload,
-    db: AsyncSession = Depends(get_session)
+    db: AsyncSession = Depends(get_session, scope="function")
 ):
     """
     Endpoint para atualização em lote de limites.
@@ -1,12 +1,21 @@
 # app/routes/transacoes.py
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
+from pathlib import Path
+import tempfile
 
+from app.core.config import Config
+from app.core.database import AsyncSessionLocal, leitura
 from app.db.repositories.transacao import TransacaoRepository
-from app.schemas.transacao import TransacaoCreate, TransacaoResponse, TransacaoUpdate
-from app.logger import log_api_request
+from app.schemas.transacao import (
+    ImportacaoResponse, NaturezaTransacao, TipoPagamento, TipoTransacao, TransacaoBatchResponse, TransacaoCreate,
+    TransacaoFiltros, TransacaoPaginaResponse, TransacaoResponse, TransacaoUpdate
+)
+from app.utils.importacao import ImportadorExtrato
+from app.utils.paginacao import decode_cursor, encode_cursor
+from app.logger import Preguicoso, log_api_request
 
 router = APIRouter(prefix="/transacoes", tags=["Transações"])
 
@@ -20,7 +29,7 @@ async def create_transacao(
     """
     Cria uma transação. Se categoria/subcategoria não existirem, são criadas.
     """
-    log = log_api_request(method="POST", endpoint=str(request.url), payload=payload.model_dump())
+    log = log_api_request(method="POST", endpoint=str(request.url), payload=Preguicoso(payload.model_dump))
     try:
         return await repo.create(payload)
     except HTTPException:
@@ -31,21 +40,114 @@ async def create_transacao(
 
 
 
+@router.post(
+    "/batch",
+    response_model=TransacaoBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Criar transações em lote",
+    description="Cria uma lista de transações numa única transação do banco, com resultado por item."
+)
+async def create_transacoes_batch(
+    request: Request,
+    payload: List[TransacaoCreate],
+    repo: TransacaoRepository = Depends(TransacaoRepository)
+):
+    """
+    Cria várias transações de uma vez. Categorias/subcategorias informadas por nome que
+    não existirem são criadas; itens com IDs inválidos são rejeitados sem afetar os demais.
+    """
+    log = log_api_request(method="POST", endpoint=str(request.url), itens=len(payload))
+    if not payload:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Lote vazio")
+    if len(payload) > Config.TRANSACOES_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Lote excede o máximo de {Config.TRANSACOES_BATCH_MAX_ITEMS} itens"
+        )
+    try:
+        return await repo.create_batch(payload)
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error(f"Erro interno ao criar lote de transações: {e}")
+        raise HTTPException(status_code=500, detail="Erro interno")
+
+
+@router.post(
+    "/importar",
+    response_model=ImportacaoResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Importar extrato CSV ou OFX",
+    description="Recebe o arquivo no corpo da requisição e importa em blocos, como o importar_extrato.py. "
+                "Rodando no servidor, os commits invalidam os caches do dashboard e de categorias."
+)
+async def importar_extrato(
+    request: Request,
+    formato: Literal["csv", "ofx"] = Query(..., description="Formato do arquivo"),
+    nome_arquivo: str = Query("extrato", description="Nome do arquivo, guardado na importação"),
+    natureza: NaturezaTransacao = Query(NaturezaTransacao.PF, description="Natureza das linhas sem natureza"),
+    forma_pagamento: TipoPagamento = Query(TipoPagamento.DEBITO, description="Forma de pagamento padrão"),
+    categoria: str = Query("Importação", description="Categoria das linhas sem categoria"),
+    subcategoria: str = Query("Extrato", description="Subcategoria das linhas sem subcategoria"),
+    delimitador: str = Query(",", description="Separador do CSV"),
+    encoding: str = Query("utf-8", description="Codificação do arquivo"),
+):
+    """
+    Importa um extrato enviado como corpo bruto (sem multipart). O arquivo é gravado num
+    diretório temporário e importado com sessões do próprio servidor; reenviar o mesmo
+    arquivo continua a importação do último bloco gravado.
+    """
+    log = log_api_request(method="POST", endpoint=str(request.url), formato=formato, arquivo=nome_arquivo)
+    importador = ImportadorExtrato(
+        formato,
+        natureza=natureza.value,
+        forma_pagamento=forma_pagamento.value,
+        categoria_nome=categoria,
+        subcategoria_nome=subcategoria,
+        delimitador=delimitador,
+        encoding=encoding,
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = Path(tmp) / (Path(nome_arquivo).name or "extrato")
+        with open(caminho, "wb") as arquivo:
+            async for parte in request.stream():
+                arquivo.write(parte)
+        if caminho.stat().st_size == 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Arquivo vazio")
+        try:
+            resumo = await importador.importar(AsyncSessionLocal, caminho)
+        except Exception as e:
+            log.error(f"Erro interno ao importar extrato: {e}")
+            raise HTTPException(status_code=500, detail="Erro interno")
+    log.success(f"Importação {resumo['importacao_id']} concluída")
+    return resumo
+
+
 @router.get(
     "/",
-    response_model=List[TransacaoResponse],
+    response_model=TransacaoPaginaResponse,
     status_code=status.HTTP_200_OK,
     summary="Listar transações",
-    description="Lista todas as transações, com filtros opcionais por data."
+    description="Lista transações paginadas por cursor, com filtros opcionais por data, tipo, natureza, "
+                "forma de pagamento, categoria, subcategoria e faixa de valor."
 )
 async def list_transacoes(
     request: Request,
     data_inicio: Optional[datetime] = Query(None),
     data_final: Optional[datetime] = Query(None),
-    repo: TransacaoRepository = Depends(TransacaoRepository)
+    tipo: Optional[TipoTransacao] = Query(None),
+    natureza: Optional[NaturezaTransacao] = Query(None),
+    forma_pagamento: Optional[TipoPagamento] = Query(None),
+    categoria_id: Optional[int] = Query(None),
+    subcategoria_id: Optional[int] = Query(None),
+    valor_min: Optional[float] = Query(None, ge=0),
+    valor_max: Optional[float] = Query(None, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor da página anterior"),
+    limit: int = Query(Config.TRANSACOES_PAGE_SIZE, ge=1, le=Config.TRANSACOES_MAX_PAGE_SIZE),
+    repo: TransacaoRepository = Depends(leitura(TransacaoRepository))
 ):
     """
-    Obtém transações entre data_inicio e data_final, se fornecidas.
+    Obtém uma página de transações entre data_inicio e data_final, se fornecidas.
     """
     log = log_api_request(
         method="GET",
@@ -54,9 +156,29 @@ async def list_transacoes(
         data_final=data_final
     )
     try:
-        transacoes = await repo.get_all(data_inicio, data_final)
+        chave_cursor = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+
+    filtros = TransacaoFiltros(
+        tipo=tipo,
+        natureza=natureza,
+        forma_pagamento=forma_pagamento,
+        categoria_id=categoria_id,
+        subcategoria_id=subcategoria_id,
+        valor_min=valor_min,
+        valor_max=valor_max
+    )
+    try:
+        # Busca uma linha a mais para saber se existe próxima página
+        transacoes = await repo.get_all(data_inicio, data_final, filtros, chave_cursor, limit + 1)
+        next_cursor = None
+        if len(transacoes) > limit:
+            transacoes = transacoes[:limit]
+            ultima = transacoes[-1]
+            next_cursor = encode_cursor(ultima.data_transacao, ultima.id)
         log.info(f"{len(transacoes)} transações listadas")
-        return transacoes
+        return TransacaoPaginaResponse(items=transacoes, next_cursor=next_cursor, limit=limit)
     except Exception as e:
         log.error(f"Erro ao listar transações: {e}")
         raise HTTPException(
@@ -75,7 +197,7 @@ async def list_transacoes(
 async def get_transacao_by_id(
     request: Request,
     transacao_id: int,
-    repo: TransacaoRepository = Depends(TransacaoRepository)
+    repo: TransacaoRepository = Depends(leitura(TransacaoRepository))
 ):
     """
     Busca transação pelo seu identificador.
@@ -103,7 +225,7 @@ async def update_transacao(
     payload: TransacaoUpdate,
     repo: TransacaoRepository = Depends(TransacaoRepository)
 ):
-    log = log_api_request(method="PUT", endpoint=str(request.url), transacao_id=transacao_id, payload=payload.dict(exclude_unset=True))
+    log = log_api_request(method="PUT", endpoint=str(request.url), transacao_id=transacao_id, payload=Preguicoso(lambda: payload.dict(exclude_unset=True)))
     trans = await repo.update(transacao_id, payload)
     if not trans:
         log.warning(f"Transação {transacao_id} não encontrada")
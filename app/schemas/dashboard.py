@@ -100,4 +100,18 @@ class EntradasPorCategoriaResponse(BaseModel):
     subcategorias: List[Dict[str, Any]] = Field(..., description="Lista de categorias com entradas por subcategoria")
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class DashboardOverviewResponse(BaseModel):
+    data_inicial: str = Field(..., description="Data inicial do filtro (DD/MM/YYYY)")
+    data_final: str = Field(..., description="Data final do filtro (DD/MM/YYYY)")
+    meta_mensal: float = Field(..., description="Meta mensal financeira")
+    entradas: float = Field(..., description="Total de entradas no período")
+    saidas: float = Field(..., description="Total de saídas no período")
+    total_investido: float = Field(..., description="Total investido (igual às entradas)")
+    rendimento: Dict[str, MesRendimento] = Field(..., description="Entradas e saídas por mês do ano")
+    gastos_por_categoria: List[CategoriaGasto] = Field(..., description="Saídas agregadas por categoria")
+    entradas_por_categoria: List[Dict[str, Any]] = Field(..., description="Entradas por subcategoria agrupadas por categoria")
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ValidationInfo, model_validator, field_validator
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 from uuid import UUID
@@ -81,6 +81,50 @@ class TransacaoResponse(TransacaoBase):
         from_attributes = True
 
 
+class TransacaoFiltros(BaseModel):
+    tipo: Optional[TipoTransacao] = None
+    natureza: Optional[NaturezaTransacao] = None
+    forma_pagamento: Optional[TipoPagamento] = None
+    categoria_id: Optional[int] = None
+    subcategoria_id: Optional[int] = None
+    valor_min: Optional[float] = Field(None, ge=0)
+    valor_max: Optional[float] = Field(None, ge=0)
+
+
+class TransacaoPaginaResponse(BaseModel):
+    items: List[TransacaoResponse] = Field(..., description='Transações da página')
+    next_cursor: Optional[str] = Field(None, description='Cursor da próxima página (null na última)')
+    limit: int = Field(..., description='Tamanho da página')
+
+
+class TransacaoBatchItemResult(BaseModel):
+    index: int = Field(..., description='Posição do item na lista enviada')
+    success: bool = Field(..., description='Se o item foi gravado')
+    group_id: Optional[UUID] = Field(None, description='Grupo das transações criadas para o item')
+    ids: List[int] = Field(default_factory=list, description='IDs criados (um por parcela)')
+    error: Optional[str] = Field(None, description='Motivo da rejeição do item')
+
+
+class TransacaoBatchResponse(BaseModel):
+    success: bool = Field(..., description='Status da operação (false se algum item foi rejeitado)')
+    message: str = Field(..., description='Mensagem de retorno')
+    created_items: int = Field(0, description='Itens gravados')
+    created_transactions: int = Field(0, description='Transações gravadas, contando parcelas')
+    created_categories: int = Field(0, description='Categorias criadas por nome')
+    created_subcategories: int = Field(0, description='Subcategorias criadas por nome')
+    results: List[TransacaoBatchItemResult] = Field(default_factory=list, description='Resultado de cada item, na ordem enviada')
+
+
+class ImportacaoResponse(BaseModel):
+    importacao_id: int = Field(..., description='ID da importação (retomada pelo hash do arquivo)')
+    concluida: bool = Field(..., description='Se o arquivo foi lido até o fim')
+    linhas_processadas: int = Field(..., description='Registros lidos do arquivo')
+    linhas_importadas: int = Field(..., description='Registros gravados como transações')
+    linhas_rejeitadas: int = Field(..., description='Registros inválidos ou recusados')
+    segundos: float = Field(..., description='Duração desta execução')
+    linhas_por_segundo: float = Field(..., description='Vazão desta execução')
+
+
 class TransacaoUpdate(BaseModel):
     valor: Optional[float] = Field(None, gt=0, description='Valor da transação')
     descricao: Optional[str] = Field(None, min_length=1, max_length=500, description='Descrição da transação')
@@ -0,0 +1,90 @@
+# app/utils/exportacao.py
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List
+
+from app.db.types import de_centavos, para_centavos
+
+# Colunas exportadas por transação (mesmos nomes de TransacaoExtrato)
+COLUNAS_EXTRATO = [
+    "id", "valor", "descricao", "parcelas", "total_parcelas", "data_transacao", "tipo",
+    "natureza_transacao", "forma_pagamento", "categoria", "subcategoria",
+    "data_criacao", "data_atualizacao",
+]
+COLUNAS_TOTAIS = ["entradas", "saidas", "total_investido", "meta_mensal", "data_inicial", "data_final"]
+
+# Linhas acumuladas antes de cada envio ao cliente
+LINHAS_POR_BLOCO = 500
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+class ExportadorExtrato:
+    """
+    Converte o fluxo de transações do extrato em NDJSON ou CSV, acumulando os totais
+    durante a leitura para emiti-los como registro final.
+    """
+
+    def __init__(self, formato: str):
+        self.formato = formato
+        # Totais acumulados em centavos para não somar erro de float linha a linha
+        self.entradas = 0
+        self.saidas = 0
+        self.quantidade = 0
+
+    @property
+    def media_type(self) -> str:
+        return "application/x-ndjson" if self.formato == "ndjson" else "text/csv"
+
+    def _acumular(self, row: Dict[str, Any]) -> None:
+        self.quantidade += 1
+        if row["tipo"] == "entrada":
+            self.entradas += para_centavos(row["valor"])
+        elif row["tipo"] == "saida":
+            self.saidas += para_centavos(row["valor"])
+
+    def _csv(self, rows: List[List[Any]]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+    async def gerar(self, rows: AsyncIterator[Dict[str, Any]], rodape) -> AsyncIterator[str]:
+        """
+        `rows` é o iterador assíncrono de transações; `rodape` é uma coroutine function
+        chamada ao final com (entradas, saidas) que retorna o dicionário de totais.
+        """
+        bloco: List[Any] = []
+        if self.formato == "csv":
+            bloco.append(COLUNAS_EXTRATO)
+
+        async for row in rows:
+            self._acumular(row)
+            if self.formato == "csv":
+                bloco.append([
+                    v.isoformat() if isinstance(v, datetime) else v
+                    for v in (row[c] for c in COLUNAS_EXTRATO)
+                ])
+            else:
+                bloco.append(json.dumps({c: row[c] for c in COLUNAS_EXTRATO}, default=_json_default))
+            if len(bloco) >= LINHAS_POR_BLOCO:
+                yield self._flush(bloco)
+                bloco = []
+
+        totais = await rodape(de_centavos(self.entradas), de_centavos(self.saidas))
+        if self.formato == "csv":
+            bloco.extend([[], COLUNAS_TOTAIS, [totais[c] for c in COLUNAS_TOTAIS]])
+        else:
+            bloco.append(json.dumps({"totais": totais}, default=_json_default))
+        yield self._flush(bloco)
+
+    def _flush(self, bloco: List[Any]) -> str:
+        if self.formato == "csv":
+            return self._csv(bloco)
+        return "\n".join(bloco) + "\n"
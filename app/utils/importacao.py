@@ -0,0 +1,308 @@
+# app/utils/importacao.py
+
+import asyncio
+import csv
+import hashlib
+import io
+import re
+import time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO
+
+from app.core.config import Config
+from app.db.repositories.importacao import ImportacaoRepository
+from app.db.repositories.transacao import TransacaoRepository
+from app.logger import log_database_operation
+from app.schemas.transacao import TransacaoCreate
+
+FORMATOS = ("csv", "ofx")
+
+# Tamanho das leituras do arquivo; a memória usada não depende do tamanho do extrato
+BYTES_POR_LEITURA = 1 << 20
+
+FORMATOS_DATA = ("%d/%m/%Y", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M")
+
+# Nomes aceitos no cabeçalho do CSV para cada campo de TransacaoCreate
+COLUNAS_CSV = {
+    "data_transacao": ("data_transacao", "data"),
+    "descricao": ("descricao", "descrição", "historico", "histórico"),
+    "valor": ("valor",),
+    "tipo": ("tipo",),
+    "natureza": ("natureza",),
+    "forma_pagamento": ("forma_pagamento",),
+    "total_parcelas": ("total_parcelas",),
+    "categoria_id": ("categoria_id",),
+    "categoria_nome": ("categoria_nome", "categoria"),
+    "subcategoria_id": ("subcategoria_id",),
+    "subcategoria_nome": ("subcategoria_nome", "subcategoria"),
+}
+
+STMTTRN = re.compile(r"<STMTTRN>(.*?)</STMTTRN>", re.S | re.I)
+CAMPO_OFX = re.compile(r"<(\w+)>([^<\r\n]*)")
+
+
+class _LeitorContado(io.RawIOBase):
+    """Repassa as leituras do arquivo binário contando os bytes lidos (para o progresso)."""
+
+    def __init__(self, bruto):
+        self.bruto = bruto
+        self.lidos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = self.bruto.readinto(buffer)
+        self.lidos += n or 0
+        return n
+
+
+def hash_arquivo(caminho: Path) -> str:
+    """SHA-256 do conteúdo, lido em blocos; identifica o arquivo para retomar a importação."""
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(BYTES_POR_LEITURA), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def parse_valor(texto: str) -> Decimal:
+    """Aceita '1234.56', '1.234,56', '1,234.56', '-12,5' e 'R$ 10,00'."""
+    s = texto.strip().replace("R$", "").replace(" ", "")
+    if "," in s and "." in s:
+        # O último separador é o decimal
+        if s.rfind(",") > s.rfind("."):
+            s = s.replace(".", "").replace(",", ".")
+        else:
+            s = s.replace(",", "")
+    elif "," in s:
+        s = s.replace(",", ".")
+    try:
+        return Decimal(s)
+    except InvalidOperation:
+        raise ValueError(f"Valor inválido: {texto!r}")
+
+
+def parse_data(texto: str) -> datetime:
+    texto = texto.strip()
+    try:
+        return datetime.fromisoformat(texto)
+    except ValueError:
+        pass
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            continue
+    raise ValueError(f"Data inválida: {texto!r}")
+
+
+def parse_data_ofx(texto: str) -> datetime:
+    """DTPOSTED do OFX: AAAAMMDD[HHMMSS[.XXX]][fuso], ignorando fração e fuso."""
+    digitos = re.match(r"\d+", texto.strip())
+    if not digitos or len(digitos.group()) < 8:
+        raise ValueError(f"Data inválida: {texto!r}")
+    d = digitos.group()
+    return datetime.strptime(d[:14], "%Y%m%d%H%M%S") if len(d) >= 14 else datetime.strptime(d[:8], "%Y%m%d")
+
+
+def ler_csv(texto: TextIO, delimitador: str = ",") -> Iterator[Dict[str, str]]:
+    """Registros do CSV, um por linha, com o cabeçalho normalizado em minúsculas."""
+    leitor = csv.reader(texto, delimiter=delimitador)
+    cabecalho = [c.strip().lower() for c in next(leitor, [])]
+    for linha in leitor:
+        if any(campo.strip() for campo in linha):
+            yield dict(zip(cabecalho, linha))
+
+
+def ler_ofx(texto: TextIO) -> Iterator[Dict[str, str]]:
+    """
+    Registros <STMTTRN> do OFX (SGML ou XML), lidos em blocos: só o trecho ainda
+    não fechado de uma transação fica no buffer entre uma leitura e outra.
+    """
+    buffer = ""
+    while True:
+        lido = texto.read(BYTES_POR_LEITURA)
+        if not lido:
+            break
+        buffer += lido
+        fim = 0
+        for m in STMTTRN.finditer(buffer):
+            yield {tag.upper(): valor.strip() for tag, valor in CAMPO_OFX.findall(m.group(1))}
+            fim = m.end()
+        buffer = buffer[fim:]
+        aberto = buffer.upper().rfind("<STMTTRN>")
+        buffer = buffer[aberto:] if aberto >= 0 else buffer[-len("<STMTTRN>"):]
+
+
+class ImportadorExtrato:
+    """
+    Importa extratos CSV ou OFX em blocos de `linhas_por_bloco` registros.
+
+    Cada bloco é gravado pelo TransacaoRepository.inserir_lote e confirmado junto com o
+    progresso em `importacoes`; uma nova execução sobre o mesmo arquivo continua do
+    último bloco confirmado. Campos ausentes no arquivo usam os padrões informados.
+    """
+
+    def __init__(
+        self,
+        formato: str,
+        natureza: str = "pf",
+        forma_pagamento: str = "debito",
+        categoria_nome: str = "Importação",
+        subcategoria_nome: str = "Extrato",
+        delimitador: str = ",",
+        encoding: str = "utf-8",
+        linhas_por_bloco: int = Config.IMPORTACAO_LINHAS_POR_BLOCO,
+    ):
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato não suportado: {formato}")
+        self.formato = formato
+        self.padroes = {
+            "natureza": natureza,
+            "forma_pagamento": forma_pagamento,
+            "categoria_nome": categoria_nome,
+            "subcategoria_nome": subcategoria_nome,
+        }
+        self.delimitador = delimitador
+        self.encoding = encoding
+        self.linhas_por_bloco = linhas_por_bloco
+
+    def registros(self, texto: TextIO) -> Iterator[Dict[str, str]]:
+        if self.formato == "csv":
+            return ler_csv(texto, self.delimitador)
+        return ler_ofx(texto)
+
+    def _mapear_csv(self, registro: Dict[str, str]) -> Dict[str, Any]:
+        dados: Dict[str, Any] = {}
+        for campo, nomes in COLUNAS_CSV.items():
+            valor = next((registro[n] for n in nomes if registro.get(n, "").strip()), None)
+            if valor is not None:
+                dados[campo] = valor.strip()
+        if "data_transacao" not in dados or "valor" not in dados:
+            raise ValueError("Linha sem data_transacao ou valor")
+        dados["data_transacao"] = parse_data(dados["data_transacao"])
+        dados["valor"] = parse_valor(dados["valor"])
+        dados.setdefault("descricao", "Importado")
+        # Informando o id, o nome padrão não se aplica
+        if "categoria_id" in dados:
+            dados.setdefault("categoria_nome", None)
+        if "subcategoria_id" in dados:
+            dados.setdefault("subcategoria_nome", None)
+        return dados
+
+    def _mapear_ofx(self, registro: Dict[str, str]) -> Dict[str, Any]:
+        if "DTPOSTED" not in registro or "TRNAMT" not in registro:
+            raise ValueError("STMTTRN sem DTPOSTED ou TRNAMT")
+        return {
+            "data_transacao": parse_data_ofx(registro["DTPOSTED"]),
+            "valor": parse_valor(registro["TRNAMT"]),
+            "descricao": registro.get("MEMO") or registro.get("NAME") or registro.get("TRNTYPE", "Importado"),
+        }
+
+    def mapear(self, registro: Dict[str, str]) -> TransacaoCreate:
+        """Converte um registro lido do arquivo em TransacaoCreate (ValueError se inválido)."""
+        dados = self._mapear_csv(registro) if self.formato == "csv" else self._mapear_ofx(registro)
+        valor: Decimal = dados["valor"]
+        # Sem coluna de tipo, o sinal do valor decide entre entrada e saída
+        dados.setdefault("tipo", "saida" if valor < 0 else "entrada")
+        dados["valor"] = float(abs(valor))
+        for campo, padrao in self.padroes.items():
+            dados.setdefault(campo, padrao)
+        return TransacaoCreate(**dados)
+
+    async def importar(
+        self,
+        Session,
+        caminho: Path,
+        progresso: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Importa o arquivo usando sessões de `Session` e devolve o resumo da importação.
+        `progresso` é chamado após cada bloco confirmado.
+        """
+        caminho = Path(caminho)
+        log = log_database_operation(operation="importar", collection="transacoes", arquivo=caminho.name)
+        hash_ = await asyncio.to_thread(hash_arquivo, caminho)
+        total_bytes = caminho.stat().st_size
+
+        async with Session() as db:
+            importacao_repo = ImportacaoRepository(db)
+            transacao_repo = TransacaoRepository(db)
+
+            importacao = await importacao_repo.iniciar(hash_, caminho.name, self.formato)
+            await db.commit()
+            if importacao.concluida:
+                log.info(f"Arquivo já importado (importação {importacao.id})")
+                return self._resumo(importacao, 0.0)
+
+            pular = importacao.linhas_processadas
+            inicio = time.perf_counter()
+            novas = 0
+            bloco: List[TransacaoCreate] = []
+            invalidas = 0
+
+            async def gravar():
+                nonlocal bloco, invalidas, novas
+                importadas = 0
+                if bloco:
+                    resposta = await transacao_repo.inserir_lote(bloco)
+                    importadas = resposta.created_items
+                processadas = len(bloco) + invalidas
+                await importacao_repo.avancar(
+                    importacao, processadas, importadas, processadas - importadas
+                )
+                await db.commit()
+                novas += processadas
+                bloco, invalidas = [], 0
+                if progresso:
+                    decorrido = time.perf_counter() - inicio
+                    progresso({
+                        **self._resumo(importacao, decorrido, novas),
+                        "bytes_lidos": contador.lidos,
+                        "bytes_total": total_bytes,
+                    })
+
+            with open(caminho, "rb") as bruto:
+                contador = _LeitorContado(bruto)
+                texto = io.TextIOWrapper(
+                    io.BufferedReader(contador, BYTES_POR_LEITURA), encoding=self.encoding, newline=""
+                )
+                for numero, registro in enumerate(self.registros(texto), start=1):
+                    if numero <= pular:
+                        continue
+                    try:
+                        bloco.append(self.mapear(registro))
+                    except ValueError as e:
+                        invalidas += 1
+                        log.warning(f"Registro {numero} rejeitado: {e}")
+                    if len(bloco) + invalidas >= self.linhas_por_bloco:
+                        await gravar()
+
+                if bloco or invalidas:
+                    await gravar()
+
+            await importacao_repo.concluir(importacao)
+            await db.commit()
+
+            decorrido = time.perf_counter() - inicio
+            resumo = self._resumo(importacao, decorrido, novas)
+            log.info(
+                f"Importação {importacao.id} concluída: {importacao.linhas_importadas} importadas, "
+                f"{importacao.linhas_rejeitadas} rejeitadas ({resumo['linhas_por_segundo']:.0f} linhas/s)"
+            )
+            return resumo
+
+    @staticmethod
+    def _resumo(importacao, decorrido: float, novas: int = 0) -> Dict[str, Any]:
+        return {
+            "importacao_id": importacao.id,
+            "concluida": importacao.concluida,
+            "linhas_processadas": importacao.linhas_processadas,
+            "linhas_importadas": importacao.linhas_importadas,
+            "linhas_rejeitadas": importacao.linhas_rejeitadas,
+            "segundos": decorrido,
+            "linhas_por_segundo": novas / decorrido if decorrido else 0.0,
+        }
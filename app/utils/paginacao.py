@@ -0,0 +1,21 @@
+# app/utils/paginacao.py
+
+import base64
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(data_transacao: datetime, id: int) -> str:
+    """Gera um cursor opaco a partir da chave de ordenação (data_transacao, id)."""
+    raw = f"{data_transacao.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverte encode_cursor. Lança ValueError se o cursor for inválido."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data_str, id_str = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(data_str), int(id_str)
+    except Exception as e:
+        raise ValueError("Cursor inválido") from e
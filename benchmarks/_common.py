@@ -0,0 +1,95 @@
+# benchmarks/_common.py
+"""
+Utilitários compartilhados pelos benchmarks: banco SQLite temporário e massa sintética.
+
+Execute os benchmarks a partir da raiz do projeto, por exemplo:
+    python -m benchmarks.bench_gastos_por_categoria --rows 1000000
+"""
+
+import random
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.engine import criar_engine_async, obter_perfil
+from app.db.base import Base
+from app.db.models.categoria import CategoriaORM, SubcategoriaORM
+from app.db.models.transacao import TransacaoORM
+from app.db.repositories.resumo_mensal import ResumoMensalRepository
+
+CHUNK = 50_000
+
+
+@asynccontextmanager
+async def temp_database(perfil: str = "bench", **pragmas):
+    """
+    Cria um banco SQLite descartável com o schema atual e devolve (engine, session_factory).
+    O engine usa o perfil `perfil` (PRAGMAs e pool) de app.core.engine; `pragmas` sobrepõe
+    os do perfil.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+        engine = criar_engine_async(url, obter_perfil(perfil), **pragmas)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            yield engine, sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        finally:
+            await engine.dispose()
+
+
+async def seed(engine, rows: int, categorias: int = 20, subcategorias: int = 5, ano: int = 2024, seed: int = 42):
+    """Popula categorias/subcategorias e `rows` transações distribuídas ao longo de `ano`."""
+    rnd = random.Random(seed)
+    async with engine.begin() as conn:
+        await conn.execute(insert(CategoriaORM), [
+            {"id": c, "categoria_nome": f"Categoria {c}", "natureza": "pf", "limite": 1000.0}
+            for c in range(1, categorias + 1)
+        ])
+        subs = [
+            {"id": (c - 1) * subcategorias + s, "subcategoria_nome": f"Sub {c}.{s}", "categoria_id": c}
+            for c in range(1, categorias + 1)
+            for s in range(1, subcategorias + 1)
+        ]
+        await conn.execute(insert(SubcategoriaORM), subs)
+
+        inicio = datetime(ano, 1, 1)
+        for offset in range(0, rows, CHUNK):
+            batch = []
+            for _ in range(min(CHUNK, rows - offset)):
+                sub = rnd.choice(subs)
+                batch.append({
+                    "group_id": uuid4(),
+                    "valor": round(rnd.uniform(1, 1000), 2),
+                    "descricao": "bench",
+                    "data_transacao": inicio + timedelta(minutes=rnd.randrange(365 * 24 * 60)),
+                    "tipo": rnd.choice(("entrada", "saida")),
+                    "natureza": rnd.choice(("pf", "pj")),
+                    "forma_pagamento": "pix",
+                    "categoria_id": sub["categoria_id"],
+                    "subcategoria_id": sub["id"],
+                })
+            await conn.execute(insert(TransacaoORM), batch)
+
+    async with AsyncSession(engine) as session:
+        await ResumoMensalRepository(session).reconstruir()
+        await session.commit()
+
+
+async def measure(label: str, fn, repeat: int = 3):
+    """Executa `fn` (coroutine function) `repeat` vezes e imprime o melhor tempo."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<40} {best * 1000:10.1f} ms")
+    return result
@@ -0,0 +1,203 @@
+# benchmarks/bench_commits_por_requisicao.py
+"""
+Conta os commits com escrita (cada um é um ponto de durabilidade: o SQLite faz fsync
+do journal e do banco) e o tempo médio por requisição de escrita da API, comparando a
+unidade de trabalho (um commit por requisição) com o modo anterior, reproduzido aqui
+fazendo cada flush e cada método de escrita dos repositórios terminar em commit.
+
+    python -m benchmarks.bench_commits_por_requisicao --repeat 50
+"""
+
+import argparse
+import asyncio
+import functools
+import time
+from contextlib import contextmanager, nullcontext
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_session, unidade_de_trabalho
+from app.db.repositories.categoria import CategoriaRepository
+from app.db.repositories.limits import LimitsRepository
+from app.db.repositories.subcategoria import SubcategoriaRepository
+from app.db.repositories.transacao import TransacaoRepository
+from app.main import app
+from benchmarks._common import seed, temp_database
+
+# Métodos de escrita que terminavam com commit antes da unidade de trabalho
+METODOS_COM_COMMIT = {
+    CategoriaRepository: ("create", "update", "delete"),
+    SubcategoriaRepository: ("create", "create_many", "update", "delete", "delete_by_categoria"),
+    TransacaoRepository: ("create", "update", "delete", "create_batch"),
+    LimitsRepository: ("bulk_update_limits",),
+}
+
+
+def _com_commit(metodo):
+    @functools.wraps(metodo)
+    async def envolto(self, *args, **kwargs):
+        resultado = await metodo(self, *args, **kwargs)
+        await self.db.commit()
+        return resultado
+    return envolto
+
+
+@contextmanager
+def modo_legado():
+    """Um commit por flush explícito e por método de escrita, sem SAVEPOINTs."""
+    originais = [(AsyncSession, "flush", AsyncSession.flush), (AsyncSession, "begin_nested", AsyncSession.begin_nested)]
+    for classe, nomes in METODOS_COM_COMMIT.items():
+        originais.extend((classe, nome, getattr(classe, nome)) for nome in nomes)
+
+    async def flush_com_commit(self, objects=None):
+        await self.commit()
+
+    AsyncSession.flush = flush_com_commit
+    AsyncSession.begin_nested = lambda self: nullcontext()
+    for classe, nomes in METODOS_COM_COMMIT.items():
+        for nome in nomes:
+            setattr(classe, nome, _com_commit(getattr(classe, nome)))
+    try:
+        yield
+    finally:
+        for classe, nome, original in originais:
+            setattr(classe, nome, original)
+
+
+class ContadorCommits:
+    """Conta, via eventos do engine, os commits de transações que escreveram algo."""
+
+    def __init__(self, engine):
+        self.commits = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._instrucao)
+        event.listen(engine.sync_engine, "commit", self._commit)
+
+    def _instrucao(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip()[:6].upper() in ("INSERT", "UPDATE", "DELETE"):
+            conn.info["escreveu"] = True
+
+    def _commit(self, conn):
+        if conn.info.pop("escreveu", False):
+            self.commits += 1
+
+
+def transacao(i: int, **extra) -> dict:
+    return {
+        "valor": 120 + i, "descricao": f"Bench {i}", "data_transacao": "2024-05-10T12:00:00",
+        "tipo": "saida", "natureza": "pf", "forma_pagamento": "pix",
+        "categoria_nome": "Categoria 1", "subcategoria_nome": "Sub 1.1", **extra,
+    }
+
+
+async def criar_categoria(client, i):
+    return "POST", "/categorias/", {
+        "categoria_nome": f"Nova {i}", "natureza": "pf", "limite": 500,
+        "subcategorias": [{"subcategoria_nome": f"S{s}"} for s in range(3)],
+    }
+
+
+async def atualizar_categoria(client, i):
+    _, url, corpo = await criar_categoria(client, f"u{i}")
+    criada = (await client.post(url, json=corpo)).json()
+    subs = criada["subcategorias"]
+    return "PUT", f"/categorias/{criada['id']}", {
+        "limite": 800,
+        "subcategorias": [
+            {"id": subs[0]["id"], "subcategoria_nome": "Renomeada A"},
+            {"id": subs[1]["id"], "subcategoria_nome": "Renomeada B"},
+            {"subcategoria_nome": "Nova C"},
+        ],
+    }
+
+
+async def atualizar_limites(client, i):
+    return "PUT", "/limits/", {
+        "new": [
+            {"categoria_nome": f"Limite {i}.{c}", "natureza": "pf", "limite": 300,
+             "subcategorias": [{"subcategoria_nome": f"S{s}"} for s in range(3)]}
+            for c in range(2)
+        ],
+        "modified": [
+            {"id": 2, "categoria_nome": "Categoria 2", "natureza": "pf", "limite": 900 + i,
+             "subcategorias": [{"subcategoria_nome": f"Extra {i}"}]}
+        ],
+    }
+
+
+async def criar_transacao(client, i):
+    return "POST", "/transacoes/", transacao(i, categoria_nome=f"Cat bench {i}", subcategoria_nome="Nova")
+
+
+async def criar_parcelada(client, i):
+    return "POST", "/transacoes/", transacao(i, forma_pagamento="credito", total_parcelas=12)
+
+
+async def atualizar_transacao(client, i):
+    criada = (await client.post("/transacoes/", json=transacao(i))).json()
+    return "PUT", f"/transacoes/{criada['id']}", {"valor": 99.9, "subcategoria_nome": "Sub 1.2"}
+
+
+async def excluir_transacao(client, i):
+    criada = (await client.post("/transacoes/", json=transacao(i))).json()
+    return "DELETE", f"/transacoes/{criada['id']}", None
+
+
+CENARIOS = (
+    ("POST /categorias (3 subcategorias)", criar_categoria),
+    ("PUT /categorias/{id} (2 subs + 1 nova)", atualizar_categoria),
+    ("PUT /limits (2 novas, 1 modificada)", atualizar_limites),
+    ("POST /transacoes (categoria nova)", criar_transacao),
+    ("POST /transacoes (12 parcelas)", criar_parcelada),
+    ("PUT /transacoes/{id}", atualizar_transacao),
+    ("DELETE /transacoes/{id}", excluir_transacao),
+)
+
+
+async def medir(client, contador, preparar, repeat: int, inicio_ids: int):
+    """Média de commits com escrita e de milissegundos por requisição medida."""
+    commits = segundos = 0.0
+    for i in range(repeat):
+        metodo, url, corpo = await preparar(client, inicio_ids + i)
+        antes = contador.commits
+        inicio = time.perf_counter()
+        resposta = await client.request(metodo, url, json=corpo)
+        segundos += time.perf_counter() - inicio
+        resposta.raise_for_status()
+        commits += contador.commits - antes
+    return commits / repeat, segundos / repeat * 1000
+
+
+async def main(rows: int, repeat: int):
+    async with temp_database() as (engine, Session):
+        await seed(engine, rows)
+        contador = ContadorCommits(engine)
+
+        async def sessao():
+            async with unidade_de_trabalho(Session) as db:
+                yield db
+
+        app.dependency_overrides[get_session] = sessao
+        transporte = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as client:
+                print(f"{'requisição':<40} {'commits antes':>14} {'depois':>8} {'ms antes':>10} {'depois':>8}")
+                for nome, preparar in CENARIOS:
+                    with modo_legado():
+                        commits_antes, ms_antes = await medir(client, contador, preparar, repeat, 0)
+                    commits_depois, ms_depois = await medir(client, contador, preparar, repeat, repeat)
+                    print(
+                        f"{nome:<40} {commits_antes:>14.1f} {commits_depois:>8.1f} "
+                        f"{ms_antes:>10.2f} {ms_depois:>8.2f}"
+                    )
+        finally:
+            app.dependency_overrides.pop(get_session, None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
@@ -0,0 +1,110 @@
+# benchmarks/bench_escritor.py
+"""
+Teste de carga das escritas: `--clientes` tarefas concorrentes criando transações pelo
+TransacaoRepository.create (cada criação na sua unidade de trabalho, como uma requisição),
+com leitores em paralelo, primeiro com cada sessão confirmando sozinha e depois com o
+escritor único (group commit). Mostra escritas/s, latência p50/p99, erros (por exemplo
+"database is locked") e quantos commits com escrita o banco recebeu.
+
+    python -m benchmarks.bench_escritor --clientes 200 --escritas 20
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime
+
+from app.core.database import unidade_de_trabalho
+from app.core.escritor import ativar_escritor, desativar_escritor, estado_escritor
+from app.db.repositories.resumo_mensal import ResumoMensalRepository
+from app.db.repositories.transacao import TransacaoRepository
+from app.schemas.transacao import TransacaoCreate
+from benchmarks._common import seed, temp_database
+from benchmarks.bench_commits_por_requisicao import ContadorCommits
+
+
+def transacao(cliente: int, i: int) -> TransacaoCreate:
+    return TransacaoCreate(
+        valor=10 + i, descricao=f"Carga {cliente}.{i}", data_transacao=datetime(2024, 1 + i % 12, 10),
+        tipo="saida", natureza="pf", forma_pagamento="pix",
+        categoria_nome=f"Categoria {1 + cliente % 20}", subcategoria_nome=f"Sub {1 + cliente % 20}.1",
+    )
+
+
+async def cliente(Session, numero: int, escritas: int, latencias: list, erros: Counter):
+    for i in range(escritas):
+        inicio = time.perf_counter()
+        try:
+            async with unidade_de_trabalho(Session) as db:
+                await TransacaoRepository(db).create(transacao(numero, i))
+        except Exception as e:
+            erros[f"{type(e).__name__}: {str(e).splitlines()[0][:60]}"] += 1
+            continue
+        latencias.append(time.perf_counter() - inicio)
+
+
+async def leitor(Session, parar: asyncio.Event, leituras: list):
+    while not parar.is_set():
+        async with Session() as db:
+            await TransacaoRepository(db).get_all(limit=50)
+        leituras[0] += 1
+
+
+async def rodada(Session, clientes: int, escritas: int, leitores: int):
+    latencias, erros, leituras = [], Counter(), [0]
+    parar = asyncio.Event()
+    tarefas_leitura = [asyncio.create_task(leitor(Session, parar, leituras)) for _ in range(leitores)]
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(Session, c, escritas, latencias, erros) for c in range(clientes)))
+    decorrido = time.perf_counter() - inicio
+    parar.set()
+    await asyncio.gather(*tarefas_leitura)
+    latencias.sort()
+    p = lambda q: latencias[min(len(latencias) - 1, int(q * len(latencias)))] * 1000 if latencias else 0.0
+    return len(latencias) / decorrido, p(0.50), p(0.99), erros, leituras[0] / decorrido
+
+
+async def main(rows: int, clientes: int, escritas: int, leitores: int, perfil: str, lote_max: int, pragmas: dict):
+    print(f"{'modo':<16} {'escritas/s':>11} {'p50 ms':>8} {'p99 ms':>8} {'erros':>6} {'commits':>8} {'leituras/s':>11}")
+    for modo in ("sessões", "escritor único"):
+        # Banco novo por modo, para os dois partirem do mesmo estado
+        async with temp_database(perfil, **pragmas) as (engine, Session):
+            await seed(engine, rows)
+            contador = ContadorCommits(engine)
+            if modo == "escritor único":
+                ativar_escritor(Session, lote_max=lote_max)
+            try:
+                vazao, p50, p99, erros, leituras = await rodada(Session, clientes, escritas, leitores)
+            finally:
+                estado = estado_escritor()
+                await desativar_escritor()
+            async with Session() as db:
+                divergencias = await ResumoMensalRepository(db).verificar()
+            print(
+                f"{modo:<16} {vazao:>11.0f} {p50:>8.1f} {p99:>8.1f} {sum(erros.values()):>6} "
+                f"{contador.commits:>8} {leituras:>11.0f}"
+            )
+            for erro, quantidade in erros.most_common(3):
+                print(f"{'':<4}{quantidade} x {erro}")
+            if estado["ativo"]:
+                print(f"{'':<4}{estado['lotes']} lotes, média {estado['media_por_lote']:.1f} e máximo {estado['maior_lote']} escritas por commit")
+            if divergencias:
+                print(f"{'':<4}resumo mensal divergente: {divergencias[:3]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--clientes", type=int, default=100, help="Tarefas escrevendo ao mesmo tempo")
+    parser.add_argument("--escritas", type=int, default=20, help="Criações por tarefa")
+    parser.add_argument("--leitores", type=int, default=4, help="Tarefas lendo em paralelo")
+    parser.add_argument("--perfil", default="prod", help="Perfil do engine (dev, prod, bench)")
+    parser.add_argument("--lote-max", type=int, default=64)
+    parser.add_argument(
+        "--pragma", action="append", default=[], metavar="NOME=VALOR",
+        help="PRAGMA sobreposto ao perfil, por exemplo synchronous=FULL (pode repetir)",
+    )
+    args = parser.parse_args()
+    pragmas = dict(p.split("=", 1) for p in args.pragma)
+    asyncio.run(main(args.rows, args.clientes, args.escritas, args.leitores, args.perfil, args.lote_max, pragmas))
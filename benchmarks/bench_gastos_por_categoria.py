@@ -0,0 +1,114 @@
+# benchmarks/bench_gastos_por_categoria.py
+"""
+Compara o caminho antigo de gastos_por_categoria (hidrata TransacaoORM e soma em Python)
+com a agregação via GROUP BY do DashboardRepository, tanto sobre transacoes (período
+parcial) quanto sobre resumo_mensal (meses inteiros).
+
+    python -m benchmarks.bench_gastos_por_categoria --rows 1000000
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.db.models.transacao import TransacaoORM
+from app.db.repositories.dashboard import DashboardRepository
+from app.schemas.dashboard import TipoTrans
+from benchmarks._common import measure, seed, temp_database
+
+
+async def gastos_por_categoria_legado(db, data_inicio, data_final, natureza, tipo):
+    """Implementação anterior, mantida aqui apenas como referência de comparação."""
+    stmt = (
+        select(TransacaoORM)
+        .where(TransacaoORM.data_transacao >= data_inicio)
+        .where(TransacaoORM.data_transacao <= data_final)
+        .where(TransacaoORM.natureza == natureza)
+        .where(TransacaoORM.tipo == tipo.value)
+        .options(
+            selectinload(TransacaoORM.categoria),
+            selectinload(TransacaoORM.subcategoria),
+        )
+    )
+    transacoes = (await db.execute(stmt)).unique().scalars().all()
+
+    gastos: Dict[int, Dict[str, Any]] = {}
+    for t in transacoes:
+        cat = gastos.setdefault(t.categoria.id, {"nome": t.categoria.categoria_nome, "total": 0.0, "subcategorias": {}})
+        cat["total"] += t.valor
+        cat["subcategorias"].setdefault(t.subcategoria.subcategoria_nome, 0.0)
+        cat["subcategorias"][t.subcategoria.subcategoria_nome] += t.valor
+    return gastos
+
+
+def _centavos(valor) -> int:
+    return round(float(valor) * 100)
+
+
+def totais_legado(gastos: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    """{categoria: (total, {subcategoria: valor})} em centavos, como a resposta mostra (total > 0)."""
+    return {
+        cat["nome"]: (_centavos(cat["total"]), {sn: _centavos(v) for sn, v in cat["subcategorias"].items()})
+        for cat in gastos.values()
+        if cat["total"] > 0
+    }
+
+
+def totais_agregados(resultado: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        cat["nome"]: (_centavos(cat["total"]), {sub["nome"]: _centavos(sub["valor"]) for sub in cat["subcategorias"]})
+        for cat in resultado
+    }
+
+
+def comparar(descricao: str, legado: Dict[int, Dict[str, Any]], agregado: List[Dict[str, Any]]) -> None:
+    esperado, obtido = totais_legado(legado), totais_agregados(agregado)
+    divergentes = sorted(
+        nome for nome in esperado.keys() | obtido.keys() if esperado.get(nome) != obtido.get(nome)
+    )
+    assert not divergentes, (
+        f"{descricao}: totais divergentes do caminho antigo em {divergentes[:5]}: "
+        f"{[(esperado.get(n), obtido.get(n)) for n in divergentes[:2]]}"
+    )
+    print(f"{descricao}: {len(esperado)} categorias com os mesmos totais (centavos) do caminho antigo")
+
+
+async def main(rows: int, repeat: int):
+    async with temp_database() as (engine, Session):
+        print(f"Gerando {rows} transações sintéticas...")
+        await seed(engine, rows)
+
+        inicio, fim = datetime(2024, 1, 1), datetime(2024, 12, 31, 23, 59, 59, 999999)
+        parcial = datetime(2024, 12, 30, 23, 59, 59)
+        async with Session() as db:
+            async def legado():
+                db.expunge_all()
+                return await gastos_por_categoria_legado(db, inicio, fim, "pf", TipoTrans.saida)
+
+            async def agregado():
+                return await DashboardRepository(db).gastos_por_categoria(inicio, parcial, "pf", TipoTrans.saida)
+
+            async def resumo():
+                return await DashboardRepository(db).gastos_por_categoria(inicio, fim, "pf", TipoTrans.saida)
+
+            antigo = await measure("legado (ORM + soma em Python)", legado, repeat)
+            parcial_agregado = await measure("GROUP BY em transacoes", agregado, repeat)
+            novo = await measure("GROUP BY em resumo_mensal", resumo, repeat)
+
+            db.expunge_all()
+            antigo_parcial = await gastos_por_categoria_legado(db, inicio, parcial, "pf", TipoTrans.saida)
+
+        comparar("GROUP BY em resumo_mensal", antigo, novo)
+        comparar("GROUP BY em transacoes", antigo_parcial, parcial_agregado)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
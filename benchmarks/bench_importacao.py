@@ -0,0 +1,75 @@
+# benchmarks/bench_importacao.py
+"""
+Mede a vazão (linhas/s) do ImportadorExtrato para CSV e OFX gerados na hora e o pico
+de memória do processo antes/depois, para confirmar que ele não cresce com o arquivo.
+
+    python -m benchmarks.bench_importacao --rows 1000000
+"""
+
+import argparse
+import asyncio
+import random
+import resource
+import tempfile
+from pathlib import Path
+
+from app.utils.importacao import ImportadorExtrato
+from benchmarks._common import temp_database
+
+
+def gerar_csv(caminho: Path, rows: int, seed: int = 42) -> None:
+    rnd = random.Random(seed)
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write("data;descricao;valor;categoria;subcategoria\n")
+        for i in range(rows):
+            f.write(
+                f"{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d}/2024;Linha {i};"
+                f"{rnd.choice(('-', ''))}{rnd.randint(1, 9999)},{rnd.randint(0, 99):02d};"
+                f"Categoria {i % 20};Sub {i % 7}\n"
+            )
+
+
+def gerar_ofx(caminho: Path, rows: int, seed: int = 42) -> None:
+    rnd = random.Random(seed)
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write("OFXHEADER:100\nDATA:OFXSGML\n\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>\n")
+        for i in range(rows):
+            f.write(
+                f"<STMTTRN>\n<TRNTYPE>DEBIT\n<DTPOSTED>2024{rnd.randint(1, 12):02d}{rnd.randint(1, 28):02d}"
+                f"120000[-3:BRT]\n<TRNAMT>-{rnd.randint(1, 999)}.{rnd.randint(0, 99):02d}\n"
+                f"<FITID>{i}\n<MEMO>Compra {i}\n</STMTTRN>\n"
+            )
+        f.write("</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n")
+
+
+def pico_memoria_mb() -> float:
+    # ru_maxrss vem em KB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def main(rows: int, bloco: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        arquivos = {"csv": Path(tmp) / "extrato.csv", "ofx": Path(tmp) / "extrato.ofx"}
+        print(f"Gerando arquivos com {rows} linhas...")
+        gerar_csv(arquivos["csv"], rows)
+        gerar_ofx(arquivos["ofx"], rows)
+
+        for formato, caminho in arquivos.items():
+            async with temp_database() as (engine, Session):
+                importador = ImportadorExtrato(formato, delimitador=";", linhas_por_bloco=bloco)
+                antes = pico_memoria_mb()
+                resumo = await importador.importar(Session, caminho)
+                tamanho = caminho.stat().st_size / 2**20
+                print(
+                    f"{formato.upper():<4} {tamanho:8.1f} MB {resumo['linhas_importadas']:>10} linhas "
+                    f"{resumo['segundos']:8.1f} s {resumo['linhas_por_segundo']:10.0f} linhas/s | "
+                    f"pico RSS {antes:.0f} -> {pico_memoria_mb():.0f} MB"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--bloco", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.bloco))
@@ -0,0 +1,142 @@
+# benchmarks/bench_leitura.py
+"""
+Mede as leituras da listagem de transações, do extrato e das opções de categorias
+(linhas/s e pico de memória alocada pelo Python, via tracemalloc) com as projeções
+de colunas dos repositórios, contra o carregamento anterior: entidades ORM inteiras
+com os relacionamentos em joined loading (o antigo lazy='joined' dos modelos).
+
+    python -m benchmarks.bench_leitura --rows 200000
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.db.models.categoria import CategoriaORM, SubcategoriaORM
+from app.db.models.transacao import TransacaoORM
+from app.db.repositories.dashboard import DashboardRepository
+from app.db.repositories.transacao import TransacaoRepository
+from app.schemas.dashboard import CategoriaOpcao, SubcategoriaOpcao, TransacaoExtrato
+from app.schemas.transacao import TransacaoPaginaResponse
+from benchmarks._common import seed, temp_database
+
+INICIO, FIM = datetime(2024, 1, 1), datetime(2024, 12, 31, 23, 59, 59, 999999)
+
+# O que os modelos carregavam sozinhos antes: categoria e subcategoria da transação,
+# e de cada uma delas o outro lado (subcategorias da categoria, categoria da subcategoria)
+CARREGAMENTO_ANTERIOR = (
+    joinedload(TransacaoORM.categoria).joinedload(CategoriaORM.subcategorias),
+    joinedload(TransacaoORM.subcategoria).joinedload(SubcategoriaORM.categoria),
+)
+
+
+async def listar_legado(db, limit):
+    stmt = select(TransacaoORM).options(*CARREGAMENTO_ANTERIOR).order_by(
+        TransacaoORM.data_transacao.desc(), TransacaoORM.id.desc()
+    ).limit(limit)
+    transacoes = (await db.execute(stmt)).unique().scalars().all()
+    return TransacaoPaginaResponse(items=transacoes, next_cursor=None, limit=limit).items
+
+
+async def listar(db, limit):
+    transacoes = await TransacaoRepository(db).get_all(limit=limit)
+    return TransacaoPaginaResponse(items=transacoes, next_cursor=None, limit=limit).items
+
+
+async def extrato_legado(db, limit):
+    stmt = (
+        select(TransacaoORM).options(*CARREGAMENTO_ANTERIOR)
+        .where(TransacaoORM.data_transacao >= INICIO, TransacaoORM.data_transacao <= FIM)
+        .where(TransacaoORM.natureza == "pf")
+        .order_by(TransacaoORM.data_transacao.desc())
+    )
+    transacoes = (await db.execute(stmt)).unique().scalars().all()
+    return [
+        TransacaoExtrato(
+            id=t.id, valor=t.valor, descricao=t.descricao, parcelas=t.parcela,
+            total_parcelas=t.total_parcelas, data_transacao=t.data_transacao, tipo=t.tipo,
+            natureza_transacao=t.natureza, forma_pagamento=t.forma_pagamento,
+            categoria=t.categoria.categoria_nome if t.categoria else "",
+            subcategoria=t.subcategoria.subcategoria_nome if t.subcategoria else "",
+            data_criacao=t.data_criacao, data_atualizacao=t.data_atualizacao,
+        )
+        for t in transacoes
+    ]
+
+
+async def extrato(db, limit):
+    resposta = await DashboardRepository(db).extrato_financeiro(INICIO, FIM, "pf", "", "")
+    return resposta.transacoes
+
+
+async def opcoes_legado(db, limit):
+    stmt = select(CategoriaORM).options(
+        selectinload(CategoriaORM.subcategorias).joinedload(SubcategoriaORM.categoria)
+    )
+    categorias = (await db.execute(stmt)).unique().scalars().all()
+    return [
+        CategoriaOpcao(id=c.id, categoria=c.categoria_nome, subcategorias=[
+            SubcategoriaOpcao(id=s.id, nome=s.subcategoria_nome) for s in c.subcategorias
+        ])
+        for c in categorias
+    ]
+
+
+async def opcoes(db, limit):
+    return (await DashboardRepository(db).opcoes_categorias()).opcoes
+
+
+LEITURAS = (
+    ("GET /transacoes (página)", listar_legado, listar),
+    ("GET /dashboard/extrato (ano, pf)", extrato_legado, extrato),
+    ("GET /dashboard/opcoes-categorias", opcoes_legado, opcoes),
+)
+
+
+async def medir(Session, leitura, limit: int, repeat: int):
+    """Melhor vazão em linhas/s (sem tracemalloc) e pico de memória em MB de uma execução."""
+    melhor = float("inf")
+    for _ in range(repeat):
+        # Sessão nova a cada rodada: nada reaproveitado do identity map
+        async with Session() as db:
+            inicio = time.perf_counter()
+            linhas = len(await leitura(db, limit))
+            melhor = min(melhor, time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    async with Session() as db:
+        await leitura(db, limit)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return linhas, linhas / melhor, pico / 2**20
+
+
+async def main(rows: int, categorias: int, limit: int, repeat: int):
+    async with temp_database() as (engine, Session):
+        print(f"Gerando {rows} transações sintéticas em {categorias} categorias...")
+        await seed(engine, rows, categorias=categorias)
+
+        print(f"{'leitura':<36} {'linhas':>8} {'linhas/s antes':>15} {'depois':>10} {'MB antes':>9} {'depois':>8}")
+        for nome, legado, novo in LEITURAS:
+            linhas, vazao_antes, pico_antes = await medir(Session, legado, limit, repeat)
+            linhas_novo, vazao_depois, pico_depois = await medir(Session, novo, limit, repeat)
+            assert linhas == linhas_novo, f"{nome}: {linhas} linhas antes, {linhas_novo} depois"
+            print(
+                f"{nome:<36} {linhas:>8} {vazao_antes:>15.0f} {vazao_depois:>10.0f} "
+                f"{pico_antes:>9.1f} {pico_depois:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--categorias", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=500, help="Tamanho da página da listagem")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.categorias, args.limit, args.repeat))
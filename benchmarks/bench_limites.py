@@ -0,0 +1,112 @@
+# benchmarks/bench_limites.py
+"""
+Mede o salvamento da tela de limites (LimitsRepository.bulk_update_limits) com
+todas as categorias modificadas e algumas novas, contra o caminho antigo (uma chamada
+de repositório por categoria e por subcategoria). Também conta as instruções SQL.
+
+    python -m benchmarks.bench_limites --categorias 200
+"""
+
+import argparse
+import asyncio
+from itertools import count
+
+from sqlalchemy import event
+
+from app.db.repositories.categoria import CategoriaRepository
+from app.db.repositories.limits import LimitsRepository
+from app.db.repositories.subcategoria import SubcategoriaRepository
+from app.schemas.categorias import CategoriaCreate, CategoriaUpdate
+from app.schemas.limits import LimitsUpdatePayload
+from app.schemas.subcategoria import SubcategoriaCreate, SubcategoriaUpdate
+from benchmarks._common import measure, seed, temp_database
+
+SUBCATEGORIAS = 5
+
+
+async def salvar_legado(db, payload: LimitsUpdatePayload):
+    """Implementação anterior, mantida aqui apenas como referência de comparação."""
+    categoria_repo, subcategoria_repo = CategoriaRepository(db), SubcategoriaRepository(db)
+    for new_cat in payload.new:
+        if await categoria_repo.get_by_nome(new_cat.categoria_nome):
+            continue
+        categoria = await categoria_repo.create(CategoriaCreate(
+            categoria_nome=new_cat.categoria_nome, natureza=new_cat.natureza,
+            limite=new_cat.limite, subcategorias=[],
+        ))
+        for sub in new_cat.subcategorias:
+            await subcategoria_repo.create(categoria.id, SubcategoriaCreate(subcategoria_nome=sub.subcategoria_nome))
+    for mod_cat in payload.modified:
+        if not await categoria_repo.get_by_id(mod_cat.id):
+            continue
+        await categoria_repo.update(mod_cat.id, CategoriaUpdate(
+            categoria_nome=mod_cat.categoria_nome, natureza=mod_cat.natureza,
+            limite=mod_cat.limite, subcategorias=[],
+        ))
+        for sub in mod_cat.subcategorias:
+            if sub.id:
+                await subcategoria_repo.update(sub.id, SubcategoriaUpdate(subcategoria_nome=sub.subcategoria_nome))
+            else:
+                await subcategoria_repo.create(mod_cat.id, SubcategoriaCreate(subcategoria_nome=sub.subcategoria_nome))
+
+
+def tela(rodada: int, categorias: int, novas: int) -> LimitsUpdatePayload:
+    """Todas as categorias do seed com limite alterado, subcategorias reenviadas e uma nova cada."""
+    return LimitsUpdatePayload(
+        modified=[
+            {
+                "id": c, "categoria_nome": f"Categoria {c}", "natureza": "pf", "limite": 100 + rodada,
+                "subcategorias": [
+                    {"id": (c - 1) * SUBCATEGORIAS + s, "subcategoria_nome": f"Sub {c}.{s}"}
+                    for s in range(1, SUBCATEGORIAS + 1)
+                ] + [{"subcategoria_nome": f"Nova {rodada}"}],
+            }
+            for c in range(1, categorias + 1)
+        ],
+        new=[
+            {
+                "categoria_nome": f"Nova {rodada}.{n}", "natureza": "pf", "limite": 50,
+                "subcategorias": [{"subcategoria_nome": f"S{s}"} for s in range(3)],
+            }
+            for n in range(novas)
+        ],
+    )
+
+
+async def main(rows: int, categorias: int, novas: int, repeat: int):
+    async with temp_database() as (engine, Session):
+        print(f"Gerando {categorias} categorias e {rows} transações sintéticas...")
+        await seed(engine, rows, categorias=categorias, subcategorias=SUBCATEGORIAS)
+
+        instrucoes = []
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: instrucoes.append(args[2]))
+        rodadas = count()
+
+        async with Session() as db:
+            async def novo():
+                payload = tela(next(rodadas), categorias, novas)
+                instrucoes.clear()
+                resposta = await LimitsRepository(db).bulk_update_limits(payload)
+                await db.commit()
+                return resposta
+
+            async def legado():
+                payload = tela(next(rodadas), categorias, novas)
+                instrucoes.clear()
+                await salvar_legado(db, payload)
+                await db.commit()
+
+            resposta = await measure(f"{categorias} categorias, em lote", novo, repeat)
+            print(f"{'':<4}{len(instrucoes)} instruções SQL, {len(resposta.errors)} erro(s)")
+            await measure(f"{categorias} categorias, legado", legado, repeat)
+            print(f"{'':<4}{len(instrucoes)} instruções SQL")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--categorias", type=int, default=200)
+    parser.add_argument("--novas", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.categorias, args.novas, args.repeat))
@@ -0,0 +1,138 @@
+# benchmarks/bench_logging.py
+"""
+Mede o custo dos logs por requisição em cada modo do app/logger.py: sem sinks (base),
+LOG_MODO=dev (escrita síncrona, diagnose) e LOG_MODO=prod (fila em segundo plano e amostragem).
+
+Duas medidas: a sequência de logs de um POST /transacoes isolada (µs por requisição) e
+requisições reais pela API via ASGI (ms por requisição). Os sinks escrevem num diretório
+temporário e o console vai para /dev/null, para a saída do benchmark continuar legível.
+
+    python -m benchmarks.bench_logging --requisicoes 500
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+from app.core.database import get_session, get_session_leitura, unidade_de_trabalho
+from app.logger import (
+    Preguicoso, esvaziar_logs, log_api_request, log_database_operation, logger, restaurar_amostra,
+    setup_logger, sortear_amostra,
+)
+from app.main import app
+from app.schemas.transacao import TransacaoCreate
+from benchmarks._common import seed, temp_database
+
+MODOS = ("sem log", "dev", "prod")
+
+CORPO = {
+    "valor": 120.5, "descricao": "Bench log", "data_transacao": "2024-05-10T12:00:00",
+    "tipo": "saida", "natureza": "pf", "forma_pagamento": "pix",
+    "categoria_nome": "Categoria 1", "subcategoria_nome": "Sub 1.1",
+}
+
+
+@contextmanager
+def modo_de_log(modo: str, logs_dir: Path):
+    """Reconfigura o logger no modo pedido com o console apontado para /dev/null."""
+    console, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        if modo == "sem log":
+            logger.remove()
+        else:
+            setup_logger(modo=modo, logs_dir=logs_dir)
+        yield
+    finally:
+        esvaziar_logs()
+        logger.remove()
+        sys.stdout.close()
+        sys.stdout = console
+
+
+def sequencia_requisicao(payload: TransacaoCreate):
+    """Os logs que um POST /transacoes emite: rota, repositório e resultado."""
+    # Uma requisição por chamada, como o middleware de consultas marca
+    token = sortear_amostra()
+    log = log_api_request(method="POST", endpoint="http://bench/transacoes/", payload=Preguicoso(payload.model_dump))
+    log.info("Criando transação")
+    log_db = log_database_operation(operation="create", collection="transacoes", payload=Preguicoso(payload.model_dump))
+    log_db.info("Transação 1 criada")
+    log.success("Transação criada")
+    restaurar_amostra(token)
+
+
+async def medir_sequencia(repeticoes: int) -> float:
+    payload = TransacaoCreate(**{**CORPO, "data_transacao": datetime(2024, 5, 10, 12)})
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        sequencia_requisicao(payload)
+    return (time.perf_counter() - inicio) / repeticoes * 1e6
+
+
+async def medir_api(client, requisicoes: int) -> float:
+    inicio = time.perf_counter()
+    for i in range(requisicoes):
+        if i % 2:
+            resposta = await client.get("/transacoes/", params={"limit": 20})
+        else:
+            resposta = await client.post("/transacoes/", json={**CORPO, "valor": 100 + i})
+        resposta.raise_for_status()
+    return (time.perf_counter() - inicio) / requisicoes * 1000
+
+
+async def main(rows: int, repeticoes: int, requisicoes: int):
+    resultados = {}
+    async with temp_database() as (engine, Session):
+        await seed(engine, rows)
+
+        async def sessao():
+            async with unidade_de_trabalho(Session) as db:
+                yield db
+
+        async def sessao_leitura():
+            async with Session() as db:
+                yield db
+
+        app.dependency_overrides[get_session] = sessao
+        app.dependency_overrides[get_session_leitura] = sessao_leitura
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+                for modo in MODOS:
+                    with tempfile.TemporaryDirectory() as tmp, modo_de_log(modo, Path(tmp)):
+                        await medir_api(client, 20)  # aquecimento
+                        sequencia = await medir_sequencia(repeticoes)
+                        api = await medir_api(client, requisicoes)
+                        inicio = time.perf_counter()
+                        esvaziar_logs()
+                        drenagem = (time.perf_counter() - inicio) * 1000
+                        tamanho = sum(f.stat().st_size for f in Path(tmp).iterdir()) / 2**20
+                    resultados[modo] = (sequencia, api, drenagem, tamanho)
+        finally:
+            app.dependency_overrides.pop(get_session, None)
+            app.dependency_overrides.pop(get_session_leitura, None)
+            setup_logger()
+
+    base_api = resultados["sem log"][1]
+    print(f"{'modo':<10} {'µs/seq. de logs':>16} {'ms/requisição':>14} {'custo do log':>13} {'drenar fila ms':>15} {'MB escritos':>12}")
+    for modo, (sequencia, api, drenagem, tamanho) in resultados.items():
+        print(
+            f"{modo:<10} {sequencia:>16.1f} {api:>14.2f} {api - base_api:>12.2f}ms "
+            f"{drenagem:>15.1f} {tamanho:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeticoes", type=int, default=5_000, help="Sequências de logs isoladas")
+    parser.add_argument("--requisicoes", type=int, default=500, help="Requisições pela API por modo")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeticoes, args.requisicoes))
@@ -0,0 +1,79 @@
+# benchmarks/bench_metricas.py
+"""
+Mede o custo por requisição dos middlewares de observabilidade (MetricasHTTP e
+ConsultasPorRequisicao) em volta de uma aplicação ASGI que só responde, sem rede nem
+banco, e o tempo para montar o texto de /metrics com `--rotas` rotas distintas.
+Os logs ficam desligados para medir só as métricas (o custo dos logs está em bench_logging).
+
+    python -m benchmarks.bench_metricas --requisicoes 50000 --rotas 40
+"""
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from app.core.consultas import ConsultasPorRequisicao
+from app.core.metricas import MetricasHTTP, registro
+from app.logger import logger, setup_logger
+
+
+def aplicacao(rotas: int):
+    modelos = [SimpleNamespace(path=f"/rota/{i}/{{item_id}}") for i in range(rotas)]
+
+    async def app(scope, receive, send):
+        # Faz o papel do roteador: marca a rota encontrada no scope
+        scope["route"] = modelos[hash(scope["path"]) % rotas]
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"ok"})
+    return app
+
+
+async def medir(app, requisicoes: int, rotas: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(mensagem):
+        pass
+
+    escopos = [
+        {"type": "http", "method": "GET", "path": f"/rota/{i % rotas}/{i}", "headers": []}
+        for i in range(requisicoes)
+    ]
+    inicio = time.perf_counter()
+    for scope in escopos:
+        await app(scope, receive, send)
+    return (time.perf_counter() - inicio) / requisicoes * 1e6
+
+
+async def main(requisicoes: int, rotas: int):
+    base = aplicacao(rotas)
+    montagens = {
+        "sem middleware": base,
+        "métricas": MetricasHTTP(base),
+        "consultas": ConsultasPorRequisicao(base),
+        "consultas (dev, N+1)": ConsultasPorRequisicao(base, repetidas_max=10),
+        "métricas + consultas": MetricasHTTP(ConsultasPorRequisicao(base)),
+    }
+    logger.remove()
+    try:
+        resultados = {nome: await medir(app, requisicoes, rotas) for nome, app in montagens.items()}
+    finally:
+        setup_logger()
+
+    print(f"{'montagem':<24} {'µs/requisição':>14} {'custo':>8}")
+    for nome, custo in resultados.items():
+        print(f"{nome:<24} {custo:>14.2f} {custo - resultados['sem middleware']:>7.2f}µs")
+
+    inicio = time.perf_counter()
+    texto = registro.expor()
+    print(f"\n/metrics: {len(texto.splitlines())} linhas, {len(texto) / 1024:.0f} KiB em "
+          f"{(time.perf_counter() - inicio) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requisicoes", type=int, default=50_000)
+    parser.add_argument("--rotas", type=int, default=40, help="Rotas distintas (séries por métrica)")
+    args = parser.parse_args()
+    asyncio.run(main(args.requisicoes, args.rotas))
@@ -0,0 +1,102 @@
+# benchmarks/bench_parcelas.py
+"""
+Mede a criação de compras parceladas no TransacaoRepository (INSERT ... RETURNING
+único) contra o caminho antigo (um objeto por parcela + refresh de cada linha),
+para 1, 12 e 48 parcelas. Também conta as instruções SQL emitidas em cada caso.
+
+    python -m benchmarks.bench_parcelas --rows 100000
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import event
+
+from app.db.models.transacao import TransacaoORM
+from app.db.repositories.transacao import TransacaoRepository
+from app.schemas.transacao import TransacaoCreate
+from benchmarks._common import measure, seed, temp_database
+
+PARCELAS = (1, 12, 48)
+
+
+async def criar_parceladas_legado(repo: TransacaoRepository, obj_in: TransacaoCreate):
+    """Implementação anterior, mantida aqui apenas como referência de comparação."""
+    valores = repo._calcular_valores_parcelas(obj_in.valor, obj_in.total_parcelas)
+    datas = repo._gerar_datas_parcelas(obj_in.data_transacao, obj_in.total_parcelas)
+    group_id = uuid4()
+
+    transacoes = []
+    for i in range(obj_in.total_parcelas):
+        transacao = TransacaoORM(**repo._create_transacaoes(
+            obj_in=obj_in,
+            group_id=group_id,
+            parcela=i + 1,
+            total_parcelas=obj_in.total_parcelas,
+            valor=valores[i],
+            data_transacao=datas[i],
+            categoria_id=obj_in.categoria_id,
+            sub_id=obj_in.subcategoria_id,
+        ))
+        repo.db.add(transacao)
+        transacoes.append(transacao)
+
+    await repo.resumo_repo.registrar(transacoes)
+    await repo.db.commit()
+    for transacao in transacoes:
+        await repo.db.refresh(transacao)
+    return transacoes
+
+
+def compra(parcelas: int) -> TransacaoCreate:
+    return TransacaoCreate(
+        valor=1234.56,
+        descricao="Compra parcelada",
+        data_transacao=datetime(2024, 3, 15),
+        tipo="saida",
+        natureza="pf",
+        forma_pagamento="credito",
+        total_parcelas=parcelas,
+        categoria_id=1,
+        subcategoria_id=1,
+    )
+
+
+async def main(rows: int, repeat: int):
+    async with temp_database() as (engine, Session):
+        print(f"Gerando {rows} transações sintéticas...")
+        await seed(engine, rows)
+
+        instrucoes = []
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: instrucoes.append(args[2]))
+
+        async with Session() as db:
+            repo = TransacaoRepository(db)
+            for parcelas in PARCELAS:
+                obj_in = compra(parcelas)
+
+                async def novo():
+                    instrucoes.clear()
+                    transacao = await repo.create(obj_in)
+                    await db.commit()
+                    return transacao
+
+                async def legado():
+                    instrucoes.clear()
+                    return await criar_parceladas_legado(repo, obj_in)
+
+                await measure(f"{parcelas:>2} parcela(s), INSERT ... RETURNING", novo, repeat)
+                print(f"{'':<4}{len(instrucoes)} instruções SQL")
+                if parcelas > 1:
+                    await measure(f"{parcelas:>2} parcela(s), legado", legado, repeat)
+                    print(f"{'':<4}{len(instrucoes)} instruções SQL")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
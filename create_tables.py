@@ -1,9 +1,9 @@
 from app.db.base import Base
 import app.db.models.transacao
-from app.core.database import sync_engine
+from app.core.database import criar_sync_engine
 
 def main():
-    Base.metadata.create_all(bind=sync_engine)
+    Base.metadata.create_all(bind=criar_sync_engine())
     print('Tabelas Criadas')
 
 if __name__ == '__main__':
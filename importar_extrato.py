@@ -0,0 +1,67 @@
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from app.core.config import Config
+from app.core.database import AsyncSessionLocal
+from app.utils.importacao import FORMATOS, ImportadorExtrato
+
+
+def mostrar_progresso(p) -> None:
+    pct = 100 * p['bytes_lidos'] / p['bytes_total'] if p['bytes_total'] else 100
+    print(
+        f"\r{pct:5.1f}% | {p['linhas_processadas']} linhas | {p['linhas_importadas']} importadas | "
+        f"{p['linhas_rejeitadas']} rejeitadas | {p['linhas_por_segundo']:.0f} linhas/s",
+        end='', file=sys.stderr, flush=True
+    )
+
+
+async def main(args) -> int:
+    caminho = Path(args.arquivo)
+    if not caminho.is_file():
+        print(f'Arquivo não encontrado: {caminho}', file=sys.stderr)
+        return 1
+    formato = args.formato or caminho.suffix.lstrip('.').lower()
+    if formato not in FORMATOS:
+        print(f'Formato não suportado: {formato!r}; use --formato {"/".join(FORMATOS)}', file=sys.stderr)
+        return 1
+
+    importador = ImportadorExtrato(
+        formato,
+        natureza=args.natureza,
+        forma_pagamento=args.forma_pagamento,
+        categoria_nome=args.categoria,
+        subcategoria_nome=args.subcategoria,
+        delimitador=args.delimitador,
+        encoding=args.encoding,
+        linhas_por_bloco=args.bloco,
+    )
+    resumo = await importador.importar(AsyncSessionLocal, caminho, mostrar_progresso)
+    print(file=sys.stderr)
+    print(
+        f"Importação {resumo['importacao_id']}: {resumo['linhas_processadas']} linhas processadas, "
+        f"{resumo['linhas_importadas']} importadas, {resumo['linhas_rejeitadas']} rejeitadas"
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Importa um extrato CSV ou OFX em blocos. Se interrompida, a importação do mesmo '
+                    'arquivo continua a partir do último bloco gravado. '
+                    'Atenção: o script grava de um processo próprio, então um servidor já em execução '
+                    'continua servindo os caches em memória (dashboard e categorias) com os totais antigos '
+                    'até a próxima escrita feita por ele. Com o servidor no ar, prefira '
+                    'POST /transacoes/importar, que invalida os caches.'
+    )
+    parser.add_argument('arquivo', help='Arquivo .csv ou .ofx')
+    parser.add_argument('--formato', choices=FORMATOS, help='Padrão: extensão do arquivo')
+    parser.add_argument('--natureza', default='pf', choices=['pf', 'pj'])
+    parser.add_argument('--forma-pagamento', default='debito', choices=['credito', 'debito', 'pix', 'transferencia'])
+    parser.add_argument('--categoria', default='Importação', help='Categoria das linhas sem categoria')
+    parser.add_argument('--subcategoria', default='Extrato', help='Subcategoria das linhas sem subcategoria')
+    parser.add_argument('--delimitador', default=',', help='Separador do CSV')
+    parser.add_argument('--encoding', default='utf-8')
+    parser.add_argument('--bloco', type=int, default=Config.IMPORTACAO_LINHAS_POR_BLOCO, help='Registros por commit')
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,88 @@
+"""
+Dispara centenas de TransacaoRepository.create em paralelo (cada um na sua sessão) com
+nomes de categoria/subcategoria ainda inexistentes, contra um banco SQLite temporário,
+e falha (exit 1) se alguma criação der erro, se surgirem categorias ou subcategorias
+duplicadas ou se o resumo mensal divergir das transações.
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import unidade_de_trabalho
+from app.db.base import Base
+from app.db.models.categoria import CategoriaORM, SubcategoriaORM
+from app.db.models.transacao import TransacaoORM
+from app.db.repositories.resumo_mensal import ResumoMensalRepository
+from app.db.repositories.transacao import TransacaoRepository
+from app.schemas.transacao import TransacaoCreate
+
+
+async def criar(Session, i: int, categorias: int, subcategorias: int):
+    async with unidade_de_trabalho(Session) as db:
+        return await TransacaoRepository(db).create(TransacaoCreate(
+            valor=10 + i, descricao=f'Concorrente {i}', data_transacao=datetime(2024, 1 + i % 12, 10),
+            tipo='saida', natureza='pf', forma_pagamento='pix',
+            categoria_nome=f'Categoria {i % categorias}',
+            subcategoria_nome=f'Sub {i % subcategorias}',
+        ))
+
+
+async def main(criacoes: int, categorias: int, subcategorias: int) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'concorrencia.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+        resultados = await asyncio.gather(
+            *(criar(Session, i, categorias, subcategorias) for i in range(criacoes)),
+            return_exceptions=True
+        )
+        erros = Counter(f'{type(r).__name__}: {r}' for r in resultados if isinstance(r, BaseException))
+
+        async with Session() as db:
+            total_categorias = await db.scalar(select(func.count()).select_from(CategoriaORM))
+            pares = (await db.execute(
+                select(SubcategoriaORM.categoria_id, SubcategoriaORM.subcategoria_nome, func.count())
+                .group_by(SubcategoriaORM.categoria_id, SubcategoriaORM.subcategoria_nome)
+            )).all()
+            total_transacoes = await db.scalar(select(func.count()).select_from(TransacaoORM))
+            divergencias = await ResumoMensalRepository(db).verificar()
+
+        await engine.dispose()
+
+    esperadas_subs = len({(i % categorias, i % subcategorias) for i in range(criacoes)})
+    falhas = []
+    for erro, quantidade in erros.items():
+        falhas.append(f'{quantidade} criação(ões) falharam com {erro}')
+    if total_categorias != categorias:
+        falhas.append(f'{total_categorias} categorias criadas, esperado {categorias}')
+    duplicadas = [p for p in pares if p[2] > 1]
+    if duplicadas or len(pares) != esperadas_subs:
+        falhas.append(f'{len(pares)} subcategorias ({len(duplicadas)} repetidas), esperado {esperadas_subs}')
+    if total_transacoes != criacoes - sum(erros.values()):
+        falhas.append(f'{total_transacoes} transações gravadas para {criacoes - sum(erros.values())} criações')
+    falhas.extend(divergencias)
+
+    for falha in falhas:
+        print(falha)
+    print(f'{criacoes} criações paralelas: {total_categorias} categorias, {len(pares)} subcategorias, '
+          f'{total_transacoes} transações, {len(falhas)} problema(s)')
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--criacoes', type=int, default=300, help='Creates disparados em paralelo')
+    parser.add_argument('--categorias', type=int, default=7, help='Nomes de categoria distintos')
+    parser.add_argument('--subcategorias', type=int, default=5, help='Nomes de subcategoria distintos')
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.criacoes, args.categorias, args.subcategorias)))
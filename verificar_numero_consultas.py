@@ -0,0 +1,113 @@
+"""
+Conta as instruções SQL emitidas por métodos de repositório contra bancos SQLite
+temporários de dois tamanhos e falha (exit 1) se alguma contagem passar do máximo
+esperado ou crescer com o número de categorias (sinal de N+1).
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from uuid import uuid4
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models.categoria import CategoriaORM, SubcategoriaORM
+from app.db.models.transacao import TransacaoORM
+from app.db.repositories.categoria import CategoriaRepository
+from app.db.repositories.dashboard import DashboardRepository
+from app.db.repositories.limits import LimitsRepository
+from app.db.repositories.transacao import TransacaoRepository
+from app.schemas.limits import LimitsUpdatePayload
+
+SUBCATEGORIAS = 5
+
+
+def tela_limites(categorias: int) -> LimitsUpdatePayload:
+    return LimitsUpdatePayload(modified=[
+        {'id': c, 'categoria_nome': f'Categoria {c}', 'natureza': 'pf', 'limite': 200,
+         'subcategorias': [{'id': (c - 1) * SUBCATEGORIAS + 1, 'subcategoria_nome': f'Sub {c}.1'},
+                           {'subcategoria_nome': 'Nova'}]}
+        for c in range(1, categorias + 1)
+    ])
+
+
+# (descrição, chamada sobre a sessão, máximo de instruções)
+CASOS = (
+    ('LimitsRepository.get_all_limits', lambda db, n: LimitsRepository(db).get_all_limits(), 1),
+    ('LimitsRepository.bulk_update_limits', lambda db, n: LimitsRepository(db).bulk_update_limits(tela_limites(n)), 6),
+    ('CategoriaRepository.get_all', lambda db, n: CategoriaRepository(db).get_all(), 2),
+    ('DashboardRepository.opcoes_categorias', lambda db, n: DashboardRepository(db).opcoes_categorias(), 1),
+    ('TransacaoRepository.get_all', lambda db, n: TransacaoRepository(db).get_all(limit=50), 1),
+    ('DashboardRepository.extrato_financeiro', lambda db, n: DashboardRepository(db).extrato_financeiro(
+        datetime(2024, 1, 1), datetime(2024, 12, 31), 'pf', '', ''), 2),
+    ('DashboardRepository.entradas_por_categoria', lambda db, n: DashboardRepository(db).entradas_por_categoria(
+        datetime(2024, 1, 1), datetime(2024, 12, 31), 'pf', '', ''), 1),
+)
+
+
+async def contar(categorias: int):
+    """Número de instruções de cada caso num banco com `categorias` categorias."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'consultas.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(insert(CategoriaORM), [
+                {'id': c, 'categoria_nome': f'Categoria {c}', 'natureza': 'pf', 'limite': 100.0}
+                for c in range(1, categorias + 1)
+            ])
+            await conn.execute(insert(SubcategoriaORM), [
+                {'id': (c - 1) * SUBCATEGORIAS + s, 'subcategoria_nome': f'Sub {c}.{s}', 'categoria_id': c}
+                for c in range(1, categorias + 1)
+                for s in range(1, SUBCATEGORIAS + 1)
+            ])
+            # Uma saída e uma entrada por categoria, para leituras que cruzam com categorias aparecerem
+            await conn.execute(insert(TransacaoORM), [
+                {'group_id': uuid4(), 'valor': 10.0, 'descricao': 'Teste', 'data_transacao': datetime(2024, 3, 1),
+                 'tipo': tipo, 'natureza': 'pf', 'forma_pagamento': 'pix',
+                 'categoria_id': c, 'subcategoria_id': (c - 1) * SUBCATEGORIAS + 1}
+                for c in range(1, categorias + 1)
+                for tipo in ('saida', 'entrada')
+            ])
+        Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+        instrucoes = []
+        event.listen(engine.sync_engine, 'before_cursor_execute', lambda *args: instrucoes.append(args[2]))
+        contagens = {}
+        for descricao, chamada, _ in CASOS:
+            # Sessão nova por caso: nada vem do identity map de um caso anterior
+            async with Session() as db:
+                instrucoes.clear()
+                await chamada(db, categorias)
+                contagens[descricao] = len(instrucoes)
+                await db.rollback()
+        await engine.dispose()
+    return contagens
+
+
+async def main(pequeno: int, grande: int) -> int:
+    poucas, muitas = await contar(pequeno), await contar(grande)
+    falhas = []
+    for descricao, _, maximo in CASOS:
+        a, b = poucas[descricao], muitas[descricao]
+        print(f'{descricao:<44} {a:>3} instrução(ões) com {pequeno} categorias, {b:>3} com {grande}')
+        if b != a:
+            falhas.append(f'{descricao}: contagem cresce com o número de categorias ({a} -> {b})')
+        if max(a, b) > maximo:
+            falhas.append(f'{descricao}: {max(a, b)} instruções, máximo esperado {maximo}')
+    for falha in falhas:
+        print(falha)
+    print(f'{len(CASOS)} casos verificados, {len(falhas)} problema(s)')
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pequeno', type=int, default=5, help='Categorias no banco menor')
+    parser.add_argument('--grande', type=int, default=50, help='Categorias no banco maior')
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.pequeno, args.grande)))
@@ -0,0 +1,149 @@
+"""
+Executa as consultas do DashboardRepository, do TransacaoRepository e do LimitsRepository
+contra um banco SQLite temporário, roda EXPLAIN QUERY PLAN em cada instrução emitida e
+falha (exit 1) se alguma fizer varredura completa de uma tabela de volume. Leituras da tabela inteira
+(SELECT sem WHERE, como o mapa de categorias) são intencionais e não contam.
+"""
+import argparse
+import asyncio
+import re
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import unidade_de_trabalho
+from app.db.base import Base
+from app.db.models.categoria import CategoriaORM, SubcategoriaORM
+from app.db.repositories.dashboard import DashboardRepository
+from app.db.repositories.limits import LimitsRepository
+from app.db.repositories.transacao import TransacaoRepository
+from app.schemas.dashboard import TipoTrans
+from app.schemas.limits import LimitsUpdatePayload
+from app.schemas.transacao import TransacaoCreate, TransacaoFiltros, TransacaoUpdate
+
+# Tabelas que crescem com o uso; categorias é pequena e pode ser varrida
+TABELAS_MONITORADAS = {'transacoes', 'resumo_mensal', 'subcategorias'}
+SCAN_COMPLETO = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+
+
+def _tabela_varrida(detalhe: str):
+    """Nome da tabela (sem o sufixo de alias do SQLAlchemy) se a linha do plano for um SCAN sem índice."""
+    m = SCAN_COMPLETO.match(detalhe)
+    return re.sub(r'_\d+$', '', m.group(1)) if m else None
+
+
+async def exercitar_repositorios(Session):
+    """Chama cada método de leitura/escrita dos repositórios cobertos."""
+    inicio, fim = datetime(2024, 1, 1), datetime(2024, 12, 31, 23, 59, 59, 999999)
+    parcial = datetime(2024, 6, 15, 23, 59, 59)
+
+    async with unidade_de_trabalho(Session) as db:
+        repo = TransacaoRepository(db)
+        simples = await repo.create(TransacaoCreate(
+            valor=100, descricao='Mercado', data_transacao=datetime(2024, 3, 5),
+            tipo='saida', natureza='pf', forma_pagamento='pix',
+            categoria_nome='Casa', subcategoria_nome='Mercado'
+        ))
+        await repo.create(TransacaoCreate(
+            valor=1200, descricao='Notebook', data_transacao=datetime(2024, 4, 10),
+            tipo='saida', natureza='pf', forma_pagamento='credito', total_parcelas=12,
+            categoria_id=1, subcategoria_id=1
+        ))
+        await repo.get_all()
+        await repo.get_all(inicio, fim, limit=10)
+        for filtro in (
+            {'tipo': 'saida'}, {'natureza': 'pf'}, {'forma_pagamento': 'pix'},
+            {'categoria_id': 1}, {'subcategoria_id': 1}, {'valor_min': 10, 'valor_max': 500},
+        ):
+            await repo.get_all(filtros=TransacaoFiltros(**filtro), cursor=(fim, 10**9), limit=10)
+        await repo.get_by_id(simples.id)
+        await repo.update(simples.id, TransacaoUpdate(valor=80, subcategoria_nome='Feira'))
+        await repo.delete(simples.id)
+        await repo.create_batch([
+            TransacaoCreate(
+                valor=50, descricao='Lote', data_transacao=datetime(2024, 5, 2),
+                tipo='saida', natureza='pf', forma_pagamento='debito',
+                categoria_nome=categoria, subcategoria_nome=sub
+            )
+            for categoria, sub in (('Casa', 'Mercado'), ('Lazer', 'Cinema'), ('Meta', 'Geral'))
+        ] + [TransacaoCreate(
+            valor=300, descricao='Lote parcelado', data_transacao=datetime(2024, 5, 2),
+            tipo='saida', natureza='pf', forma_pagamento='credito', total_parcelas=3,
+            categoria_id=1, subcategoria_id=1
+        )])
+        await LimitsRepository(db).bulk_update_limits(LimitsUpdatePayload(
+            new=[{'categoria_nome': 'Viagem', 'natureza': 'pf', 'limite': 800,
+                  'subcategorias': [{'subcategoria_nome': 'Hotel'}]}],
+            modified=[{'id': 1, 'categoria_nome': 'Meta', 'natureza': 'pf', 'limite': 1500,
+                       'subcategorias': [{'id': 1, 'subcategoria_nome': 'Geral'}, {'subcategoria_nome': 'Extra'}]}],
+        ))
+
+    async with Session() as db:
+        dash = DashboardRepository(db)
+        for ate in (fim, parcial):
+            await dash.gastos_por_categoria(inicio, ate, 'pf', TipoTrans.saida)
+            await dash.entradas_por_categoria(inicio, ate, 'pf', '', '')
+            await dash.totais_periodo(inicio, ate, 'pf')
+        await dash.rendimento_por_periodo(2024, 'pf')
+        await dash.rendimento_por_periodo(2024, 'pf', range(3, 7))
+        await dash.extrato_financeiro(inicio, fim, 'pf', '', '')
+        await dash.opcoes_categorias()
+        await dash.opcoes_categorias('pf')
+
+
+async def main(verbose: bool) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'planos.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(insert(CategoriaORM), [
+                {'id': 1, 'categoria_nome': 'Meta', 'natureza': 'pf', 'limite': 1000.0}
+            ])
+            await conn.execute(insert(SubcategoriaORM), [
+                {'id': 1, 'subcategoria_nome': 'Geral', 'categoria_id': 1}
+            ])
+
+        capturadas = {}
+
+        @event.listens_for(engine.sync_engine, 'before_cursor_execute')
+        def capturar(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE', 'INSERT INTO RESUMO_MENSAL')):
+                params = parameters[0] if executemany and parameters else parameters
+                capturadas.setdefault(statement, params)
+
+        await exercitar_repositorios(sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False))
+        event.remove(engine.sync_engine, 'before_cursor_execute', capturar)
+
+        falhas = 0
+        async with engine.connect() as conn:
+            for statement, params in capturadas.items():
+                plano = (await conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', params)).all()
+                leitura_completa = statement.lstrip().upper().startswith('SELECT') and 'WHERE' not in statement.upper()
+                scans = [
+                    tabela for *_, detalhe in plano
+                    if (tabela := _tabela_varrida(detalhe)) in TABELAS_MONITORADAS and not leitura_completa
+                ]
+                if scans or verbose:
+                    print(' '.join(statement.split()))
+                    for *_, detalhe in plano:
+                        print(f'    {detalhe}')
+                if scans:
+                    falhas += 1
+                    print(f'    -> varredura completa em: {", ".join(scans)}\n')
+
+        await engine.dispose()
+
+    print(f'{len(capturadas)} instruções verificadas, {falhas} com varredura completa')
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-v', '--verbose', action='store_true', help='Mostra o plano de todas as instruções')
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.verbose)))
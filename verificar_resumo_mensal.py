@@ -0,0 +1,33 @@
+import argparse
+import asyncio
+import sys
+
+from app.core.database import unidade_de_trabalho
+from app.db.repositories.resumo_mensal import ResumoMensalRepository
+
+
+async def main(reconstruir: bool) -> int:
+    async with unidade_de_trabalho() as session:
+        repo = ResumoMensalRepository(session)
+        divergencias = await repo.verificar()
+        for d in divergencias:
+            print(d)
+
+        if not divergencias:
+            print('Resumo mensal consistente')
+            return 0
+        if reconstruir:
+            await repo.reconstruir()
+            print(f'{len(divergencias)} divergência(s) corrigida(s); resumo mensal reconstruído')
+            return 0
+        print(f'{len(divergencias)} divergência(s) encontrada(s); use --reconstruir para corrigir')
+        return 1
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Recalcula o resumo mensal a partir das transações e compara com a tabela gravada.'
+    )
+    parser.add_argument('--reconstruir', action='store_true', help='Regrava o resumo se houver divergências')
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.reconstruir)))